@@ -1,20 +1,21 @@
 import streamlit as st
 import time
-from app.services.user_service import register_user, login_user
+from app.services.user_service import register_user, login_session, resolve_session_token
 
 st.set_page_config(page_title="Login / Register", page_icon="🔑", layout="centered")
 
-# ---------- Initialise session state ----------
-if "logged_in" not in st.session_state:
-    st.session_state.logged_in = False
-if "username" not in st.session_state:
-    st.session_state.username = ""
+# ---------- Session state ----------
+# The session token says who is logged in; logged_in and username mirror it
+# and are only set on this page (other pages read the token's principal).
+principal = resolve_session_token(st.session_state.get("session_token"))
+st.session_state.logged_in = principal is not None
+st.session_state.username = principal.username if principal is not None else ""
 
 st.title("Get Started")
 
-# If already logged in
-if st.session_state.logged_in:
-    st.success(f"Already logged in as **{st.session_state.username}**.")
+# If already logged in (the session token is still valid)
+if principal is not None:
+    st.success(f"Already logged in as **{principal.username}**.")
     if st.button("Go to dashboard", type="secondary", use_container_width=True):  # Optional: add stretch here too
         st.switch_page("pages/1_Dashboard.py")
     st.stop()
@@ -31,10 +32,11 @@ with tab_login:
         if not login_username or not login_password:
             st.warning("Please enter both username and password.")
         else:
-            success, message = login_user(login_username, login_password)
+            success, message, token = login_session(login_username, login_password)
             if success:
                 st.session_state.logged_in = True
                 st.session_state.username = login_username
+                st.session_state.session_token = token
                 st.success(message)
                 st.balloons()
                 time.sleep(2)  # pause so balloons are visible
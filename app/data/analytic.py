@@ -1,5 +1,7 @@
 import pandas as pd
+from app.data.cache import cached_query
 
+@cached_query("cyber_incidents")
 def get_incidents_by_category_count(conn):
     """
     Count incidents by category.
@@ -17,6 +19,7 @@ def get_incidents_by_category_count(conn):
     df = pd.read_sql_query(query, conn)
     return df
 
+@cached_query("cyber_incidents")
 def get_high_severity_by_status(conn):
     """
     Count high severity incidents by status.
@@ -35,6 +38,7 @@ def get_high_severity_by_status(conn):
     df = pd.read_sql_query(query, conn)
     return df
 
+@cached_query("cyber_incidents")
 def get_categories_with_many_cases(conn, min_count=5):
     """
     Find incident categories with more than min_count cases.
@@ -57,6 +61,7 @@ def get_categories_with_many_cases(conn, min_count=5):
     df = pd.read_sql_query(query, conn, params=(min_count,))
     return df
 
+@cached_query("datasets_metadata")
 def get_datasets_by_uploader(conn):
     """
     Count datasets grouped by uploader.
@@ -73,6 +78,7 @@ def get_datasets_by_uploader(conn):
     """
     return pd.read_sql_query(query, conn)
 
+@cached_query("datasets_metadata")
 def get_dataset_sizes(conn):
     """
     Show rows and columns for each dataset.
@@ -88,6 +94,7 @@ def get_dataset_sizes(conn):
     """
     return pd.read_sql_query(query, conn)
 
+@cached_query("it_tickets")
 def get_tickets_by_status(conn):
     """
     Count tickets grouped by status.
@@ -104,6 +111,7 @@ def get_tickets_by_status(conn):
     """
     return pd.read_sql_query(query, conn)
 
+@cached_query("it_tickets")
 def get_avg_resolution_time(conn):
     """
     Calculate average resolution time for tickets.
@@ -115,6 +123,7 @@ def get_avg_resolution_time(conn):
     query = "SELECT AVG(resolution_time_hours) as avg_resolution FROM it_tickets"
     return pd.read_sql_query(query, conn)
 
+@cached_query("it_tickets")
 def get_tickets_by_assignee(conn):
     """
     Count tickets grouped by assigned staff.
@@ -129,4 +138,230 @@ def get_tickets_by_assignee(conn):
     GROUP BY assigned_to
     ORDER BY count DESC
     """
-    return pd.read_sql_query(query, conn)
\ No newline at end of file
+    return pd.read_sql_query(query, conn)
+
+@cached_query("cyber_incidents")
+def get_incidents_by_severity(conn):
+    """
+    Count incidents grouped by severity.
+    Uses: SELECT, FROM, GROUP BY, ORDER BY
+
+    Returns:
+        pandas.DataFrame: Incident counts by severity
+    """
+    query = """
+    SELECT severity, COUNT(*) as count
+    FROM cyber_incidents
+    GROUP BY severity
+    ORDER BY count DESC
+    """
+    return pd.read_sql_query(query, conn)
+
+# ---------- KPI summaries ----------
+# Each domain's metric cards come from a single aggregate statement, so the
+# pages never pull detail rows into pandas just to count them.
+
+def _fetch_kpis(conn, query):
+    cursor = conn.execute(query)
+    names = [col[0] for col in cursor.description]
+    return dict(zip(names, cursor.fetchone()))
+
+@cached_query("cyber_incidents")
+def get_incident_kpis(conn):
+    """
+    Summary metrics for cyber incidents in one pass.
+    Uses: SELECT, FROM, COUNT, SUM(CASE ...)
+
+    Returns:
+        dict: total_incidents, high_critical, open_incidents
+    """
+    query = """
+    SELECT COUNT(*) as total_incidents,
+           COALESCE(SUM(CASE WHEN severity IN ('High', 'Critical') THEN 1 ELSE 0 END), 0) as high_critical,
+           COALESCE(SUM(CASE WHEN status = 'Open' THEN 1 ELSE 0 END), 0) as open_incidents
+    FROM cyber_incidents
+    """
+    return _fetch_kpis(conn, query)
+
+@cached_query("datasets_metadata")
+def get_dataset_kpis(conn):
+    """
+    Summary metrics for dataset metadata in one pass.
+    Uses: SELECT, FROM, COUNT, MAX
+
+    The number of uploaders comes from approx.approx_distinct() instead.
+
+    Returns:
+        dict: total_datasets, largest_dataset
+    """
+    query = """
+    SELECT COUNT(*) as total_datasets,
+           COALESCE(MAX(rows), 0) as largest_dataset
+    FROM datasets_metadata
+    """
+    return _fetch_kpis(conn, query)
+
+@cached_query("it_tickets")
+def get_ticket_kpis(conn):
+    """
+    Summary metrics for IT tickets in one pass.
+    Uses: SELECT, FROM, COUNT, SUM(CASE ...), AVG
+
+    Returns:
+        dict: total_tickets, open_tickets, avg_resolution (None while no
+              ticket has a resolution time), resolution_count
+    """
+    query = """
+    SELECT COUNT(*) as total_tickets,
+           COALESCE(SUM(CASE WHEN status = 'Open' THEN 1 ELSE 0 END), 0) as open_tickets,
+           AVG(resolution_time_hours) as avg_resolution,
+           COUNT(resolution_time_hours) as resolution_count
+    FROM it_tickets
+    """
+    return _fetch_kpis(conn, query)
+
+# ---------- Rollup-backed charts ----------
+# These read the trigger-maintained rollup tables (see schema.ROLLUP_TABLES),
+# whose size depends on the number of distinct day/category/... combinations,
+# not on the number of incidents or tickets. Missing values are stored as ''
+# and returned as NULL, like the full-table queries. Results are cached under
+# the base table, since every rollup change comes from a write to it.
+
+@cached_query("cyber_incidents")
+def get_incidents_by_category_rollup(conn):
+    """
+    Count incidents by category from the daily rollup.
+    Uses: SELECT, FROM, SUM, GROUP BY, ORDER BY
+
+    Returns:
+        pandas.DataFrame: Incident category counts
+    """
+    query = """
+    SELECT NULLIF(category, '') as category, SUM(count) as count
+    FROM incident_rollup_daily
+    GROUP BY category
+    ORDER BY count DESC
+    """
+    return pd.read_sql_query(query, conn)
+
+@cached_query("cyber_incidents")
+def get_incidents_by_severity_rollup(conn):
+    """
+    Count incidents by severity from the daily rollup.
+    Uses: SELECT, FROM, SUM, GROUP BY, ORDER BY
+
+    Returns:
+        pandas.DataFrame: Incident counts by severity
+    """
+    query = """
+    SELECT NULLIF(severity, '') as severity, SUM(count) as count
+    FROM incident_rollup_daily
+    GROUP BY severity
+    ORDER BY count DESC
+    """
+    return pd.read_sql_query(query, conn)
+
+@cached_query("cyber_incidents")
+def get_high_severity_by_status_rollup(conn):
+    """
+    Count high severity incidents by status from the daily rollup.
+    Uses: SELECT, FROM, WHERE, SUM, GROUP BY, ORDER BY
+
+    Returns:
+        pandas.DataFrame: High severity counts by status
+    """
+    query = """
+    SELECT NULLIF(status, '') as status, SUM(count) as count
+    FROM incident_rollup_daily
+    WHERE severity = 'High'
+    GROUP BY status
+    ORDER BY count DESC
+    """
+    return pd.read_sql_query(query, conn)
+
+@cached_query("cyber_incidents")
+def get_categories_with_many_cases_rollup(conn, min_count=5):
+    """
+    Find incident categories with more than min_count cases, from the daily rollup.
+    Uses: SELECT, FROM, SUM, GROUP BY, HAVING, ORDER BY
+
+    Args:
+        conn: Database connection
+        min_count: Minimum number of cases to include
+
+    Returns:
+        pandas.DataFrame: Categories with many cases
+    """
+    query = """
+    SELECT NULLIF(category, '') as category, SUM(count) as count
+    FROM incident_rollup_daily
+    GROUP BY category
+    HAVING SUM(count) > ?
+    ORDER BY count DESC
+    """
+    return pd.read_sql_query(query, conn, params=(min_count,))
+
+@cached_query("it_tickets")
+def get_tickets_by_status_rollup(conn):
+    """
+    Count tickets by status from the daily rollup.
+    Uses: SELECT, FROM, SUM, GROUP BY, ORDER BY
+
+    Returns:
+        pandas.DataFrame: Ticket counts by status
+    """
+    query = """
+    SELECT NULLIF(status, '') as status, SUM(count) as count
+    FROM ticket_rollup_daily
+    GROUP BY status
+    ORDER BY count DESC
+    """
+    return pd.read_sql_query(query, conn)
+
+@cached_query("it_tickets")
+def get_tickets_by_assignee_rollup(conn):
+    """
+    Count tickets by assigned staff from the daily rollup.
+    Uses: SELECT, FROM, SUM, GROUP BY, ORDER BY
+
+    Returns:
+        pandas.DataFrame: Ticket counts by assignee
+    """
+    query = """
+    SELECT NULLIF(assigned_to, '') as assigned_to, SUM(count) as count
+    FROM ticket_rollup_daily
+    GROUP BY assigned_to
+    ORDER BY count DESC
+    """
+    return pd.read_sql_query(query, conn)
+
+@cached_query("it_tickets")
+def get_avg_resolution_time_rollup(conn):
+    """
+    Average resolution time from the rollup's running sums.
+    Uses: SELECT, FROM, SUM
+
+    Returns:
+        pandas.DataFrame: Average resolution time (hours)
+    """
+    query = """
+    SELECT SUM(resolution_hours_sum) / NULLIF(SUM(resolution_count), 0) as avg_resolution
+    FROM ticket_rollup_daily
+    """
+    return pd.read_sql_query(query, conn)
+
+@cached_query("datasets_metadata")
+def get_datasets_by_uploader_rollup(conn):
+    """
+    Count datasets by uploader from the uploader rollup.
+    Uses: SELECT, FROM, ORDER BY
+
+    Returns:
+        pandas.DataFrame: Dataset counts by uploader
+    """
+    query = """
+    SELECT NULLIF(uploaded_by, '') as uploaded_by, count
+    FROM dataset_rollup_uploader
+    ORDER BY count DESC
+    """
+    return pd.read_sql_query(query, conn)
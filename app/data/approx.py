@@ -0,0 +1,250 @@
+import heapq
+import math
+import threading
+import numpy as np
+import pandas as pd
+from config import APPROX_DISTINCT_ERROR, APPROX_TOP_K_ERROR
+from app.data.cache import _database_path
+from app.data.changes import change_log_covers, get_change_version, get_changes_since, needs_reload
+
+# Columns with approximate unique counts and top-N, per table.
+APPROX_COLUMNS = {
+    "cyber_incidents": ["category"],
+    "datasets_metadata": ["uploaded_by"],
+    "it_tickets": ["assigned_to"],
+}
+
+def _hash_values(values):
+    """64-bit hashes of a batch of values (vectorized)."""
+    return pd.util.hash_array(np.asarray([str(v) for v in values], dtype=object))
+
+class HyperLogLog:
+    """
+    Distinct counter using 2^precision one-byte registers.
+
+    The relative standard error is about 1.04 / sqrt(2^precision), whatever
+    the number of values added; two counters with the same precision merge by
+    taking the register-wise maximum.
+    """
+
+    def __init__(self, error=APPROX_DISTINCT_ERROR):
+        self.precision = min(max(math.ceil(math.log2((1.04 / error) ** 2)), 4), 18)
+        self.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+
+    def add_many(self, values):
+        if len(values) == 0:
+            return
+        hashes = _hash_values(values)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        rest = hashes << np.uint64(self.precision)
+        # Rank = position of the first 1-bit in the remaining bits.
+        with np.errstate(divide="ignore"):
+            leading = 63 - np.floor(np.log2(rest.astype(np.float64)))
+        ranks = np.where(rest == 0, 64 - self.precision, leading) + 1
+        np.maximum.at(self.registers, index, np.minimum(ranks, 64 - self.precision + 1).astype(np.uint8))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)   # linear counting for small sets
+        return int(round(estimate))
+
+class SpaceSaving:
+    """
+    Top-K heavy hitters with a fixed number of counters.
+
+    Every reported count overestimates the true count by at most
+    added / capacity, and any value seen more often than that is guaranteed
+    to be reported. added counts every value ever added: removing values
+    lowers their counters and total, but not the overestimates already made.
+    """
+
+    def __init__(self, error=APPROX_TOP_K_ERROR):
+        self.capacity = max(int(math.ceil(1 / error)), 1)
+        self.total = 0       # values currently counted
+        self.added = 0       # values ever added, which bounds the error
+        self._counts = {}    # value -> [count, overestimate]
+        self._heap = []      # (count, value), may hold stale entries
+
+    def _pop_min(self):
+        while True:
+            count, value = heapq.heappop(self._heap)
+            entry = self._counts.get(value)
+            if entry is not None and entry[0] == count:
+                return value, entry
+
+    def add(self, value, weight=1):
+        self.total += weight
+        self.added += weight
+        entry = self._counts.get(value)
+        if entry is None:
+            if len(self._counts) < self.capacity:
+                entry = self._counts[value] = [0, 0]
+            else:
+                # Replace the smallest counter; its count becomes our error bound.
+                old_value, old_entry = self._pop_min()
+                del self._counts[old_value]
+                entry = self._counts[value] = [old_entry[0], old_entry[0]]
+        entry[0] += weight
+        heapq.heappush(self._heap, (entry[0], value))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, v) for v, (c, _) in self._counts.items()]
+            heapq.heapify(self._heap)
+
+    def add_many(self, values):
+        # Pre-aggregate the batch so each distinct value is one weighted update.
+        for value, weight in pd.Series(values).value_counts(sort=False).items():
+            self.add(value, int(weight))
+
+    def remove_many(self, values):
+        """
+        Take deleted values off their counters (values not tracked only lower the total).
+
+        Counts stay upper bounds, but the error bound is still added / capacity,
+        which outgrows total as deletes and updates pile up.
+        """
+        for value, weight in pd.Series(values, dtype=object).value_counts(sort=False).items():
+            weight = int(weight)
+            self.total -= weight
+            entry = self._counts.get(value)
+            if entry is None:
+                continue
+            entry[0] -= weight
+            if entry[0] <= 0:
+                del self._counts[value]
+            else:
+                heapq.heappush(self._heap, (entry[0], value))
+
+    def top(self, n=10):
+        """Return [(value, count, overestimate)] for the n largest counters."""
+        ranked = sorted(self._counts.items(), key=lambda item: item[1][0], reverse=True)[:n]
+        return [(value, count, error) for value, (count, error) in ranked]
+
+class ApproxRegistry:
+    """
+    Process-wide HyperLogLog and Space-Saving summaries per (database, table, column).
+
+    A summary is built by streaming the column once, then kept current from
+    the change log: inserted and updated values are added, and deleted or
+    replaced values are taken off their Space-Saving counter. Once the values
+    folded in that way outnumber the rows, the column is streamed again, so
+    the top-N error bound never exceeds twice what a fresh scan would give.
+    A HyperLogLog can't forget a value, so the column is also streamed again
+    as soon as a deleted or replaced value has no rows left (checked on the
+    column's index), as well as after a bulk reload ('R') or once the log was
+    pruned past the summary.
+    """
+
+    def __init__(self, chunk_size=50_000):
+        self.chunk_size = chunk_size
+        self._summaries = {}   # (db_path, table, column) -> (change_log version, HyperLogLog, SpaceSaving)
+        self._lock = threading.RLock()
+
+    def _build(self, conn, table, column):
+        distinct, heavy = HyperLogLog(), SpaceSaving()
+        cursor = conn.execute(f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL")
+        while True:
+            rows = cursor.fetchmany(self.chunk_size)
+            if not rows:
+                break
+            values = [row[0] for row in rows]
+            distinct.add_many(values)
+            heavy.add_many(values)
+        return distinct, heavy
+
+    def _fold(self, changes, column, distinct, heavy):
+        added, removed = [], []
+        for old, new in zip(changes["old"], changes["new"]):
+            old_value = (old or {}).get(column)
+            new_value = (new or {}).get(column)
+            if old_value == new_value:
+                continue
+            if old_value is not None:
+                removed.append(old_value)
+            if new_value is not None:
+                added.append(new_value)
+        distinct.add_many(added)
+        heavy.add_many(added)
+        heavy.remove_many(removed)
+        return removed
+
+    def _any_gone(self, conn, table, column, values):
+        """True if some of values no longer appear in table.column (one index probe each)."""
+        values = list(set(values))
+        for start in range(0, len(values), 500):
+            chunk = values[start:start + 500]
+            marks = ", ".join("?" * len(chunk))
+            found = conn.execute(
+                f"SELECT COUNT(DISTINCT {column}) FROM {table} WHERE {column} IN ({marks})", chunk
+            ).fetchone()[0]
+            if found < len(chunk):
+                return True
+        return False
+
+    def _summary(self, conn, table, column):
+        """
+        Return (HyperLogLog, SpaceSaving) for table.column, applying new changes first.
+
+        Callers must hold self._lock for as long as they read the summaries,
+        since the next call folds changes into the same objects.
+        """
+        db_path = _database_path(conn)
+        key = (db_path, table, column)
+        # Read the version first: anything written during a rebuild is folded in next time.
+        version = get_change_version(conn)
+        cached = self._summaries.get(key)
+        if cached is not None and db_path:
+            cached_version, distinct, heavy = cached
+            if cached_version == version:
+                return distinct, heavy
+            if change_log_covers(conn, cached_version):
+                changes = get_changes_since(conn, cached_version, [table])
+                if not needs_reload(changes):
+                    removed = self._fold(changes, column, distinct, heavy)
+                    if heavy.added <= 2 * heavy.total and not self._any_gone(conn, table, column, removed):
+                        self._summaries[key] = (version, distinct, heavy)
+                        return distinct, heavy
+        distinct, heavy = self._build(conn, table, column)
+        if db_path:
+            self._summaries[key] = (version, distinct, heavy)
+        return distinct, heavy
+
+    def distinct(self, conn, table, column):
+        """Approximate number of distinct non-NULL values in table.column."""
+        with self._lock:
+            distinct, _ = self._summary(conn, table, column)
+            return distinct.estimate()
+
+    def top(self, conn, table, column, n=10):
+        """Snapshot of the n largest counters of table.column, as SpaceSaving.top()."""
+        with self._lock:
+            _, heavy = self._summary(conn, table, column)
+            return heavy.top(n)
+
+approx_registry = ApproxRegistry()
+
+def approx_distinct(conn, table, column):
+    """
+    Approximate number of distinct non-NULL values in table.column.
+
+    Returns:
+        int: Estimate within about APPROX_DISTINCT_ERROR (relative standard error);
+        values whose rows were all deleted are no longer counted
+    """
+    return approx_registry.distinct(conn, table, column)
+
+def approx_top_k(conn, table, column, n=10):
+    """
+    The n most frequent values of table.column.
+
+    Returns:
+        pandas.DataFrame: <column>, count (may overcount by at most
+        APPROX_TOP_K_ERROR x 2 x row count), error (this row's bound), most frequent first
+    """
+    return pd.DataFrame(approx_registry.top(conn, table, column, n), columns=[column, "count", "error"])
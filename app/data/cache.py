@@ -0,0 +1,224 @@
+import functools
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict, defaultdict
+import pandas as pd
+from config import QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_MAX_MB
+
+class QueryCache:
+    """
+    Process-wide LRU cache for read-only query results, shared by every session.
+
+    Entries are keyed on (function, database file, arguments) and remember the
+    write version of each table they read. A result is only served while those
+    versions are unchanged, so a write to cyber_incidents invalidates incident
+    analytics without touching ticket or dataset entries.
+
+    Versions are bumped two ways:
+      * note_write() from the data layer's insert/update/delete functions and loaders;
+      * PRAGMA data_version on a private monitor connection, which changes when any
+        other connection or process commits. Since that cannot say which table
+        changed, an unexplained change bumps every table of that database.
+    note_write() only explains a data_version change when the versions taken
+    just before the writer's commit (data_versions_before_commit) show that
+    nothing but that commit moved it.
+    """
+
+    def __init__(self, max_entries=QUERY_CACHE_MAX_ENTRIES, max_bytes=QUERY_CACHE_MAX_MB * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # key -> (versions, value, size)
+        self._bytes = 0
+        self._versions = defaultdict(int)   # (db_path, table) -> version
+        self._seen_data_version = {}        # db_path -> last monitor PRAGMA data_version
+        self._lock = threading.RLock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0, "uncacheable": 0}
+
+    # ---------- write versions ----------
+    def _sync_external_writes(self, db_path):
+        current = _data_version(db_path)
+        seen = self._seen_data_version.get(db_path)
+        if seen is not None and current != seen:
+            for (path, table) in list(self._versions):
+                if path == db_path:
+                    self._versions[(path, table)] += 1
+            self._stats["invalidations"] += 1
+        self._seen_data_version[db_path] = current
+
+    def note_write(self, db_path, *tables, conn=None):
+        """
+        Record a committed write to the given tables of db_path.
+
+        Args:
+            conn: Connection that made the commit; if only that commit moved
+                  data_version since it was last seen, the move is absorbed
+                  instead of bumping every table on the next lookup
+        """
+        if not db_path:
+            return
+        with self._lock:
+            for table in tables:
+                self._versions[(db_path, table)] += 1
+            self._stats["invalidations"] += 1
+            before = getattr(conn, "commit_data_versions", None)
+            if before is None or self._seen_data_version.get(db_path) != before[0]:
+                return   # another commit may have come first: leave it to _sync_external_writes
+            conn.commit_data_versions = None
+            after = _data_version(db_path)
+            # conn's own data_version moves for every commit but its own, so an
+            # unchanged value means no other commit landed before `after` was read.
+            if conn.execute("PRAGMA data_version").fetchone()[0] == before[1]:
+                self._seen_data_version[db_path] = after
+
+    def _snapshot(self, db_path, tables):
+        return tuple(self._versions[(db_path, table)] for table in tables)
+
+    # ---------- LRU storage ----------
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._stats["evictions"] += 1
+
+    def call(self, func, tables, conn, args, kwargs):
+        """Return func(conn, *args, **kwargs), from cache when the tables are unchanged."""
+        db_path = _database_path(conn)
+        try:
+            key = (func.__module__, func.__qualname__, db_path, args, tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            key = None
+        if key is None or not db_path:
+            with self._lock:
+                self._stats["uncacheable"] += 1
+            return func(conn, *args, **kwargs)
+
+        with self._lock:
+            self._sync_external_writes(db_path)
+            versions = self._snapshot(db_path, tables)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == versions:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return _copy(entry[1])
+            if entry is not None:
+                del self._entries[key]
+                self._bytes -= entry[2]
+            self._stats["misses"] += 1
+
+        value = func(conn, *args, **kwargs)
+        size = _estimate_size(value)
+        if size <= self.max_bytes:
+            with self._lock:
+                # Only store if no write landed while the query was running.
+                if self._snapshot(db_path, tables) == versions:
+                    old = self._entries.pop(key, None)
+                    if old is not None:
+                        self._bytes -= old[2]
+                    self._entries[key] = (versions, value, size)
+                    self._bytes += size
+                    self._evict()
+        return _copy(value)
+
+    def clear(self):
+        """Drop every cached result (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Snapshot of cache counters.
+
+        Returns:
+            dict: hits, misses, hit_rate, evictions, invalidations, uncacheable, entries, bytes, limits
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["entries"] = len(self._entries)
+            snapshot["bytes"] = self._bytes
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_rate"] = snapshot["hits"] / lookups if lookups else 0.0
+        snapshot["max_entries"] = self.max_entries
+        snapshot["max_bytes"] = self.max_bytes
+        return snapshot
+
+# One monitor connection per database file, shared by every QueryCache so
+# their data_version readings can be compared with data_versions_before_commit().
+_monitors = {}   # db_path -> sqlite3.Connection
+_monitor_lock = threading.Lock()
+
+def _data_version(db_path):
+    with _monitor_lock:
+        monitor = _monitors.get(db_path)
+        if monitor is None:
+            monitor = _monitors[db_path] = sqlite3.connect(db_path, check_same_thread=False)
+        return monitor.execute("PRAGMA data_version").fetchone()[0]
+
+def data_versions_before_commit(conn):
+    """
+    Read data_version just before conn commits (see db.PlatformConnection.commit).
+
+    conn still holds its write lock, so no other commit can land between
+    this reading and its own.
+
+    Returns:
+        tuple: (monitor data_version, conn's own data_version), or None if
+        no cache watches conn's database
+    """
+    db_path = _database_path(conn)
+    with _monitor_lock:
+        watched = db_path in _monitors
+    if not watched:
+        return None
+    return _data_version(db_path), conn.execute("PRAGMA data_version").fetchone()[0]
+
+def _database_path(conn):
+    path = getattr(conn, "db_path", None)
+    if path is None:
+        row = conn.execute("PRAGMA database_list").fetchone()
+        path = row[2] if row else ""
+    # In-memory databases are private to one connection, so never share results.
+    if not path or path == ":memory:":
+        return ""
+    return str(path)
+
+def _estimate_size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+def _copy(value):
+    # Callers rename/set_index the frames they get back; never hand out the cached object.
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+query_cache = QueryCache()
+
+def cached_query(*tables):
+    """
+    Decorator for read-only query functions taking conn as first argument.
+
+    Args:
+        *tables: Tables the query reads; writes to any of them invalidate the result
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(conn, *args, **kwargs):
+            return query_cache.call(func, tables, conn, args, kwargs)
+        return wrapper
+    return decorator
+
+def note_write(conn, *tables):
+    """Tell the cache that tables were written (call after commit)."""
+    query_cache.note_write(_database_path(conn), *tables, conn=conn)
+
+def get_cache_stats():
+    """Return hit/miss metrics for the shared query cache."""
+    return query_cache.stats()
@@ -0,0 +1,251 @@
+import json
+from contextlib import contextmanager
+import pandas as pd
+from app.data.schema import CHANGE_FEED_TABLES
+
+# ---------- Reading the feed ----------
+
+def get_change_version(conn):
+    """
+    Return the latest change_log version (0 when nothing has changed yet).
+
+    Read it before loading data; later, get_changes_since(conn, version)
+    returns exactly what happened after that point.
+    """
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM change_log").fetchone()[0]
+
+def get_changes_since(conn, version, tables=None, limit=None):
+    """
+    Retrieve changes newer than version, oldest first.
+
+    Args:
+        conn: Database connection
+        version: Last version already applied
+        tables: Only changes to these tables (None for all)
+        limit: Maximum number of changes to return
+
+    Returns:
+        pandas.DataFrame: version, table_name, op ('I', 'U', 'D' or 'R' for a
+        bulk reload), row_key (rowid), old, new (dicts of column values or None)
+    """
+    query = "SELECT version, table_name, op, row_key, old_values, new_values FROM change_log WHERE version > ?"
+    params = [version]
+    if tables:
+        query += f" AND table_name IN ({', '.join('?' for _ in tables)})"
+        params.extend(tables)
+    query += " ORDER BY version"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    df = pd.read_sql_query(query, conn, params=params)
+    df["old"] = [json.loads(v) if isinstance(v, str) else None for v in df.pop("old_values")]
+    df["new"] = [json.loads(v) if isinstance(v, str) else None for v in df.pop("new_values")]
+    return df
+
+def change_log_covers(conn, version):
+    """
+    True when every change after version is still in the log (pruning may have
+    removed some, in which case a session holding that version must reload).
+    """
+    oldest = conn.execute("SELECT MIN(version) FROM change_log").fetchone()[0]
+    return oldest is None or oldest <= version + 1
+
+def prune_change_log(conn, keep_versions):
+    """
+    Delete all but the newest keep_versions entries.
+
+    Returns:
+        int: Number of entries deleted
+    """
+    cursor = conn.execute(
+        "DELETE FROM change_log WHERE version <= (SELECT COALESCE(MAX(version), 0) FROM change_log) - ?",
+        (keep_versions,)
+    )
+    conn.commit()
+    return cursor.rowcount
+
+def _set_change_feed_pause(conn, paused):
+    """
+    Install or drop this connection's temp triggers for a bulk load.
+
+    Before each write to a domain table they name it in change_feed_pause,
+    which silences its change_log triggers; after a row really changed they
+    note the table in temp.change_feed_written (an upsert that changes
+    nothing writes no row and so doesn't count).
+    """
+    if paused:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'change_feed_pause'"
+        ).fetchone()
+        if not exists:
+            return   # no change_log triggers to pause
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS change_feed_written (table_name TEXT PRIMARY KEY) WITHOUT ROWID")
+    for table in CHANGE_FEED_TABLES:
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            pause, written = f"change_feed_pause_{table}_{op.lower()}", f"change_feed_written_{table}_{op.lower()}"
+            if paused:
+                conn.execute(f"""
+                    CREATE TEMP TRIGGER IF NOT EXISTS {pause} BEFORE {op} ON main.{table} BEGIN
+                        INSERT OR IGNORE INTO change_feed_pause (table_name) VALUES ('{table}');
+                    END
+                """)
+                conn.execute(f"""
+                    CREATE TEMP TRIGGER IF NOT EXISTS {written} AFTER {op} ON main.{table} BEGIN
+                        INSERT OR IGNORE INTO change_feed_written (table_name) VALUES ('{table}');
+                    END
+                """)
+            else:
+                conn.execute(f"DROP TRIGGER IF EXISTS temp.{pause}")
+                conn.execute(f"DROP TRIGGER IF EXISTS temp.{written}")
+    conn.change_feed_pausing = paused
+
+@contextmanager
+def bulk_changes(conn):
+    """
+    Suspend per-row change entries for this connection's writes during a bulk load.
+
+    Millions of loaded rows would otherwise become millions of change_log
+    entries. Only conn is paused: temp triggers on conn name each domain table
+    it writes in change_feed_pause, which the change_log triggers check, and
+    conn.commit() clears those rows before committing (see
+    db.PlatformConnection), so other connections never see them and their
+    writes are still logged row by row. When the outermost block ends (even
+    if the load fails), one 'R' entry is logged for each domain table the
+    block committed writes to, telling readers to reload it; writes to other
+    tables (checkpoints, watermarks) don't count.
+    """
+    if not conn.change_feed_pauses:
+        _set_change_feed_pause(conn, True)
+    conn.change_feed_pauses += 1
+    try:
+        yield
+    finally:
+        conn.change_feed_pauses -= 1
+        if not conn.change_feed_pauses:
+            conn.rollback()
+            _set_change_feed_pause(conn, False)
+            written = sorted(conn.change_feed_skipped)
+            conn.change_feed_skipped.clear()
+            if written:
+                conn.executemany(
+                    "INSERT INTO change_log (table_name, op) VALUES (?, 'R')", [(table,) for table in written]
+                )
+                conn.commit()
+
+# ---------- Applying deltas ----------
+
+def needs_reload(changes):
+    """True when the changes include a bulk reload, which carries no row values."""
+    return bool((changes["op"] == "R").any())
+
+def apply_changes_to_frame(df, changes, key_column, include=None):
+    """
+    Patch a cached DataFrame of rows with inserted, updated and deleted rows.
+    Changed rows move to the end; callers re-sort if order matters.
+
+    Args:
+        df: Rows the session already holds (must contain key_column)
+        changes: Output of get_changes_since for this table
+        key_column: Column identifying a row (e.g. incident_id)
+        include: Callable(new_values, rowid) deciding whether an inserted or
+            updated row belongs in this frame (e.g. it falls inside the loaded
+            page window); None keeps them all
+
+    Returns:
+        pandas.DataFrame: Patched copy, or None if a reload is required
+    """
+    if needs_reload(changes):
+        return None
+    rows = {}
+    for i, (key, row) in enumerate(zip(df[key_column], df.to_dict("records"))):
+        rows[key if pd.notna(key) else ("unkeyed", i)] = row
+    for op, row_key, old, new in zip(changes["op"], changes["row_key"], changes["old"], changes["new"]):
+        if op in ("U", "D"):
+            old_key = old.get(key_column)
+            if old_key is None:
+                return None   # a row without a usable key can't be located
+            rows.pop(old_key, None)
+            if op == "D":
+                continue
+        if include is not None and not include(new, row_key):
+            continue
+        new_key = new.get(key_column)
+        rows[new_key if new_key is not None else ("rowid", row_key)] = {col: new.get(col) for col in df.columns}
+    return pd.DataFrame(list(rows.values()), columns=df.columns)
+
+def apply_changes_to_counts(counts, changes, column, count_column="count"):
+    """
+    Patch a GROUP BY column COUNT(*) frame with the changes' old/new values.
+
+    Returns:
+        pandas.DataFrame: Updated counts (groups that reach 0 are dropped), sorted
+        by count descending, or None if a reload is required
+    """
+    if needs_reload(changes):
+        return None
+    totals = dict(zip(counts[column], counts[count_column]))
+    for old, new in zip(changes["old"], changes["new"]):
+        if old is not None:
+            totals[old.get(column)] = totals.get(old.get(column), 0) - 1
+        if new is not None:
+            totals[new.get(column)] = totals.get(new.get(column), 0) + 1
+    result = pd.DataFrame(
+        [(value, n) for value, n in totals.items() if n > 0], columns=[column, count_column]
+    )
+    return result.sort_values(count_column, ascending=False, ignore_index=True)
+
+# KPI name -> predicate over a row's values, for KPIs that are plain counts.
+KPI_COUNTS = {
+    "cyber_incidents": {
+        "total_incidents": lambda row: True,
+        "high_critical": lambda row: row.get("severity") in ("High", "Critical"),
+        "open_incidents": lambda row: row.get("status") == "Open",
+    },
+    "it_tickets": {
+        "total_tickets": lambda row: True,
+        "open_tickets": lambda row: row.get("status") == "Open",
+        "resolution_count": lambda row: row.get("resolution_time_hours") is not None,
+    },
+    "datasets_metadata": {
+        "total_datasets": lambda row: True,
+    },
+}
+
+def apply_kpi_changes(table, kpis, changes):
+    """
+    Patch a KPI dict from analytic.get_*_kpis with the changes to its table.
+
+    Counts are adjusted by their predicates and the ticket average is rebuilt
+    from its running sum. The largest dataset can't shrink without a reload
+    (that needs the next largest).
+
+    Returns:
+        dict: Updated KPIs, or None if they can't be derived from the deltas
+    """
+    if needs_reload(changes):
+        return None
+    kpis = dict(kpis)
+    pairs = list(zip(changes["old"], changes["new"]))
+
+    if table == "it_tickets":
+        hours = (kpis["avg_resolution"] or 0) * kpis["resolution_count"]
+        for old, new in pairs:
+            hours -= (old or {}).get("resolution_time_hours") or 0
+            hours += (new or {}).get("resolution_time_hours") or 0
+
+    for name, predicate in KPI_COUNTS[table].items():
+        for old, new in pairs:
+            kpis[name] -= 1 if old is not None and predicate(old) else 0
+            kpis[name] += 1 if new is not None and predicate(new) else 0
+
+    if table == "it_tickets":
+        kpis["avg_resolution"] = hours / kpis["resolution_count"] if kpis["resolution_count"] else None
+    elif table == "datasets_metadata":
+        for old, new in pairs:
+            old_rows = (old or {}).get("rows") or 0
+            new_rows = (new or {}).get("rows") or 0
+            if old is not None and old_rows >= kpis["largest_dataset"] and (new is None or new_rows < old_rows):
+                return None
+            kpis["largest_dataset"] = max(kpis["largest_dataset"], new_rows)
+    return kpis
@@ -1,4 +1,9 @@
 import pandas as pd
+from app.data.cache import note_write
+from app.data.pagination import fetch_keyset_page
+from app.data.search import search_table
+
+DATASET_COLUMNS = ["dataset_id", "name", "rows", "columns", "uploaded_by", "upload_date"]
 
 def insert_dataset(conn, dataset_id, name, rows, columns, uploaded_by, upload_date):
     """Insert a new dataset metadata record."""
@@ -10,15 +15,33 @@ def insert_dataset(conn, dataset_id, name, rows, columns, uploaded_by, upload_da
     """
     cursor.execute(query, (dataset_id, name, rows, columns, uploaded_by, upload_date))
     conn.commit()
-    return dataset_id
+    note_write(conn, "datasets_metadata")
+    return dataset_id if dataset_id is not None else cursor.lastrowid
 
 def get_all_datasets(conn):
     """Retrieve all dataset metadata records."""
     return pd.read_sql_query("SELECT * FROM datasets_metadata ORDER BY dataset_id DESC", conn)
 
+def get_datasets_page(conn, page_size=50, cursor=None, descending=True):
+    """
+    Retrieve one page of dataset metadata ordered by upload_date, then dataset_id.
+
+    Returns:
+        tuple: (pandas.DataFrame page, next cursor or None when no more rows)
+    """
+    return fetch_keyset_page(
+        conn, "datasets_metadata", DATASET_COLUMNS, "upload_date", "dataset_id",
+        page_size=page_size, cursor=cursor, descending=descending
+    )
+
+def search_datasets(conn, term, limit=100, prefix=True):
+    """Full-text search over dataset metadata, best match first."""
+    return search_table(conn, "datasets_metadata", DATASET_COLUMNS, term, limit, prefix)
+
 def delete_dataset(conn, dataset_id):
     """Delete a dataset metadata record."""
     cursor = conn.cursor()
     cursor.execute("DELETE FROM datasets_metadata WHERE dataset_id = ?", (dataset_id,))
     conn.commit()
+    note_write(conn, "datasets_metadata")
     return cursor.rowcount
\ No newline at end of file
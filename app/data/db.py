@@ -1,15 +1,325 @@
+import math
 import sqlite3
-from config import DB_PATH
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from queue import Empty, LifoQueue
+from config import DB_PATH, DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_PROFILE
+from app.data.cache import data_versions_before_commit
 
-def connect_database(db_path=DB_PATH):
+# Named PRAGMA presets applied to every new connection.
+# cache_size is negative = KiB, mmap_size is bytes, busy_timeout is ms.
+PERFORMANCE_PROFILES = {
+    # Plain sqlite3 behaviour (rollback journal, no mmap); kept for benchmarking.
+    "sqlite_defaults": {},
+    # General purpose: WAL so readers never block the writer.
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # Many concurrent dashboard sessions, occasional form submits.
+    "read_heavy_dashboard": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # setup.py / CSV loads: one writer, large transactions, durability relaxed.
+    "bulk_import": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -256000,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+    },
+}
+
+# Order matters: journal_mode must be switched before the other settings.
+_PRAGMA_ORDER = ("busy_timeout", "journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store")
+
+# Settings that write to the database file; skipped on read-only connections,
+# which use whatever journal mode the file is already in.
+_WRITE_PRAGMAS = {"journal_mode"}
+
+class PlatformConnection(sqlite3.Connection):
+    """
+    sqlite3 connection that remembers which database file it was opened on.
+
+    While it is inside changes.bulk_changes(), its transactions name each
+    domain table they write in change_feed_pause, which silences that table's
+    change_log triggers. commit() clears those rows first, so the pause is
+    never committed: every other connection, however it was opened, keeps
+    logging its writes row by row. The tables whose rows really changed are
+    collected in change_feed_skipped for bulk_changes() to mark as reloaded.
+    """
+
+    db_path = None
+    change_feed_pauses = 0      # bulk_changes() nesting depth
+    change_feed_pausing = False  # its temp triggers are installed
+    commit_data_versions = None  # data_version readings taken just before the last commit
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.change_feed_skipped = set()
+
+    def commit(self):
+        if self.change_feed_pausing and self.in_transaction:
+            self.change_feed_skipped.update(
+                row[0] for row in self.execute("SELECT table_name FROM temp.change_feed_written")
+            )
+            self.execute("DELETE FROM temp.change_feed_written")
+            self.execute("DELETE FROM main.change_feed_pause")
+        # Lets cache.note_write() tell this commit apart from other connections'.
+        self.commit_data_versions = data_versions_before_commit(self) if self.in_transaction else None
+        super().commit()
+
+def apply_profile(conn, profile=DB_PROFILE, read_only=False):
+    """
+    Apply a performance profile's PRAGMAs to a connection.
+
+    Args:
+        conn: Database connection
+        profile: Name from PERFORMANCE_PROFILES, or a dict of PRAGMA settings
+        read_only: The connection is read-only; skip PRAGMAs that write the file
+
+    Returns:
+        dict: The settings that were applied
+    """
+    if isinstance(profile, str):
+        if profile not in PERFORMANCE_PROFILES:
+            raise ValueError(
+                f"Unknown database profile '{profile}'. "
+                f"Choose one of: {', '.join(PERFORMANCE_PROFILES)}"
+            )
+        settings = PERFORMANCE_PROFILES[profile]
+    else:
+        settings = dict(profile or {})
+
+    unknown = set(settings) - set(_PRAGMA_ORDER)
+    if unknown:
+        raise ValueError(f"Unsupported PRAGMA setting(s): {', '.join(sorted(unknown))}")
+
+    for name in _PRAGMA_ORDER:
+        if name in settings and not (read_only and name in _WRITE_PRAGMAS):
+            conn.execute(f"PRAGMA {name} = {settings[name]}")
+    return settings
+
+def _ensure_math_functions(conn):
+    """
+    Register ln() and ceil() when SQLite was built without its math functions.
+    The resolution-time sketch triggers (schema.create_sketch_tables) use them.
+    """
+    try:
+        conn.execute("SELECT ln(2), ceil(0.5)").fetchone()
+    except sqlite3.OperationalError:
+        conn.create_function("ln", 1, lambda x: math.log(x) if x is not None and x > 0 else None,
+                             deterministic=True)
+        conn.create_function("ceil", 1, lambda x: math.ceil(x) if x is not None else None,
+                             deterministic=True)
+
+def connect_database(db_path=DB_PATH, profile=DB_PROFILE, read_only=False):
     """
     Connect to the SQLite database.
-    Creates the database file if it doesn't exist.
+    Creates the database file and its folder if they don't exist (unless read_only).
 
     Args:
         db_path: Path to the database file
+        profile: Performance profile to apply (see PERFORMANCE_PROFILES)
+        read_only: Open with mode=ro, so any write raises sqlite3.OperationalError
 
     Returns:
         sqlite3.Connection: Database connection object
     """
-    return sqlite3.connect(str(db_path))
\ No newline at end of file
+    if read_only:
+        uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, factory=PlatformConnection, check_same_thread=False)
+    else:
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(db_path), factory=PlatformConnection, check_same_thread=False)
+    conn.db_path = str(db_path)
+    apply_profile(conn, profile, read_only)
+    _ensure_math_functions(conn)
+    return conn
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    """Raised when no pooled connection becomes free within the timeout."""
+
+class ConnectionPool:
+    """
+    Bounded pool of reusable SQLite connections.
+
+    A thread that already holds a connection gets the same one back on nested
+    checkouts, so helpers can open their own `with pool.connection()` block
+    without pinning a second connection. Connections go back to the pool when
+    the outermost block exits and are only closed by `close_all()`.
+    """
+
+    def __init__(self, db_path=DB_PATH, max_size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT, profile=DB_PROFILE,
+                 read_only=False):
+        self.db_path = str(db_path)
+        self.profile = profile
+        self.read_only = read_only
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = LifoQueue()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._open = 0
+        self._stats = {"checkouts": 0, "reuses": 0, "waits": 0, "wait_time": 0.0, "timeouts": 0}
+
+    def _create(self):
+        return connect_database(self.db_path, self.profile, self.read_only)
+
+    def _acquire(self):
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self._stats["reuses"] += 1
+            return conn
+        except Empty:
+            pass
+
+        with self._lock:
+            if self._open < self.max_size:
+                self._open += 1
+                create = True
+            else:
+                self._stats["waits"] += 1
+                create = False
+
+        if create:
+            try:
+                return self._create()
+            except Exception:
+                with self._lock:
+                    self._open -= 1
+                raise
+
+        started = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except Empty:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise PoolTimeoutError(
+                f"No database connection free after {self.timeout}s (pool size {self.max_size})"
+            )
+        with self._lock:
+            self._stats["wait_time"] += time.perf_counter() - started
+            self._stats["reuses"] += 1
+        return conn
+
+    def _release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Check out a connection for the current thread.
+
+        Yields:
+            sqlite3.Connection: Pooled connection, returned to the pool on exit
+        """
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            self._local.depth += 1
+            with self._lock:
+                self._stats["checkouts"] += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        with self._lock:
+            self._stats["checkouts"] += 1
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn)
+
+    def stats(self):
+        """
+        Snapshot of pool usage counters.
+
+        Returns:
+            dict: checkouts, reuses, waits, wait_time, timeouts, open, idle, in_use, max_size
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["open"] = self._open
+        snapshot["idle"] = self._idle.qsize()
+        snapshot["in_use"] = snapshot["open"] - snapshot["idle"]
+        snapshot["max_size"] = self.max_size
+        return snapshot
+
+    def close_all(self):
+        """Close every idle connection (e.g. at shutdown or between tests)."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._open -= 1
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_path=DB_PATH, profile=DB_PROFILE, read_only=False):
+    """
+    Return the process-wide pool for a database file and profile, creating it on first use.
+
+    Args:
+        db_path: Path to the database file
+        profile: Name of the performance profile its connections use
+        read_only: Pool of read-only connections (kept apart from the read-write pool)
+
+    Returns:
+        ConnectionPool: Shared pool for that file
+    """
+    key = (str(db_path), profile, read_only)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(key[0], profile=profile, read_only=read_only)
+            _pools[key] = pool
+        return pool
+
+def get_connection(db_path=DB_PATH, profile=DB_PROFILE, read_only=False):
+    """
+    Check out a pooled connection.
+
+    Usage:
+        with get_connection() as conn:
+            ...
+
+    Args:
+        db_path: Path to the database file
+        profile: Performance profile (e.g. "bulk_import" for loaders)
+        read_only: Check out a read-only connection (e.g. for background loaders)
+
+    Returns:
+        Context manager yielding a sqlite3.Connection
+    """
+    return get_pool(db_path, profile, read_only).connection()
+
+def get_pool_stats(db_path=DB_PATH, profile=DB_PROFILE, read_only=False):
+    """Return usage counters for the pool of the given database file."""
+    return get_pool(db_path, profile, read_only).stats()
@@ -1,5 +1,10 @@
 import pandas as pd
-from app.data.db import connect_database
+from app.data.cache import note_write
+from app.data.pagination import fetch_keyset_page
+from app.data.search import search_table
+from app.data.timeutil import fetch_time_range, count_by_time_bucket
+
+INCIDENT_COLUMNS = ["incident_id", "timestamp", "severity", "category", "status", "description"]
 
 def insert_incident(conn, incident_id, timestamp, severity, category, status, description):
     """
@@ -26,8 +31,10 @@ def insert_incident(conn, incident_id, timestamp, severity, category, status, de
     """
     cursor.execute(query, (incident_id, timestamp, severity, category, status, description))
     conn.commit()
+    note_write(conn, "cyber_incidents")
 
-    return incident_id  # since incident_id is the primary key
+    # incident_id is the primary key; None lets SQLite assign the next one
+    return incident_id if incident_id is not None else cursor.lastrowid
 
 def get_all_incidents(conn):
     """
@@ -42,6 +49,66 @@ def get_all_incidents(conn):
     df = pd.read_sql_query("SELECT * FROM cyber_incidents ORDER BY incident_id DESC", conn)
     return df
 
+def get_incidents_page(conn, page_size=50, cursor=None, descending=True):
+    """
+    Retrieve one page of incidents ordered by time (timestamp_epoch), then incident_id.
+
+    Args:
+        conn: Database connection
+        page_size: Number of incidents per page
+        cursor: Cursor returned with the previous page, or None for the first page
+        descending: Newest first when True
+
+    Returns:
+        tuple: (pandas.DataFrame page, next cursor or None when no more rows)
+    """
+    return fetch_keyset_page(
+        conn, "cyber_incidents", INCIDENT_COLUMNS, "timestamp_epoch", "incident_id",
+        page_size=page_size, cursor=cursor, descending=descending
+    )
+
+def get_incidents_between(conn, start=None, end=None, limit=None, descending=False):
+    """
+    Retrieve incidents that occurred in [start, end), using the timestamp_epoch index.
+
+    Args:
+        conn: Database connection
+        start: Inclusive start (date, datetime, ISO string or epoch seconds), or None
+        end: Exclusive end, or None
+        limit: Maximum number of incidents, or None for all
+        descending: Newest first when True
+
+    Returns:
+        pandas.DataFrame: Incidents in time order
+    """
+    return fetch_time_range(
+        conn, "cyber_incidents", INCIDENT_COLUMNS, "timestamp_epoch", start, end, limit, descending
+    )
+
+def count_incidents_by_period(conn, start=None, end=None, bucket="day"):
+    """
+    Count incidents per hour/day/week in [start, end).
+
+    Returns:
+        pandas.DataFrame: bucket_start, count
+    """
+    return count_by_time_bucket(conn, "cyber_incidents", "timestamp_epoch", start, end, bucket)
+
+def search_incidents(conn, term, limit=100, prefix=True):
+    """
+    Full-text search over incidents, best match first.
+
+    Args:
+        conn: Database connection
+        term: Search text (every word must match)
+        limit: Maximum number of incidents to return
+        prefix: Match word prefixes ("phish" finds "Phishing")
+
+    Returns:
+        pandas.DataFrame: Matching incidents
+    """
+    return search_table(conn, "cyber_incidents", INCIDENT_COLUMNS, term, limit, prefix)
+
 def update_incident_status(conn, incident_id, new_status):
     """
     Update the status of an incident.
@@ -59,6 +126,7 @@ def update_incident_status(conn, incident_id, new_status):
     query = "UPDATE cyber_incidents SET status = ? WHERE incident_id = ?"
     cursor.execute(query, (new_status, incident_id))
     conn.commit()
+    note_write(conn, "cyber_incidents")
 
     return cursor.rowcount
 
@@ -78,5 +146,6 @@ def delete_incident(conn, incident_id):
     query = "DELETE FROM cyber_incidents WHERE incident_id = ?"
     cursor.execute(query, (incident_id,))
     conn.commit()
+    note_write(conn, "cyber_incidents")
 
     return cursor.rowcount
\ No newline at end of file
@@ -0,0 +1,68 @@
+import pandas as pd
+
+def fetch_keyset_page(conn, table, columns, order_column, key_column,
+                      page_size=50, cursor=None, descending=True):
+    """
+    Fetch one page of rows using keyset (seek) pagination.
+
+    Rows are ordered by (order_column, key_column) and the next page starts
+    strictly after the cursor, so every page is an index range scan of
+    page_size rows no matter how deep the reader has scrolled. Rows whose
+    order_column is NULL come last when descending and first when ascending
+    (SQLite's NULL ordering); they are read as their own range by key, since
+    a row-value comparison with NULL never matches.
+
+    Args:
+        conn: Database connection
+        table: Table name
+        columns: List of columns to return
+        order_column: Sort column (e.g. timestamp)
+        key_column: Unique tie-breaker (primary key or rowid)
+        page_size: Number of rows per page
+        cursor: (order_value, key_value) of the last row already shown, or None;
+            order_value is None when that row had no order value
+        descending: Newest/highest first when True
+
+    Returns:
+        tuple: (pandas.DataFrame page, next cursor or None when there are no more rows)
+    """
+    direction = "DESC" if descending else "ASC"
+    comparison = "<" if descending else ">"
+
+    # Ranges to read in order until the page is full: (WHERE condition, params).
+    if cursor is None:
+        ranges = [(None, [])]
+    elif cursor[0] is None:
+        ranges = [(f"{order_column} IS NULL AND {key_column} {comparison} ?", [cursor[1]])]
+        if not descending:
+            ranges.append((f"{order_column} IS NOT NULL", []))
+    else:
+        ranges = [(f"({order_column}, {key_column}) {comparison} (?, ?)", list(cursor))]
+        if descending:
+            ranges.append((f"{order_column} IS NULL", []))
+
+    select = f"SELECT {', '.join(columns)}, {order_column} AS _cursor_order, {key_column} AS _cursor_key FROM {table}"
+    frames = []
+    wanted = page_size + 1
+    for condition, params in ranges:
+        query = select + (f" WHERE {condition}" if condition else "")
+        query += f" ORDER BY {order_column} {direction}, {key_column} {direction} LIMIT ?"
+        frame = pd.read_sql_query(query, conn, params=params + [wanted])
+        if len(frame):
+            frames.append(frame)
+        wanted -= len(frame)
+        if wanted <= 0:
+            break
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else (frames[0] if frames else frame)
+
+    next_cursor = None
+    if len(df) > page_size:
+        df = df.iloc[:page_size]
+        last = df.iloc[-1]
+        order_value = last["_cursor_order"]
+        if pd.isna(order_value):
+            order_value = None
+        elif hasattr(order_value, "item"):  # numpy scalar -> plain Python for sqlite3
+            order_value = order_value.item()
+        next_cursor = (order_value, int(last["_cursor_key"]))
+    return df.drop(columns=["_cursor_order", "_cursor_key"]), next_cursor
@@ -1,3 +1,4 @@
+import math
 import sqlite3
 from config import DB_PATH
 
@@ -73,9 +74,517 @@ def create_it_tickets_table(conn):
     conn.commit()
     print("✅ it_tickets table created successfully!")
 
+# Secondary indexes for the analytic queries and the pages' ORDER BY clauses.
+# Each GROUP BY / WHERE column leads its own index so SQLite can answer the
+# aggregate from the index alone instead of scanning and sorting the table.
+INDEXES = {
+    "idx_incidents_category": "cyber_incidents (category)",
+    "idx_incidents_severity_status": "cyber_incidents (severity, status)",
+    "idx_incidents_status": "cyber_incidents (status)",
+    "idx_incidents_timestamp": "cyber_incidents (timestamp)",
+    "idx_datasets_uploaded_by": "datasets_metadata (uploaded_by, rows)",
+    "idx_datasets_rows": "datasets_metadata (rows, name, columns)",
+    "idx_datasets_upload_date": "datasets_metadata (upload_date)",
+    "idx_tickets_status": "it_tickets (status, resolution_time_hours)",
+    "idx_tickets_assigned_to": "it_tickets (assigned_to)",
+    "idx_tickets_resolution_time": "it_tickets (resolution_time_hours)",
+    "idx_tickets_created_at": "it_tickets (created_at)",
+    "idx_incidents_timestamp_epoch": "cyber_incidents (timestamp_epoch)",
+    "idx_tickets_created_at_epoch": "it_tickets (created_at_epoch)",
+}
+
+# Integer Unix-epoch copies of the free-form TEXT timestamps
+# ("2024-04-12 19:00:00.000000" from CSVs, "2024-04-12" from the forms).
+# table -> (source text column, epoch column). Kept in sync by triggers.
+EPOCH_COLUMNS = {
+    "cyber_incidents": ("timestamp", "timestamp_epoch"),
+    "it_tickets": ("created_at", "created_at_epoch"),
+}
+
+def add_epoch_columns(conn):
+    """
+    Add, populate and keep up to date the integer epoch timestamp columns.
+
+    Idempotent migration: adds each missing column, creates the triggers that
+    set it on INSERT and when the source column is updated, and backfills rows
+    that have no epoch yet. Unparseable timestamps are left NULL.
+    """
+    cursor = conn.cursor()
+    for table, (source, epoch) in EPOCH_COLUMNS.items():
+        existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        if epoch not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {epoch} INTEGER")
+
+        to_epoch = f"CAST(strftime('%s', NEW.{source}) AS INTEGER)"
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_{epoch}_ai AFTER INSERT ON {table} BEGIN
+                UPDATE {table} SET {epoch} = {to_epoch} WHERE rowid = NEW.rowid;
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_{epoch}_au AFTER UPDATE OF {source} ON {table} BEGIN
+                UPDATE {table} SET {epoch} = {to_epoch} WHERE rowid = NEW.rowid;
+            END
+        """)
+        cursor.execute(f"""
+            UPDATE {table} SET {epoch} = CAST(strftime('%s', {source}) AS INTEGER)
+            WHERE {epoch} IS NULL AND {source} IS NOT NULL
+        """)
+    conn.commit()
+    print(f"✅ {len(EPOCH_COLUMNS)} epoch timestamp columns ready!")
+
+def create_indexes(conn):
+    """
+    Create the secondary indexes used by the analytic queries.
+    """
+    cursor = conn.cursor()
+    for name, target in INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+    conn.commit()
+    print(f"✅ {len(INDEXES)} indexes created successfully!")
+
+# FTS5 full-text indexes over the domain tables. They are external-content
+# tables (the text lives only in the base table) kept in sync by triggers.
+# "key" is the base-table column used as the FTS rowid.
+SEARCH_TABLES = {
+    "cyber_incidents": {
+        "fts": "cyber_incidents_fts",
+        "key": "incident_id",
+        "columns": ["incident_id", "timestamp", "severity", "category", "status", "description"],
+    },
+    "datasets_metadata": {
+        "fts": "datasets_metadata_fts",
+        "key": "dataset_id",
+        "columns": ["dataset_id", "name", "uploaded_by", "upload_date"],
+    },
+    "it_tickets": {
+        "fts": "it_tickets_fts",
+        "key": "rowid",
+        "columns": ["ticket_id", "priority", "description", "status", "assigned_to", "created_at"],
+    },
+}
+
+def create_search_tables(conn):
+    """
+    Create the FTS5 search tables and the triggers that keep them in sync.
+    A newly created search table is populated from its base table.
+    """
+    cursor = conn.cursor()
+    for table, spec in SEARCH_TABLES.items():
+        fts, key, columns = spec["fts"], spec["key"], spec["columns"]
+        cols = ", ".join(columns)
+        new_vals = ", ".join(f"new.{c}" for c in columns)
+        old_vals = ", ".join(f"old.{c}" for c in columns)
+
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)
+        ).fetchone()
+
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {cols},
+                content='{table}',
+                content_rowid='{key}',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            )
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts} (rowid, {cols}) VALUES (new.{key}, {new_vals});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', old.{key}, {old_vals});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', old.{key}, {old_vals});
+                INSERT INTO {fts} (rowid, {cols}) VALUES (new.{key}, {new_vals});
+            END
+        """)
+
+        if not exists:
+            cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+    conn.commit()
+    print(f"✅ {len(SEARCH_TABLES)} search tables created successfully!")
+
+# Pre-aggregated counts for the dashboard charts, kept current by triggers on
+# the base tables. "{row}" in an expression is replaced by NEW, OLD or the
+# table name. Dimensions are stored with NULL as '' so they can be keys.
+ROLLUP_TABLES = {
+    "incident_rollup_daily": {
+        "source": "cyber_incidents",
+        "watch": ["timestamp", "category", "severity", "status"],
+        "dimensions": {
+            "day": "date({row}.timestamp)",
+            "category": "{row}.category",
+            "severity": "{row}.severity",
+            "status": "{row}.status",
+        },
+        "measures": {},
+    },
+    "ticket_rollup_daily": {
+        "source": "it_tickets",
+        "watch": ["created_at", "status", "assigned_to", "priority", "resolution_time_hours"],
+        "dimensions": {
+            "day": "date({row}.created_at)",
+            "status": "{row}.status",
+            "assigned_to": "{row}.assigned_to",
+            "priority": "{row}.priority",
+        },
+        "measures": {
+            "resolution_hours_sum": "COALESCE({row}.resolution_time_hours, 0)",
+            "resolution_count": "({row}.resolution_time_hours IS NOT NULL)",
+        },
+    },
+    # Tickets closed per day: created_at + resolution_time_hours, for Resolved or
+    # Closed tickets with a resolution time. Other tickets get day '' and are
+    # skipped by the readers, like rows with no timestamp.
+    "ticket_closed_rollup_daily": {
+        "source": "it_tickets",
+        "watch": ["created_at", "status", "assigned_to", "priority", "resolution_time_hours"],
+        "dimensions": {
+            "day": (
+                "CASE WHEN {row}.status IN ('Resolved', 'Closed') AND {row}.resolution_time_hours IS NOT NULL "
+                "THEN date(CAST(strftime('%s', {row}.created_at) AS INTEGER) "
+                "+ CAST({row}.resolution_time_hours * 3600 AS INTEGER), 'unixepoch') END"
+            ),
+            "assigned_to": "{row}.assigned_to",
+            "priority": "{row}.priority",
+        },
+        "measures": {},
+    },
+    "dataset_rollup_uploader": {
+        "source": "datasets_metadata",
+        "watch": ["uploaded_by", "rows"],
+        "dimensions": {
+            "uploaded_by": "{row}.uploaded_by",
+        },
+        "measures": {
+            "rows_sum": "COALESCE({row}.rows, 0)",
+        },
+    },
+}
+
+def _rollup_values(spec, row):
+    dims = [f"COALESCE({expr.format(row=row)}, '')" for expr in spec["dimensions"].values()]
+    measures = [expr.format(row=row) for expr in spec["measures"].values()]
+    return dims, measures
+
+def _rollup_add_sql(rollup, spec, row):
+    dims, measures = _rollup_values(spec, row)
+    columns = list(spec["dimensions"]) + ["count"] + list(spec["measures"])
+    updates = ["count = count + 1"] + [f"{m} = {m} + excluded.{m}" for m in spec["measures"]]
+    return (
+        f"INSERT INTO {rollup} ({', '.join(columns)}) VALUES ({', '.join(dims + ['1'] + measures)}) "
+        f"ON CONFLICT ({', '.join(spec['dimensions'])}) DO UPDATE SET {', '.join(updates)};"
+    )
+
+def _rollup_remove_sql(rollup, spec, row):
+    dims, measures = _rollup_values(spec, row)
+    match = " AND ".join(f"{name} = {value}" for name, value in zip(spec["dimensions"], dims))
+    updates = ["count = count - 1"] + [f"{m} = {m} - {value}" for m, value in zip(spec["measures"], measures)]
+    return (
+        f"UPDATE {rollup} SET {', '.join(updates)} WHERE {match};\n"
+        f"DELETE FROM {rollup} WHERE {match} AND count <= 0;"
+    )
+
+def rebuild_rollups(conn, rollups=None):
+    """
+    Recompute rollup tables from their base tables (backfill or repair).
+
+    Args:
+        conn: Database connection
+        rollups: Names of rollup tables to rebuild (default: all)
+    """
+    cursor = conn.cursor()
+    for rollup in rollups or ROLLUP_TABLES:
+        spec = ROLLUP_TABLES[rollup]
+        dims, measures = _rollup_values(spec, spec["source"])
+        columns = list(spec["dimensions"]) + ["count"] + list(spec["measures"])
+        selects = dims + ["COUNT(*)"] + [f"SUM({m})" for m in measures]
+        cursor.execute(f"DELETE FROM {rollup}")
+        cursor.execute(f"""
+            INSERT INTO {rollup} ({', '.join(columns)})
+            SELECT {', '.join(selects)} FROM {spec['source']}
+            GROUP BY {', '.join(str(i + 1) for i in range(len(dims)))}
+        """)
+    conn.commit()
+
+def create_rollup_tables(conn):
+    """
+    Create the rollup tables and the INSERT/UPDATE/DELETE triggers that maintain them.
+    A newly created rollup table is backfilled from its base table.
+    """
+    cursor = conn.cursor()
+    created = []
+    for rollup, spec in ROLLUP_TABLES.items():
+        source = spec["source"]
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (rollup,)
+        ).fetchone()
+
+        dimension_defs = [f"{name} TEXT NOT NULL" for name in spec["dimensions"]]
+        measure_defs = [f"{name} REAL NOT NULL DEFAULT 0" for name in spec["measures"]]
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {rollup} (
+                {', '.join(dimension_defs)},
+                count INTEGER NOT NULL DEFAULT 0,
+                {''.join(d + ', ' for d in measure_defs)}PRIMARY KEY ({', '.join(spec['dimensions'])})
+            ) WITHOUT ROWID
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {rollup}_ai AFTER INSERT ON {source} BEGIN
+                {_rollup_add_sql(rollup, spec, "NEW")}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {rollup}_ad AFTER DELETE ON {source} BEGIN
+                {_rollup_remove_sql(rollup, spec, "OLD")}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {rollup}_au AFTER UPDATE OF {', '.join(spec['watch'])} ON {source} BEGIN
+                {_rollup_remove_sql(rollup, spec, "OLD")}
+                {_rollup_add_sql(rollup, spec, "NEW")}
+            END
+        """)
+        if not exists:
+            created.append(rollup)
+    conn.commit()
+    if created:
+        rebuild_rollups(conn, created)
+    print(f"✅ {len(ROLLUP_TABLES)} rollup tables created successfully!")
+
+# Resolution-time quantile sketch: a DDSketch-style histogram whose bucket i
+# holds values in (gamma^(i-1), gamma^i]. Any quantile read from it is within
+# SKETCH_RELATIVE_ACCURACY of the true value, buckets from different keys
+# merge by adding counts, and unlike t-digest/KLL it supports deletes, so SQL
+# triggers can keep it exact under INSERT/UPDATE/DELETE. Changing the accuracy
+# needs rebuild_sketches().
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+SKETCH_ZERO_BUCKET = -1_000_000   # holds resolution times <= 0
+SKETCH_DIMENSIONS = ["assigned_to", "priority", "status"]   # plus "overall"
+
+def _sketch_bucket_sql(value):
+    return (
+        f"CASE WHEN {value} <= 0 THEN {SKETCH_ZERO_BUCKET} "
+        f"ELSE CAST(ceil(ln({value}) / {math.log(SKETCH_GAMMA)!r}) AS INTEGER) END"
+    )
+
+def _sketch_keys_sql(row):
+    keys = ["('overall', '')"] + [f"('{d}', COALESCE({row}.{d}, ''))" for d in SKETCH_DIMENSIONS]
+    return f"(VALUES {', '.join(keys)})"
+
+def _sketch_add_sql(row):
+    return (
+        f"INSERT INTO ticket_resolution_sketch (dimension, key, bucket, count) "
+        f"SELECT column1, column2, {_sketch_bucket_sql(row + '.resolution_time_hours')}, 1 "
+        f"FROM {_sketch_keys_sql(row)} WHERE {row}.resolution_time_hours IS NOT NULL "
+        f"ON CONFLICT (dimension, key, bucket) DO UPDATE SET count = count + 1;"
+    )
+
+def _sketch_remove_sql(row):
+    match = (
+        f"{row}.resolution_time_hours IS NOT NULL "
+        f"AND bucket = {_sketch_bucket_sql(row + '.resolution_time_hours')} "
+        f"AND (dimension, key) IN {_sketch_keys_sql(row)}"
+    )
+    return (
+        f"UPDATE ticket_resolution_sketch SET count = count - 1 WHERE {match};\n"
+        f"DELETE FROM ticket_resolution_sketch WHERE {match} AND count <= 0;"
+    )
+
+def rebuild_sketches(conn):
+    """Recompute the resolution-time sketch from it_tickets (backfill or repair)."""
+    bucket = _sketch_bucket_sql("resolution_time_hours")
+    keys = [("'overall'", "''")] + [(f"'{d}'", f"COALESCE({d}, '')") for d in SKETCH_DIMENSIONS]
+    selects = [
+        f"SELECT {dimension} AS dimension, {key} AS key, {bucket} AS bucket "
+        f"FROM it_tickets WHERE resolution_time_hours IS NOT NULL"
+        for dimension, key in keys
+    ]
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM ticket_resolution_sketch")
+    cursor.execute(f"""
+        INSERT INTO ticket_resolution_sketch (dimension, key, bucket, count)
+        SELECT dimension, key, bucket, COUNT(*) FROM (
+            {' UNION ALL '.join(selects)}
+        )
+        GROUP BY dimension, key, bucket
+    """)
+    conn.commit()
+
+def create_sketch_tables(conn):
+    """
+    Create the resolution-time sketch table and the triggers that maintain it.
+    A newly created sketch is backfilled from it_tickets.
+    """
+    cursor = conn.cursor()
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ticket_resolution_sketch'"
+    ).fetchone()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ticket_resolution_sketch (
+            dimension TEXT NOT NULL,
+            key TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dimension, key, bucket)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS ticket_resolution_sketch_ai AFTER INSERT ON it_tickets BEGIN
+            {_sketch_add_sql("NEW")}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS ticket_resolution_sketch_ad AFTER DELETE ON it_tickets BEGIN
+            {_sketch_remove_sql("OLD")}
+        END
+    """)
+    watched = ", ".join(["resolution_time_hours"] + SKETCH_DIMENSIONS)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS ticket_resolution_sketch_au AFTER UPDATE OF {watched} ON it_tickets BEGIN
+            {_sketch_remove_sql("OLD")}
+            {_sketch_add_sql("NEW")}
+        END
+    """)
+    conn.commit()
+    if not exists:
+        rebuild_sketches(conn)
+    print("✅ Resolution-time sketch created successfully!")
+
+# Change data feed: every insert, update and delete on the domain tables is
+# appended to change_log with the row's old/new values as JSON, so a session
+# can ask for "changes since version N" and patch what it already holds.
+# Bulk loaders pause the per-row entries for their own connection and log one
+# 'R' (reload) entry per table they wrote instead: the triggers skip a table
+# named in change_feed_pause, which only ever holds rows inside a bulk
+# loader's own uncommitted transaction (see changes.bulk_changes), so any
+# connection, including the sqlite3 shell, can write to the domain tables.
+CHANGE_FEED_TABLES = {
+    "cyber_incidents": ["incident_id", "timestamp", "severity", "category", "status", "description"],
+    "datasets_metadata": ["dataset_id", "name", "rows", "columns", "uploaded_by", "upload_date"],
+    "it_tickets": ["ticket_id", "priority", "description", "status", "assigned_to", "created_at",
+                   "resolution_time_hours"],
+}
+
+def _change_json(row, columns):
+    return "json_object(" + ", ".join(f"'{c}', {row}.{c}" for c in columns) + ")"
+
+def create_change_log_table(conn):
+    """
+    Create the append-only change_log table and the triggers that fill it.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS change_log (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            op TEXT NOT NULL CHECK (op IN ('I', 'U', 'D', 'R')),
+            row_key INTEGER,
+            old_values TEXT,
+            new_values TEXT,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_change_log_table ON change_log (table_name, version)")
+
+    cursor.execute("CREATE TABLE IF NOT EXISTS change_feed_pause (table_name TEXT PRIMARY KEY) WITHOUT ROWID")
+    cursor.execute("DELETE FROM change_feed_pause")
+
+    # The triggers are always recreated, replacing older ones that read a
+    # database-wide pause flag from the change_feed_control table.
+    for table, columns in CHANGE_FEED_TABLES.items():
+        active = f"NOT EXISTS (SELECT 1 FROM change_feed_pause WHERE table_name = '{table}')"
+        insert = "INSERT INTO change_log (table_name, op, row_key, old_values, new_values)"
+        for suffix in ("ai", "au", "ad"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {table}_changes_{suffix}")
+        cursor.execute(f"""
+            CREATE TRIGGER {table}_changes_ai AFTER INSERT ON {table} WHEN {active} BEGIN
+                {insert} VALUES ('{table}', 'I', NEW.rowid, NULL, {_change_json("NEW", columns)});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER {table}_changes_au AFTER UPDATE OF {', '.join(columns)} ON {table}
+            WHEN {active} BEGIN
+                {insert} VALUES ('{table}', 'U', NEW.rowid,
+                                 {_change_json("OLD", columns)}, {_change_json("NEW", columns)});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER {table}_changes_ad AFTER DELETE ON {table} WHEN {active} BEGIN
+                {insert} VALUES ('{table}', 'D', OLD.rowid, {_change_json("OLD", columns)}, NULL);
+            END
+        """)
+    cursor.execute("DROP TABLE IF EXISTS change_feed_control")
+    conn.commit()
+    print("✅ Change log created successfully!")
+
+def create_import_checkpoints_table(conn):
+    """
+    Create the import_checkpoints table used to resume streaming CSV loads.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS import_checkpoints (
+            source TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            rows_committed INTEGER NOT NULL DEFAULT 0,
+            file_size INTEGER,
+            file_mtime REAL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (source, table_name)
+        )
+    """)
+    conn.commit()
+
+# Natural key of each CSV-backed table; incremental imports upsert on it.
+IMPORT_KEYS = {
+    "cyber_incidents": "incident_id",
+    "datasets_metadata": "dataset_id",
+    "it_tickets": "ticket_id",
+}
+
+def create_import_watermarks_table(conn):
+    """
+    Create the import_watermarks table used by incremental CSV syncs.
+
+    One row per source file: the checksum and size of the file as last synced
+    and the highest key seen, so unchanged files are skipped and files that
+    only grew are read from where the previous sync stopped.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS import_watermarks (
+            source TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            checksum TEXT NOT NULL,
+            file_size INTEGER NOT NULL,
+            high_water_mark TEXT,
+            rows_synced INTEGER NOT NULL DEFAULT 0,
+            synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (source, table_name)
+        )
+    """)
+    conn.commit()
+
 def create_all_tables(conn):
     """Create all tables."""
     create_users_table(conn)
     create_cyber_incidents_table(conn)
     create_datasets_metadata_table(conn)
-    create_it_tickets_table(conn)
\ No newline at end of file
+    create_it_tickets_table(conn)
+    create_import_checkpoints_table(conn)
+    create_import_watermarks_table(conn)
+    add_epoch_columns(conn)
+    create_indexes(conn)
+    create_search_tables(conn)
+    create_rollup_tables(conn)
+    create_sketch_tables(conn)
+    create_change_log_table(conn)
\ No newline at end of file
@@ -0,0 +1,66 @@
+import re
+import pandas as pd
+from app.data.schema import SEARCH_TABLES
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+def build_match_expression(term, prefix=True):
+    """
+    Turn free text from a search box into an FTS5 MATCH expression.
+
+    Every word must match (implicit AND); each word is quoted so FTS5 syntax
+    characters typed by the user are treated as text.
+
+    Args:
+        term: Raw search text
+        prefix: Match words that start with each term ("mal" finds "Malware")
+
+    Returns:
+        str: MATCH expression, or "" when the term has no searchable words
+    """
+    words = _TOKEN.findall(term or "")
+    suffix = "*" if prefix else ""
+    return " ".join(f'"{word}"{suffix}' for word in words)
+
+def build_search_query(table, columns, term, limit=100, prefix=True):
+    """
+    Build the SQL for a ranked full-text search over a domain table.
+
+    Args:
+        table: Base table name (a key of SEARCH_TABLES)
+        columns: Base-table columns to return
+        term: Raw search text
+        limit: Maximum rows to return (None for no limit)
+        prefix: Enable prefix matching
+
+    Returns:
+        tuple: (sql, params), or (None, None) when the term has no searchable words
+    """
+    expression = build_match_expression(term, prefix)
+    if not expression:
+        return None, None
+
+    spec = SEARCH_TABLES[table]
+    select = ", ".join(f"t.{c}" for c in columns)
+    sql = (
+        f"SELECT {select} FROM {spec['fts']} f "
+        f"JOIN {table} t ON t.{spec['key']} = f.rowid "
+        f"WHERE {spec['fts']} MATCH ? ORDER BY f.rank"
+    )
+    params = [expression]
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql, params
+
+def search_table(conn, table, columns, term, limit=100, prefix=True):
+    """
+    Run a ranked full-text search (best BM25 match first).
+
+    Returns:
+        pandas.DataFrame: Matching rows (empty if nothing matches)
+    """
+    sql, params = build_search_query(table, columns, term, limit, prefix)
+    if sql is None:
+        return pd.DataFrame(columns=columns)
+    return pd.read_sql_query(sql, conn, params=params)
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+from app.data.cache import cached_query
+from app.data.schema import SKETCH_GAMMA, SKETCH_ZERO_BUCKET, SKETCH_DIMENSIONS
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+# ---------- Sketch maths ----------
+# A sketch is {bucket: count}. Its size is bounded by the spread of the values
+# (about 700 buckets from one minute to a year at 1% accuracy), not by the
+# number of tickets, so every query below runs in constant time.
+
+def bucket_value(bucket):
+    """Representative value of a bucket (within the relative accuracy of anything in it)."""
+    if bucket == SKETCH_ZERO_BUCKET:
+        return 0.0
+    return 2 * SKETCH_GAMMA ** bucket / (SKETCH_GAMMA + 1)
+
+def merge_sketches(*sketches):
+    """Merge sketches (e.g. two assignees) by adding their bucket counts."""
+    merged = {}
+    for sketch in sketches:
+        for bucket, count in sketch.items():
+            merged[bucket] = merged.get(bucket, 0) + count
+    return merged
+
+def sketch_quantiles(sketch, quantiles=DEFAULT_QUANTILES):
+    """
+    Estimate quantiles from a sketch.
+
+    Args:
+        sketch: {bucket: count}
+        quantiles: Quantiles in [0, 1]
+
+    Returns:
+        dict: {quantile: value or None when the sketch is empty}
+    """
+    buckets = sorted(b for b, c in sketch.items() if c > 0)
+    if not buckets:
+        return {q: None for q in quantiles}
+    cumulative = np.cumsum([sketch[b] for b in buckets])
+    total = cumulative[-1]
+    result = {}
+    for q in quantiles:
+        index = int(np.searchsorted(cumulative, q * (total - 1), side="right"))
+        result[q] = bucket_value(buckets[min(index, len(buckets) - 1)])
+    return result
+
+def _label(q):
+    return f"p{q * 100:g}"
+
+# ---------- Queries ----------
+
+def load_sketch(conn, dimension="overall", keys=None):
+    """
+    Read a sketch from ticket_resolution_sketch, merging several keys if asked.
+
+    Args:
+        conn: Database connection
+        dimension: "overall", "assigned_to", "priority" or "status"
+        keys: A key or list of keys of that dimension (None: all keys merged)
+
+    Returns:
+        dict: {bucket: count}
+    """
+    query = "SELECT bucket, SUM(count) FROM ticket_resolution_sketch WHERE dimension = ?"
+    params = [dimension]
+    if keys is not None:
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        query += f" AND key IN ({', '.join('?' for _ in keys)})"
+        params.extend(keys)
+    query += " GROUP BY bucket"
+    return dict(conn.execute(query, params).fetchall())
+
+@cached_query("it_tickets")
+def get_resolution_percentiles(conn, dimension="overall", key=None, quantiles=DEFAULT_QUANTILES):
+    """
+    Resolution-time percentiles for all tickets or one assignee/priority/status.
+    Uses: SELECT, FROM, WHERE, SUM, GROUP BY (on the sketch, not on it_tickets)
+
+    Args:
+        conn: Database connection
+        dimension: "overall", "assigned_to", "priority" or "status"
+        key: Value of the dimension (e.g. "IT_Support_A"), or None for all merged
+        quantiles: Quantiles to estimate
+
+    Returns:
+        dict: count, and p50/p90/p99 (hours, None when there are no tickets)
+    """
+    sketch = load_sketch(conn, dimension, key)
+    result = {"count": int(sum(sketch.values()))}
+    for q, value in sketch_quantiles(sketch, quantiles).items():
+        result[_label(q)] = value
+    return result
+
+@cached_query("it_tickets")
+def get_resolution_percentiles_by(conn, dimension, quantiles=DEFAULT_QUANTILES):
+    """
+    Resolution-time percentiles for every assignee, priority or status.
+    Uses: SELECT, FROM, WHERE, ORDER BY + numpy cumulative sums
+
+    Args:
+        conn: Database connection
+        dimension: "assigned_to", "priority" or "status"
+        quantiles: Quantiles to estimate
+
+    Returns:
+        pandas.DataFrame: <dimension>, count, p50, p90, p99 (busiest first)
+    """
+    if dimension not in SKETCH_DIMENSIONS:
+        raise ValueError(f"Unknown dimension '{dimension}'. Choose from: {', '.join(SKETCH_DIMENSIONS)}")
+
+    rows = conn.execute(
+        "SELECT key, bucket, count FROM ticket_resolution_sketch WHERE dimension = ? ORDER BY key, bucket",
+        (dimension,)
+    ).fetchall()
+    sketches = {}
+    for key, bucket, count in rows:
+        sketches.setdefault(key, {})[bucket] = count
+
+    records = []
+    for key, sketch in sketches.items():
+        record = {dimension: key or None, "count": int(sum(sketch.values()))}
+        for q, value in sketch_quantiles(sketch, quantiles).items():
+            record[_label(q)] = value
+        records.append(record)
+    columns = [dimension, "count"] + [_label(q) for q in quantiles]
+    return pd.DataFrame(records, columns=columns).sort_values("count", ascending=False, ignore_index=True)
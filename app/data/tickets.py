@@ -1,4 +1,12 @@
 import pandas as pd
+from app.data.cache import note_write
+from app.data.pagination import fetch_keyset_page
+from app.data.search import search_table
+from app.data.timeutil import fetch_time_range, count_by_time_bucket
+
+TICKET_COLUMNS = [
+    "ticket_id", "priority", "description", "status", "assigned_to", "created_at", "resolution_time_hours"
+]
 
 def insert_ticket(conn, ticket_id, priority, description, status, assigned_to, created_at, resolution_time_hours):
     """Insert a new IT ticket."""
@@ -10,17 +18,46 @@ def insert_ticket(conn, ticket_id, priority, description, status, assigned_to, c
     """
     cursor.execute(query, (ticket_id, priority, description, status, assigned_to, created_at, resolution_time_hours))
     conn.commit()
+    note_write(conn, "it_tickets")
     return ticket_id
 
 def get_all_tickets(conn):
     """Retrieve all IT tickets."""
     return pd.read_sql_query("SELECT * FROM it_tickets ORDER BY created_at DESC", conn)
 
+def get_tickets_page(conn, page_size=50, cursor=None, descending=True):
+    """
+    Retrieve one page of tickets ordered by time (created_at_epoch), then rowid.
+    (ticket_id is TEXT and may be NULL for form-created tickets, so rowid is the tie-breaker.)
+
+    Returns:
+        tuple: (pandas.DataFrame page, next cursor or None when no more rows)
+    """
+    return fetch_keyset_page(
+        conn, "it_tickets", TICKET_COLUMNS, "created_at_epoch", "rowid",
+        page_size=page_size, cursor=cursor, descending=descending
+    )
+
+def get_tickets_between(conn, start=None, end=None, limit=None, descending=False):
+    """Retrieve tickets created in [start, end), using the created_at_epoch index."""
+    return fetch_time_range(
+        conn, "it_tickets", TICKET_COLUMNS, "created_at_epoch", start, end, limit, descending
+    )
+
+def count_tickets_by_period(conn, start=None, end=None, bucket="day"):
+    """Count tickets created per hour/day/week in [start, end)."""
+    return count_by_time_bucket(conn, "it_tickets", "created_at_epoch", start, end, bucket)
+
+def search_tickets(conn, term, limit=100, prefix=True):
+    """Full-text search over tickets, best match first."""
+    return search_table(conn, "it_tickets", TICKET_COLUMNS, term, limit, prefix)
+
 def update_ticket_status(conn, ticket_id, new_status):
     """Update the status of a ticket."""
     cursor = conn.cursor()
     cursor.execute("UPDATE it_tickets SET status = ? WHERE ticket_id = ?", (new_status, ticket_id))
     conn.commit()
+    note_write(conn, "it_tickets")
     return cursor.rowcount
 
 def delete_ticket(conn, ticket_id):
@@ -28,4 +65,5 @@ def delete_ticket(conn, ticket_id):
     cursor = conn.cursor()
     cursor.execute("DELETE FROM it_tickets WHERE ticket_id = ?", (ticket_id,))
     conn.commit()
+    note_write(conn, "it_tickets")
     return cursor.rowcount
\ No newline at end of file
@@ -0,0 +1,121 @@
+import datetime
+import pandas as pd
+
+# Bucket widths accepted by count_by_time_bucket(), in seconds.
+BUCKET_SECONDS = {
+    "hour": 3600,
+    "day": 86400,
+    "week": 7 * 86400,
+}
+# 1970-01-05 was a Monday, so weekly buckets are shifted to start on Mondays.
+_WEEK_ORIGIN = 4 * 86400
+
+def to_epoch(value):
+    """
+    Convert a date/time value to integer Unix seconds, the format of the
+    *_epoch columns (naive values are taken as UTC, like SQLite's strftime('%s')).
+
+    Args:
+        value: datetime, date, pandas.Timestamp, ISO string, epoch number or None
+
+    Returns:
+        int or None: Seconds since 1970-01-01 00:00:00
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        value = datetime.datetime(value.year, value.month, value.day)
+    timestamp = pd.Timestamp(value)
+    if pd.isna(timestamp):
+        return None
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+    return int(timestamp.value // 1_000_000_000)
+
+def from_epoch(seconds):
+    """Convert epoch seconds (scalar or Series) back to naive UTC pandas timestamps."""
+    return pd.to_datetime(seconds, unit="s")
+
+def fetch_time_range(conn, table, columns, epoch_column, start=None, end=None,
+                     limit=None, descending=False):
+    """
+    Fetch rows whose epoch column lies in [start, end), as an index range scan.
+
+    Args:
+        conn: Database connection
+        table: Table name
+        columns: Columns to return
+        epoch_column: Indexed integer epoch column to filter and sort on
+        start: Inclusive lower bound (anything to_epoch accepts), or None
+        end: Exclusive upper bound, or None
+        limit: Maximum number of rows, or None for all
+        descending: Newest first when True
+
+    Returns:
+        pandas.DataFrame: Matching rows in time order
+    """
+    conditions, params = _range_conditions(epoch_column, start, end)
+    query = f"SELECT {', '.join(columns)} FROM {table}"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {epoch_column} {'DESC' if descending else 'ASC'}"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    return pd.read_sql_query(query, conn, params=params)
+
+def count_by_time_bucket(conn, table, epoch_column, start=None, end=None, bucket="day"):
+    """
+    Count rows per fixed-width time bucket within [start, end).
+
+    Buckets are generated in SQL and each one is counted with its own range
+    search on the epoch index, so no rows are read or sorted outside the range.
+
+    Args:
+        conn: Database connection
+        table: Table name
+        epoch_column: Indexed integer epoch column
+        start: Inclusive lower bound (default: earliest row)
+        end: Exclusive upper bound (default: just after the latest row)
+        bucket: "hour", "day", "week", or a width in seconds
+
+    Returns:
+        pandas.DataFrame: bucket_start (datetime), count — empty buckets have count 0
+    """
+    width = BUCKET_SECONDS.get(bucket, bucket)
+    start, end = to_epoch(start), to_epoch(end)
+    if start is None or end is None:
+        low, high = conn.execute(f"SELECT MIN({epoch_column}), MAX({epoch_column}) FROM {table}").fetchone()
+        start = low if start is None else start
+        end = (high + 1 if high is not None else None) if end is None else end
+    if start is None or end is None or start >= end:
+        return pd.DataFrame({"bucket_start": pd.Series(dtype="datetime64[ns]"), "count": pd.Series(dtype="int64")})
+
+    query = f"""
+        WITH RECURSIVE buckets(bucket_start) AS (
+            SELECT ?
+            UNION ALL
+            SELECT bucket_start + ? FROM buckets WHERE bucket_start + ? < ?
+        )
+        SELECT bucket_start,
+               (SELECT COUNT(*) FROM {table}
+                WHERE {epoch_column} >= MAX(bucket_start, ?) AND {epoch_column} < MIN(bucket_start + ?, ?)) AS count
+        FROM buckets
+    """
+    origin = _WEEK_ORIGIN if bucket == "week" else 0
+    first = start - (start - origin) % width
+    df = pd.read_sql_query(query, conn, params=[first, width, width, end, start, width, end])
+    df["bucket_start"] = from_epoch(df["bucket_start"])
+    return df
+
+def _range_conditions(epoch_column, start, end):
+    conditions, params = [], []
+    if start is not None:
+        conditions.append(f"{epoch_column} >= ?")
+        params.append(to_epoch(start))
+    if end is not None:
+        conditions.append(f"{epoch_column} < ?")
+        params.append(to_epoch(end))
+    return conditions, params
@@ -0,0 +1,189 @@
+import pandas as pd
+from app.data.cache import cached_query
+
+# Trend granularity -> pandas resample rule. Weeks start on Monday.
+GRANULARITIES = {
+    "day": "D",
+    "week": "W-MON",
+    "month": "MS",
+}
+
+# ---------- Helpers ----------
+# SQL does the heavy lifting: every query returns at most one row per day
+# (read from the daily rollup tables or grouped by day), so memory follows
+# the number of buckets, never the number of incidents or tickets. pandas then
+# fills missing days, resamples to the requested granularity and applies
+# rolling windows on those few rows.
+
+def _day(value):
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+def _filters(start, end, filters, day_column="day"):
+    conditions, params = [f"{day_column} != ''"], []
+    if start is not None:
+        conditions.append(f"{day_column} >= ?")
+        params.append(_day(start))
+    if end is not None:
+        conditions.append(f"{day_column} < ?")
+        params.append(_day(end))
+    for column, value in filters.items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            conditions.append(f"{column} IN ({', '.join('?' for _ in value)})")
+            params.extend(value)
+        else:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    return " AND ".join(conditions), params
+
+def _daily(df):
+    """Index a (day, values...) query result by day."""
+    df["day"] = pd.to_datetime(df["day"])
+    return df.set_index("day")
+
+def _resample(daily, granularity, start=None, end=None, last=()):
+    """
+    Fill missing days with 0 over [start, end) and resample to granularity.
+
+    Columns are summed per bucket, except those in last, which keep the value
+    of the bucket's final day (levels such as a running backlog).
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}'. Choose from: {', '.join(GRANULARITIES)}")
+
+    first_day = pd.Timestamp(start).normalize() if start is not None else daily.index.min()
+    last_day = (pd.Timestamp(end) - pd.Timedelta(days=1)).normalize() if end is not None else daily.index.max()
+    if pd.isna(first_day) or pd.isna(last_day) or first_day > last_day:
+        return daily.iloc[0:0].rename_axis("bucket_start")
+
+    days = pd.date_range(first_day, last_day, freq="D")
+    daily = daily.reindex(days).fillna({c: 0 for c in daily.columns if c not in last})
+    daily[list(last)] = daily[list(last)].ffill().fillna(0)
+    if granularity != "day":
+        rules = {c: ("last" if c in last else "sum") for c in daily.columns}
+        daily = daily.resample(GRANULARITIES[granularity], label="left", closed="left").agg(rules)
+    return daily.rename_axis("bucket_start")
+
+# ---------- Trend series ----------
+
+@cached_query("cyber_incidents")
+def get_incident_trend(conn, granularity="day", start=None, end=None,
+                       category=None, severity=None, status=None, window=None):
+    """
+    Incidents per day/week/month, from the daily incident rollup.
+    Uses: SELECT, FROM, WHERE, SUM, GROUP BY, ORDER BY + pandas resample/rolling
+
+    Args:
+        conn: Database connection
+        granularity: "day", "week" or "month"
+        start: Inclusive start date (default: first incident)
+        end: Exclusive end date (default: day after the last incident)
+        category: Category (or tuple of categories) to keep, None for all
+        severity: Severity (or tuple) to keep, None for all
+        status: Status (or tuple) to keep, None for all
+        window: Buckets in the rolling mean, or None for no rolling column
+
+    Returns:
+        pandas.DataFrame: bucket_start, count[, rolling_mean]
+    """
+    where, params = _filters(start, end, {"category": category, "severity": severity, "status": status})
+    query = f"""
+    SELECT day, SUM(count) as count
+    FROM incident_rollup_daily
+    WHERE {where}
+    GROUP BY day
+    ORDER BY day
+    """
+    trend = _resample(_daily(pd.read_sql_query(query, conn, params=params)), granularity, start, end)
+    trend["count"] = trend["count"].astype("int64")
+    if window:
+        trend["rolling_mean"] = trend["count"].rolling(window, min_periods=1).mean()
+    return trend.reset_index()
+
+@cached_query("it_tickets")
+def get_ticket_backlog_trend(conn, granularity="day", start=None, end=None,
+                             assigned_to=None, priority=None):
+    """
+    Tickets opened and closed per bucket, and the open backlog at the end of each.
+
+    A ticket counts as closed created_at + resolution_time_hours after it was
+    opened, once its status is Resolved or Closed (schema.ROLLUP_TABLES keeps
+    both counts per day). The backlog includes tickets opened before start.
+    Uses: SELECT, FROM, WHERE, SUM, GROUP BY + pandas cumsum/resample
+
+    Args:
+        conn: Database connection
+        granularity: "day", "week" or "month"
+        start: Inclusive start date (default: first ticket)
+        end: Exclusive end date (default: last open/close day)
+        assigned_to: Assignee (or tuple) to keep, None for all
+        priority: Priority (or tuple) to keep, None for all
+
+    Returns:
+        pandas.DataFrame: bucket_start, opened, closed, backlog
+    """
+    filters = {"assigned_to": assigned_to, "priority": priority}
+
+    # No start bound: the backlog at start depends on everything before it.
+    where, params = _filters(None, end, filters)
+    opened = pd.read_sql_query(
+        f"SELECT day, SUM(count) as opened FROM ticket_rollup_daily WHERE {where} GROUP BY day",
+        conn, params=params
+    )
+
+    closed = pd.read_sql_query(
+        f"SELECT day, SUM(count) as closed FROM ticket_closed_rollup_daily WHERE {where} GROUP BY day",
+        conn, params=params
+    )
+
+    daily = _daily(opened).join(_daily(closed), how="outer").fillna(0).sort_index()
+    daily = _resample(daily, "day", end=end)
+    daily["backlog"] = (daily["opened"] - daily["closed"]).cumsum()
+    if start is not None:
+        daily = daily[daily.index >= pd.Timestamp(start).normalize()]
+    trend = _resample(daily.rename_axis("day"), granularity, start, end, last=("backlog",))
+    return trend.astype("int64").reset_index()
+
+@cached_query("it_tickets")
+def get_resolution_time_trend(conn, granularity="day", start=None, end=None,
+                              assigned_to=None, priority=None, window=7):
+    """
+    Average and rolling-average resolution time of tickets, by creation bucket.
+
+    The rolling average is weighted by ticket count (sum of hours over sum of
+    tickets in the window), so quiet buckets don't skew it.
+    Uses: SELECT, FROM, WHERE, SUM, GROUP BY, ORDER BY + pandas resample/rolling
+
+    Args:
+        conn: Database connection
+        granularity: "day", "week" or "month"
+        start: Inclusive start date (default: first ticket)
+        end: Exclusive end date (default: day after the last ticket)
+        assigned_to: Assignee (or tuple) to keep, None for all
+        priority: Priority (or tuple) to keep, None for all
+        window: Buckets in the rolling average
+
+    Returns:
+        pandas.DataFrame: bucket_start, tickets, avg_resolution, rolling_avg_resolution
+    """
+    where, params = _filters(start, end, {"assigned_to": assigned_to, "priority": priority})
+    query = f"""
+    SELECT day,
+           SUM(count) as tickets,
+           SUM(resolution_hours_sum) as hours,
+           SUM(resolution_count) as resolved
+    FROM ticket_rollup_daily
+    WHERE {where}
+    GROUP BY day
+    ORDER BY day
+    """
+    sums = _resample(_daily(pd.read_sql_query(query, conn, params=params)), granularity, start, end)
+    window = max(int(window or 1), 1)
+    rolling = sums[["hours", "resolved"]].rolling(window, min_periods=1).sum()
+    trend = pd.DataFrame({
+        "tickets": sums["tickets"].astype("int64"),
+        "avg_resolution": sums["hours"] / sums["resolved"].where(sums["resolved"] > 0),
+        "rolling_avg_resolution": rolling["hours"] / rolling["resolved"].where(rolling["resolved"] > 0),
+    })
+    return trend.reset_index()
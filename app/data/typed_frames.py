@@ -0,0 +1,137 @@
+import pandas as pd
+
+# Fixed value sets of the low-cardinality columns, in display order. Values
+# outside a set (older data, new options) are kept as extra categories, never
+# turned into NaN.
+SEVERITY_LEVELS = ["Low", "Medium", "High", "Critical"]
+PRIORITY_LEVELS = ["Low", "Medium", "High", "Critical"]
+STATUSES = ["Open", "In Progress", "Resolved", "Closed"]
+INCIDENT_CATEGORIES = ["Phishing", "Malware", "Data Breach", "Unauthorized Access", "DDoS",
+                       "Misconfiguration", "Other"]
+
+# Column -> how to store it: a list (categorical with those categories first),
+# "category" (categorical of the values present), "integer", "float" or "datetime".
+# Columns not listed (ids stored as text, descriptions, names) are left as they are.
+DOMAIN_TYPES = {
+    "cyber_incidents": {
+        "incident_id": "integer",
+        "timestamp": "datetime",
+        "severity": SEVERITY_LEVELS,
+        "category": INCIDENT_CATEGORIES,
+        "status": STATUSES,
+    },
+    "datasets_metadata": {
+        "dataset_id": "integer",
+        "rows": "integer",
+        "columns": "integer",
+        "uploaded_by": "category",
+        "upload_date": "datetime",
+    },
+    "it_tickets": {
+        "priority": PRIORITY_LEVELS,
+        "status": STATUSES,
+        "assigned_to": "category",
+        "created_at": "datetime",
+        "resolution_time_hours": "float",
+    },
+}
+
+def _categorical(values, categories=None):
+    present = [v for v in pd.unique(values.dropna())]
+    if categories is None:
+        categories = sorted(present, key=str)
+    else:
+        categories = list(categories) + sorted((v for v in present if v not in categories), key=str)
+    return pd.Categorical(values, categories=categories)
+
+def _integer(values):
+    values = pd.to_numeric(values, errors="coerce")
+    if not values.isna().any():
+        return pd.to_numeric(values, downcast="integer")
+    # NULLs: nullable integers instead of float64
+    low, high = values.min(), values.max()
+    fits_int32 = pd.isna(low) or (low >= -2**31 and high < 2**31)
+    return values.astype("Int32" if fits_int32 else "Int64")
+
+def _datetime(values):
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, errors="coerce", format="ISO8601")
+
+def apply_domain_types(df, table):
+    """
+    Convert a domain-table frame to its compact representation.
+
+    Low-cardinality text becomes pandas categoricals (one small code per
+    row instead of one string object), numbers are downcast to the smallest
+    type that holds them, and timestamps are parsed to datetime64.
+
+    Args:
+        df: Rows of table (any subset of its columns)
+        table: Domain table name (a key of DOMAIN_TYPES)
+
+    Returns:
+        pandas.DataFrame: Typed copy
+    """
+    df = df.copy()
+    for column, kind in DOMAIN_TYPES[table].items():
+        if column not in df.columns:
+            continue
+        if isinstance(kind, list):
+            df[column] = _categorical(df[column], kind)
+        elif kind == "category":
+            df[column] = _categorical(df[column])
+        elif kind == "integer":
+            df[column] = _integer(df[column])
+        elif kind == "float":
+            df[column] = pd.to_numeric(df[column], errors="coerce", downcast="float")
+        elif kind == "datetime":
+            df[column] = _datetime(df[column])
+    return df
+
+def read_typed(conn, table, query, params=None):
+    """Run a query over a domain table and return the typed frame."""
+    return apply_domain_types(pd.read_sql_query(query, conn, params=params), table)
+
+def frame_memory(df):
+    """Bytes held by a DataFrame, including the strings it points to."""
+    return int(df.memory_usage(deep=True).sum())
+
+def memory_report(frames):
+    """
+    Compare the memory of frames before and after apply_domain_types().
+
+    Args:
+        frames: {name: (untyped DataFrame, typed DataFrame)}
+
+    Returns:
+        pandas.DataFrame: frame, rows, before_kb, after_kb, saved_pct
+    """
+    rows = []
+    for name, (before, after) in frames.items():
+        before_bytes, after_bytes = frame_memory(before), frame_memory(after)
+        rows.append({
+            "frame": name,
+            "rows": len(after),
+            "before_kb": before_bytes / 1024,
+            "after_kb": after_bytes / 1024,
+            "saved_pct": 100 * (1 - after_bytes / before_bytes) if before_bytes else 0.0,
+        })
+    return pd.DataFrame(rows, columns=["frame", "rows", "before_kb", "after_kb", "saved_pct"])
+
+def column_memory_report(before, after):
+    """
+    Per-column bytes and dtypes of one frame before and after typing.
+
+    Returns:
+        pandas.DataFrame: column, before_dtype, after_dtype, before_kb, after_kb
+    """
+    before_usage = before.memory_usage(deep=True, index=False)
+    after_usage = after.memory_usage(deep=True, index=False)
+    return pd.DataFrame({
+        "column": before.columns,
+        "before_dtype": [str(before[c].dtype) for c in before.columns],
+        "after_dtype": [str(after[c].dtype) for c in before.columns],
+        "before_kb": [before_usage[c] / 1024 for c in before.columns],
+        "after_kb": [after_usage[c] / 1024 for c in before.columns],
+    })
@@ -0,0 +1,116 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt
+from config import AUTH_WORKERS, AUTH_QUEUE_DEPTH, AUTH_TIMEOUT, BCRYPT_ROUNDS
+
+def hash_rounds(password_hash):
+    """
+    Return the work factor a bcrypt hash was made with ("$2b$12$..." -> 12).
+
+    Returns:
+        int: Cost, or None if the string is not a bcrypt hash
+    """
+    parts = password_hash.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+class AuthBusyError(RuntimeError):
+    """Raised when the hashing pool is saturated (or too slow) and a login/registration is turned away."""
+
+class AuthExecutor:
+    """
+    Bounded worker pool for bcrypt hashing and verification.
+
+    bcrypt releases the GIL while it hashes, so running it on these workers
+    lets the Streamlit script threads of other sessions keep rendering while
+    a login waits. At most `workers` hashes run at once and at most
+    `queue_depth` more wait for a worker; anything beyond that is rejected
+    immediately with AuthBusyError instead of piling up behind a burst.
+    """
+
+    def __init__(self, workers=AUTH_WORKERS, queue_depth=AUTH_QUEUE_DEPTH, timeout=AUTH_TIMEOUT):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auth-hash")
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats = {"submitted": 0, "completed": 0, "rejected": 0, "timeouts": 0, "busy_time": 0.0}
+
+    def _done(self, future, started):
+        self._slots.release()
+        with self._lock:
+            self._in_flight -= 1
+            self._stats["completed"] += 1
+            self._stats["busy_time"] += time.perf_counter() - started
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise AuthBusyError(
+                f"Authentication is busy ({self.workers} running, {self.queue_depth} waiting)"
+            )
+        with self._lock:
+            self._in_flight += 1
+            self._stats["submitted"] += 1
+        started = time.perf_counter()
+        future = self._pool.submit(func, *args)
+        future.add_done_callback(lambda f: self._done(f, started))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # The hash still finishes on its worker (and frees its slot); this caller gives up.
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise AuthBusyError(f"Authentication did not finish within {self.timeout}s")
+
+    def hash_password(self, password, rounds=None):
+        """
+        Hash a password on the pool.
+
+        Args:
+            password: Plain text password
+            rounds: bcrypt cost (the calibrated BCRYPT_ROUNDS when None)
+
+        Returns:
+            str: bcrypt hash
+        """
+        salt = bcrypt.gensalt(BCRYPT_ROUNDS if rounds is None else rounds)
+        return self._run(bcrypt.hashpw, password.encode("utf-8"), salt).decode("utf-8")
+
+    def check_password(self, password, password_hash):
+        """Verify a password against a stored bcrypt hash on the pool."""
+        return self._run(bcrypt.checkpw, password.encode("utf-8"), password_hash.encode("utf-8"))
+
+    def stats(self):
+        """
+        Snapshot of pool usage counters.
+
+        Returns:
+            dict: submitted, completed, rejected, timeouts, busy_time, in_flight, workers, queue_depth
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["in_flight"] = self._in_flight
+        snapshot["workers"] = self.workers
+        snapshot["queue_depth"] = self.queue_depth
+        return snapshot
+
+    def shutdown(self):
+        """Stop the workers after the hashes already submitted finish."""
+        self._pool.shutdown(wait=True)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_auth_executor():
+    """Return the process-wide hashing pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = AuthExecutor()
+        return _executor
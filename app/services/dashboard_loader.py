@@ -0,0 +1,91 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import streamlit as st
+from config import DASHBOARD_LOADER_WORKERS, DASHBOARD_SECTION_TIMEOUT
+from app.data.db import get_connection
+
+class SectionTimeoutError(TimeoutError):
+    """Reported by load_sections() for a section that did not load within its timeout."""
+
+def copy_session_state(keys):
+    """
+    Copy st.session_state entries into a plain dict a loader can read and update.
+
+    st.session_state is not thread-safe, so loaders get a copy of the
+    entries they need (e.g. record_pager.record_state_keys) and the script
+    thread writes their changes back with store_session_state().
+    """
+    return {k: st.session_state[k] for k in keys if k in st.session_state}
+
+def store_session_state(state, keys):
+    """Write a loader's state dict back to st.session_state; keys it dropped are removed."""
+    for k in keys:
+        if k in state:
+            st.session_state[k] = state[k]
+        else:
+            st.session_state.pop(k, None)
+
+def _load_section(loader, args):
+    started = time.perf_counter()
+    with get_connection(read_only=True) as conn:
+        result = loader(conn, *args)
+    return result, time.perf_counter() - started
+
+def load_sections(sections, timeouts=None, default_timeout=DASHBOARD_SECTION_TIMEOUT,
+                  workers=DASHBOARD_LOADER_WORKERS):
+    """
+    Run independent page-section loaders concurrently, yielding each as soon as it is ready.
+
+    Every loader runs in its own worker thread on a read-only pooled
+    connection, so SQLite queries (which release the GIL) and DataFrame work
+    overlap. Loaders must only fetch and prepare data and must not use
+    st.session_state (pass them a copy_session_state() dict instead); the
+    caller draws each result on the script thread, in the order they finish. A section that is
+    still running after its timeout is yielded with a SectionTimeoutError and
+    its late result is discarded.
+
+    Args:
+        sections: {name: (loader, args)} where loader(conn, *args) returns the section data
+        timeouts: {name: seconds} overriding default_timeout per section
+        default_timeout: Seconds each section may take (from the start of loading)
+        workers: Maximum sections loading at once
+
+    Yields:
+        tuple: (name, result or None, seconds, error or None)
+    """
+    timeouts = timeouts or {}
+    started = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=max(1, min(workers, len(sections))),
+                                  thread_name_prefix="dashboard-section")
+    try:
+        pending = {
+            executor.submit(_load_section, loader, args): name
+            for name, (loader, args) in sections.items()
+        }
+        deadlines = {name: started + timeouts.get(name, default_timeout) for name in sections}
+
+        while pending:
+            now = time.perf_counter()
+            wait_for = max(0.0, min(deadlines[name] for name in pending.values()) - now)
+            done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result, seconds = future.result()
+                except Exception as e:
+                    yield name, None, time.perf_counter() - started, e
+                else:
+                    yield name, result, seconds, None
+
+            now = time.perf_counter()
+            for future, name in list(pending.items()):
+                if now >= deadlines[name]:
+                    del pending[future]
+                    future.cancel()
+                    yield name, None, now - started, SectionTimeoutError(
+                        f"'{name}' did not load within {timeouts.get(name, default_timeout)}s"
+                    )
+    finally:
+        # Don't wait for timed-out loaders; their threads finish and exit on their own.
+        executor.shutdown(wait=False, cancel_futures=True)
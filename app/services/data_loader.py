@@ -1,10 +1,24 @@
+import csv
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import multiprocessing
+from pathlib import Path
+from queue import Empty
 import pandas as pd
-from config import DATA_DIR
+from config import DATA_DIR, CSV_CHUNK_SIZE, CSV_PIPELINE_QUEUE_SIZE
 from app.data import analytic, datasets, tickets, incidents
-from app.data.db import connect_database
+from app.data.cache import note_write
+from app.data.changes import bulk_changes
+from app.data.db import get_connection
+from app.data.schema import IMPORT_KEYS, create_import_checkpoints_table, create_import_watermarks_table
+from app.services.progress import print_progress
 
 # ---------- CSV Loading ----------
-def load_csv_to_table(conn, csv_path, table_name):
+def load_csv_to_table(conn, csv_path, table_name, streaming=False, chunk_size=CSV_CHUNK_SIZE,
+                      incremental=False):
     """
     Load a CSV file into a database table.
 
@@ -12,32 +26,669 @@ def load_csv_to_table(conn, csv_path, table_name):
         conn: Database connection
         csv_path: Path to CSV file
         table_name: Name of the target table
+        streaming: Use the chunked, resumable loader (constant memory)
+        chunk_size: Rows per chunk in streaming/incremental mode
+        incremental: Upsert only new or changed rows, skipping unchanged files
 
     Returns:
-        int: Number of rows loaded
+        int: Number of rows loaded (new or changed rows in incremental mode)
     """
     if not csv_path.exists():
         print(f"🔺 CSV file not found: {csv_path}")
         return 0
 
+    # Bulk loads log a single reload marker instead of one change per row.
+    with bulk_changes(conn):
+        if incremental:
+            return sync_csv_to_table(conn, csv_path, table_name, chunk_size=chunk_size)
+        if streaming:
+            return stream_csv_to_table(conn, csv_path, table_name, chunk_size=chunk_size)
+
+        try:
+            df = pd.read_csv(csv_path)
+            df.to_sql(name=table_name, con=conn, if_exists='append', index=False)
+            conn.commit()
+            note_write(conn, table_name)
+            print(f"✅ Loaded {len(df)} rows into '{table_name}'")
+            return len(df)
+        except Exception as e:
+            print(f"❌ Error loading CSV: {e}")
+            return 0
+
+def _get_checkpoint(conn, source, table_name):
+    return conn.execute(
+        "SELECT rows_committed, file_size, file_mtime FROM import_checkpoints WHERE source = ? AND table_name = ?",
+        (source, table_name)
+    ).fetchone()
+
+def _save_checkpoint(conn, source, table_name, rows_committed, file_size, file_mtime):
+    conn.execute(
+        """
+        INSERT INTO import_checkpoints (source, table_name, rows_committed, file_size, file_mtime, updated_at)
+        VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (source, table_name) DO UPDATE SET
+            rows_committed = excluded.rows_committed,
+            file_size = excluded.file_size,
+            file_mtime = excluded.file_mtime,
+            updated_at = excluded.updated_at
+        """,
+        (source, table_name, rows_committed, file_size, file_mtime)
+    )
+
+def stream_csv_to_table(conn, csv_path, table_name, chunk_size=CSV_CHUNK_SIZE,
+                        chunks_per_commit=1, progress=print_progress, resume=True):
+    """
+    Stream a CSV file into a table in fixed-size chunks.
+
+    Rows are read with the csv module (never the whole file), inserted with
+    executemany, and committed every chunks_per_commit chunks together with a
+    checkpoint row. If the load fails, the committed chunks stay and the next
+    call for the same unchanged file resumes after the last checkpoint.
+
+    Args:
+        conn: Database connection
+        csv_path: Path to CSV file (header row must name table columns)
+        table_name: Name of the target table
+        chunk_size: Rows per executemany batch
+        chunks_per_commit: Chunks per transaction
+        progress: Callable(table_name, rows_done, rows_per_sec) or None
+        resume: Continue from a checkpoint left by a failed run
+
+    Returns:
+        int: Number of rows loaded by this call
+    """
+    create_import_checkpoints_table(conn)
+    source = str(csv_path.resolve())
+    stat = csv_path.stat()
+
+    skip = 0
+    checkpoint = _get_checkpoint(conn, source, table_name)
+    if checkpoint and resume and checkpoint[1] == stat.st_size and checkpoint[2] == stat.st_mtime:
+        skip = checkpoint[0]
+        print(f"↪️  Resuming '{table_name}' after {skip:,} committed rows")
+
+    table_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")}
+    loaded = 0
+    started = time.perf_counter()
+
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            print(f"🔺 CSV file is empty: {csv_path}")
+            return 0
+        unknown = [col for col in header if col not in table_columns]
+        if unknown:
+            print(f"❌ Error loading CSV: columns {unknown} not in table '{table_name}'")
+            return 0
+
+        insert = (
+            f"INSERT INTO {table_name} ({', '.join(header)}) "
+            f"VALUES ({', '.join('?' for _ in header)})"
+        )
+        for _ in islice(reader, skip):
+            pass
+
+        committed = skip
+        pending_chunks = 0
+        try:
+            while True:
+                chunk = [
+                    [value if value != "" else None for value in row]
+                    for row in islice(reader, chunk_size)
+                ]
+                if not chunk:
+                    break
+                conn.executemany(insert, chunk)
+                loaded += len(chunk)
+                pending_chunks += 1
+
+                if pending_chunks >= chunks_per_commit:
+                    _save_checkpoint(conn, source, table_name, skip + loaded, stat.st_size, stat.st_mtime)
+                    conn.commit()
+                    committed = skip + loaded
+                    pending_chunks = 0
+                    if progress:
+                        progress(table_name, committed, loaded / max(time.perf_counter() - started, 1e-9))
+        except Exception as e:
+            conn.rollback()
+            loaded = committed - skip
+            print(f"❌ Error loading CSV after {committed:,} committed rows: {e}")
+            print("   Re-run the import to resume from the last committed chunk.")
+            if loaded:
+                note_write(conn, table_name)
+            return loaded
+
+    conn.execute("DELETE FROM import_checkpoints WHERE source = ? AND table_name = ?", (source, table_name))
+    conn.commit()
+    note_write(conn, table_name)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Loaded {loaded} rows into '{table_name}' ({loaded / max(elapsed, 1e-9):,.0f} rows/s)")
+    return loaded
+
+# ---------- Incremental Sync ----------
+def _file_checksums(path, prefix_size=None):
+    """
+    Hash a file in one pass.
+
+    Returns:
+        tuple: (sha256 of the whole file, sha256 of its first prefix_size bytes or None)
+    """
+    digest = hashlib.sha256()
+    prefix_digest = None
+    position = 0
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(1024 * 1024)
+            if not block:
+                break
+            if prefix_size is not None and position < prefix_size <= position + len(block):
+                cut = prefix_size - position
+                digest.update(block[:cut])
+                prefix_digest = digest.hexdigest()
+                digest.update(block[cut:])
+            else:
+                digest.update(block)
+            position += len(block)
+    return digest.hexdigest(), prefix_digest
+
+def _ends_with_newline(path, size):
+    with open(path, "rb") as f:
+        f.seek(size - 1)
+        return f.read(1) == b"\n"
+
+def _key_order(value):
+    # Numeric ids compare as numbers ("999" < "1000"); anything else as text.
     try:
-        df = pd.read_csv(csv_path)
-        df.to_sql(name=table_name, con=conn, if_exists='append', index=False)
-        print(f"✅ Loaded {len(df)} rows into '{table_name}'")
-        return len(df)
-    except Exception as e:
-        print(f"❌ Error loading CSV: {e}")
+        return (0, float(value))
+    except (TypeError, ValueError):
+        return (1, str(value))
+
+def _get_watermark(conn, source, table_name):
+    return conn.execute(
+        "SELECT checksum, file_size, high_water_mark, rows_synced FROM import_watermarks "
+        "WHERE source = ? AND table_name = ?",
+        (source, table_name)
+    ).fetchone()
+
+def _save_watermark(conn, source, table_name, checksum, file_size, high_water_mark, rows_synced):
+    conn.execute(
+        """
+        INSERT INTO import_watermarks (source, table_name, checksum, file_size, high_water_mark, rows_synced, synced_at)
+        VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (source, table_name) DO UPDATE SET
+            checksum = excluded.checksum,
+            file_size = excluded.file_size,
+            high_water_mark = excluded.high_water_mark,
+            rows_synced = excluded.rows_synced,
+            synced_at = excluded.synced_at
+        """,
+        (source, table_name, checksum, file_size, high_water_mark, rows_synced)
+    )
+
+def _compare_with_watermark(conn, source, csv_path, table_name):
+    """
+    Check a CSV file against the watermark of its last sync.
+
+    Returns:
+        tuple: (checksum, file_size, tail_offset, high_water_mark, rows_synced).
+        checksum is None when the file is unchanged since the last sync.
+        tail_offset is where the rows appended since then start, or None to
+        read the whole file (rows_synced then restarts at 0).
+    """
+    file_size = csv_path.stat().st_size
+    watermark = _get_watermark(conn, source, table_name)
+    old_checksum, old_size, high_water_mark, rows_synced = watermark or (None, 0, None, 0)
+
+    checksum, prefix_checksum = _file_checksums(csv_path, old_size if watermark else None)
+    if checksum == old_checksum:
+        return None, file_size, None, high_water_mark, rows_synced
+    if watermark and file_size > old_size and prefix_checksum == old_checksum \
+            and _ends_with_newline(csv_path, old_size):
+        return checksum, file_size, old_size, high_water_mark, rows_synced
+    return checksum, file_size, None, high_water_mark, 0
+
+def build_upsert_statement(table_name, columns, key):
+    """
+    Build an INSERT ... ON CONFLICT DO UPDATE for one CSV row.
+
+    The update only fires when a value actually differs, so re-syncing an
+    unchanged row writes nothing (no page writes, no FTS trigger work).
+
+    Args:
+        table_name: Target table
+        columns: Column names in CSV order
+        key: Conflict target (primary key column)
+
+    Returns:
+        str: SQL with one ? placeholder per column
+    """
+    insert = (
+        f"INSERT INTO {table_name} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)}) ON CONFLICT ({key}) DO "
+    )
+    others = [col for col in columns if col != key]
+    if not others:
+        return insert + "NOTHING"
+    assignments = ", ".join(f"{col} = excluded.{col}" for col in others)
+    current = ", ".join(f"{table_name}.{col}" for col in others)
+    incoming = ", ".join(f"excluded.{col}" for col in others)
+    return insert + f"UPDATE SET {assignments} WHERE ({current}) IS NOT ({incoming})"
+
+def sync_csv_to_table(conn, csv_path, table_name, chunk_size=CSV_CHUNK_SIZE,
+                      append_only=False, progress=print_progress):
+    """
+    Incrementally sync a CSV export into a table.
+
+    The file's sha256 and high-water mark (largest key) are kept in
+    import_watermarks after every successful sync:
+      * same checksum as last time -> the file is skipped without being parsed;
+      * the file only grew (its old bytes hash to the stored checksum) -> only
+        the appended rows are read;
+      * otherwise every row is upserted on the table's key, and rows whose
+        values are unchanged are left alone.
+    A failed sync leaves the watermark untouched, so the next run simply
+    re-upserts the file; upserts are idempotent.
+
+    Args:
+        conn: Database connection
+        csv_path: Path to CSV file (header row must name table columns)
+        table_name: Name of the target table (a key of IMPORT_KEYS)
+        chunk_size: Rows per executemany batch and transaction
+        append_only: Trust that rows at or below the high-water mark never
+            change, and skip them even when the file was rewritten
+        progress: Callable(table_name, rows_done, rows_per_sec) or None
+
+    Returns:
+        int: Number of rows inserted or updated
+    """
+    create_import_watermarks_table(conn)
+    key = IMPORT_KEYS.get(table_name)
+    if key is None:
+        print(f"❌ Error syncing CSV: no import key defined for '{table_name}'")
         return 0
 
-def load_all_csv_data(conn):
+    source = str(csv_path.resolve())
+    checksum, file_size, tail_offset, high_water_mark, rows_synced = _compare_with_watermark(
+        conn, source, csv_path, table_name
+    )
+    if checksum is None:
+        print(f"⏭️  '{table_name}' unchanged since last sync, skipped")
+        return 0
+
+    table_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")}
+    mark = _key_order(high_water_mark) if high_water_mark is not None else None
+    skip_below = mark if append_only else None
+    written = skipped = 0
+    started = time.perf_counter()
+
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader([f.readline()]), None)
+        if not header:
+            print(f"🔺 CSV file is empty: {csv_path}")
+            return 0
+        unknown = [col for col in header if col not in table_columns]
+        if unknown or key not in header:
+            problem = f"columns {unknown} not in table" if unknown else f"key column '{key}' missing from CSV for"
+            print(f"❌ Error syncing CSV: {problem} '{table_name}'")
+            return 0
+        key_index = header.index(key)
+        upsert = build_upsert_statement(table_name, header, key)
+
+        if tail_offset is not None:
+            f.seek(tail_offset)
+            print(f"↪️  '{table_name}' only grew; reading rows appended since the last sync")
+        reader = csv.reader(f)
+
+        try:
+            while True:
+                chunk = []
+                read = 0
+                for row in islice(reader, chunk_size):
+                    read += 1
+                    rows_synced += 1
+                    row = [value if value != "" else None for value in row]
+                    if row[key_index] is None:
+                        skipped += 1
+                        continue
+                    order = _key_order(row[key_index])
+                    if mark is None or order > mark:
+                        mark, high_water_mark = order, row[key_index]
+                    if skip_below is not None and order <= skip_below:
+                        continue
+                    chunk.append(row)
+                if not read:
+                    break
+                if not chunk:
+                    continue
+                written += conn.executemany(upsert, chunk).rowcount
+                conn.commit()
+                if progress:
+                    progress(table_name, written, written / max(time.perf_counter() - started, 1e-9))
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Error syncing CSV: {e}")
+            print("   The watermark was not advanced; re-run the sync to retry.")
+            if written:
+                note_write(conn, table_name)
+            return written
+
+    _save_watermark(conn, source, table_name, checksum, file_size, high_water_mark, rows_synced)
+    conn.commit()
+    if written:
+        note_write(conn, table_name)
+
+    elapsed = time.perf_counter() - started
+    note = f", {skipped} rows without {key} skipped" if skipped else ""
+    print(f"✅ Synced '{table_name}': {written} new or changed rows "
+          f"(high-water mark {high_water_mark}, {elapsed:.2f}s{note})")
+    return written
+
+# ---------- Parallel Pipeline ----------
+def _coercer(declared_type):
+    """Return a str -> value converter following SQLite's column affinity rules."""
+    declared_type = (declared_type or "").upper()
+    if "INT" in declared_type:
+        def convert(value):
+            try:
+                return int(value)
+            except ValueError:
+                try:
+                    return float(value)
+                except ValueError:
+                    return value
+        return convert
+    if any(name in declared_type for name in ("REAL", "FLOA", "DOUB")):
+        def convert(value):
+            try:
+                return float(value)
+            except ValueError:
+                return value
+        return convert
+    return None
+
+def _table_for_file(csv_path, tables):
+    """Map cyber_incidents.csv or cyber_incidents_2024-06.csv to its table (one of tables)."""
+    stem = csv_path.stem
+    if stem in tables:
+        return stem
+    matches = [t for t in tables if any(stem.startswith(t + sep) for sep in ("_", "-", "."))]
+    return max(matches, key=len) if matches else None
+
+def parse_csv_file(csv_path, table_name, column_types, chunk_size, queue, offset=None, stop=None):
+    """
+    Pipeline worker: parse one CSV file and put typed row chunks on the queue.
+
+    Runs in a child process. Puts ("rows", table, source, header, chunk) messages
+    followed by one ("done", table, source, rows, parse_seconds) or
+    ("error", table, source, message). With offset, only the rows from that
+    byte offset on are read (the header still comes from the first line).
+    Once the stop event is set it returns without another message.
+    """
+    source = str(csv_path)
+    started = time.perf_counter()
+    rows = 0
+    parse_seconds = 0.0
+    try:
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            header = next(csv.reader([f.readline()]), None)
+            if not header:
+                queue.put(("error", table_name, source, "CSV file is empty"))
+                return
+            if offset is not None:
+                f.seek(offset)
+            reader = csv.reader(f)
+            unknown = [col for col in header if col not in column_types]
+            if unknown:
+                queue.put(("error", table_name, source, f"columns {unknown} not in table"))
+                return
+            converters = [_coercer(column_types[col]) for col in header]
+            while True:
+                chunk = [
+                    [
+                        None if value == "" else (convert(value) if convert else value)
+                        for value, convert in zip(row, converters)
+                    ]
+                    for row in islice(reader, chunk_size)
+                ]
+                if not chunk or (stop is not None and stop.is_set()):
+                    break
+                rows += len(chunk)
+                parse_seconds += time.perf_counter() - started
+                # Blocks while the writer is behind, so memory stays bounded.
+                queue.put(("rows", table_name, source, header, chunk))
+                started = time.perf_counter()
+    except Exception as e:
+        queue.put(("error", table_name, source, str(e)))
+        return
+    if stop is not None and stop.is_set():
+        return
+    parse_seconds += time.perf_counter() - started
+    queue.put(("done", table_name, source, rows, parse_seconds))
+
+# Set in each pool process by _init_parser: the pipeline queue and stop event
+# can't be pickled into every task, only handed over when the process starts.
+_parser_queue = None
+_parser_stop = None
+
+def _init_parser(queue, stop):
+    global _parser_queue, _parser_stop
+    _parser_queue, _parser_stop = queue, stop
+    # Chunks still buffered when the pool shuts down are no longer wanted;
+    # don't let them keep this process from exiting.
+    queue.cancel_join_thread()
+
+def _parse_in_pool(csv_path, table_name, column_types, chunk_size, offset):
+    parse_csv_file(csv_path, table_name, column_types, chunk_size, _parser_queue, offset, _parser_stop)
+
+def _write_parsed_chunks(conn, queue, futures, pending, stats, syncs, upsert, written_tables):
+    """Writer side of load_csv_directory(): insert parsed chunks until every file has reported."""
+    statements = {}
+    while pending:
+        try:
+            message = queue.get(timeout=1)
+        except Empty:
+            # A worker that died without reporting would leave us waiting forever.
+            for future in futures:
+                if future.done() and future.exception():
+                    raise future.exception()
+            continue
+        kind, table_name, source = message[0], message[1], message[2]
+        file_stats = stats[source]
+
+        if kind == "rows":
+            header, chunk = message[3], message[4]
+            if file_stats["error"]:
+                continue    # drain the rest of a failed file
+            key = IMPORT_KEYS[table_name]
+            statement_key = (table_name, tuple(header))
+            if statement_key not in statements:
+                if upsert and key in header:
+                    statements[statement_key] = build_upsert_statement(table_name, header, key)
+                else:
+                    statements[statement_key] = (
+                        f"INSERT INTO {table_name} ({', '.join(header)}) "
+                        f"VALUES ({', '.join('?' for _ in header)})"
+                    )
+            write_started = time.perf_counter()
+            if source in syncs:
+                watermark_source, checksum, file_size, high_water_mark, rows_synced = syncs[source]
+                rows_synced += len(chunk)
+                if key in header:
+                    key_index = header.index(key)
+                    # Without a key a row can't be upserted (it would be inserted again every run).
+                    chunk = [row for row in chunk if row[key_index] is not None]
+                    if chunk:
+                        newest = max(chunk, key=lambda row: _key_order(row[key_index]))[key_index]
+                        if high_water_mark is None or _key_order(newest) > _key_order(high_water_mark):
+                            high_water_mark = newest
+                syncs[source] = (watermark_source, checksum, file_size, high_water_mark, rows_synced)
+            try:
+                # rowcount counts rows inserted or actually changed, not rows sent.
+                written = conn.executemany(statements[statement_key], chunk).rowcount if chunk else 0
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                file_stats["error"] = str(e)
+                print(f"❌ Error loading {Path(source).name} after {file_stats['rows']:,} rows: {e}")
+            else:
+                file_stats["rows"] += written
+                if written:
+                    written_tables.add(table_name)
+            file_stats["write_seconds"] += time.perf_counter() - write_started
+
+        elif kind == "done":
+            pending -= 1
+            if source in syncs and not file_stats["error"]:
+                watermark_source, checksum, file_size, high_water_mark, rows_synced = syncs[source]
+                _save_watermark(conn, watermark_source, table_name, checksum, file_size,
+                                high_water_mark, rows_synced)
+                conn.commit()
+            file_stats["parse_seconds"] = message[4]
+            busy = file_stats["parse_seconds"] + file_stats["write_seconds"]
+            file_stats["rows_per_sec"] = file_stats["rows"] / max(busy, 1e-9)
+
+        else:
+            pending -= 1
+            file_stats["error"] = message[3]
+            print(f"❌ Error parsing {Path(source).name}: {message[3]}")
+
+def load_csv_directory(conn, directory=DATA_DIR, workers=None, chunk_size=CSV_CHUNK_SIZE,
+                       queue_size=CSV_PIPELINE_QUEUE_SIZE, upsert=False):
+    """
+    Load every domain CSV in a directory with a parallel parse / serial write pipeline.
+
+    Each file is parsed and type-coerced (from the table's declared column
+    types) in a process pool. Parsed chunks travel through a bounded queue to
+    this process, where a single connection inserts and commits them, so
+    SQLite only ever sees one writer. A file maps to the domain table named by
+    its stem (cyber_incidents.csv, or cyber_incidents_2024-06.csv for extra
+    exports); other files are skipped.
+
+    With upsert=True the run is incremental, like sync_csv_to_table(): files
+    whose checksum matches their import watermark are skipped, files that
+    only grew are parsed from the previous end, rows without a key are
+    skipped, and each file's watermark is saved once it has been written in
+    full.
+
+    Args:
+        conn: Database connection (the only writer)
+        directory: Folder containing the CSV files
+        workers: Parser processes (default: one per file, up to the CPU count)
+        chunk_size: Rows per parsed chunk / executemany batch / transaction
+        queue_size: Maximum parsed chunks waiting for the writer
+        upsert: Incremental run: upsert on the table key (IMPORT_KEYS) instead
+            of plain inserts, skipping unchanged files
+
+    Returns:
+        dict: {source: {table, rows, parse_seconds, write_seconds, rows_per_sec, error}}
+              plus a "total" entry with rows, seconds and rows_per_sec; rows
+              counts the rows inserted or changed
+    """
+    directory = Path(directory)
+    existing = {
+        row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    }
+    tables = [table for table in IMPORT_KEYS if table in existing]
+    if upsert:
+        create_import_watermarks_table(conn)
+
+    jobs = []
+    syncs = {}   # source -> (watermark source, checksum, file_size, high-water mark, rows synced)
+    for csv_path in sorted(directory.glob("*.csv")):
+        table_name = _table_for_file(csv_path, tables)
+        if table_name is None:
+            print(f"🔺 No domain table for {csv_path.name}, skipped")
+            continue
+        offset = None
+        if upsert:
+            source = str(csv_path.resolve())
+            checksum, file_size, offset, high_water_mark, rows_synced = _compare_with_watermark(
+                conn, source, csv_path, table_name
+            )
+            if checksum is None:
+                print(f"⏭️  {csv_path.name} unchanged since last sync, skipped")
+                continue
+            syncs[str(csv_path)] = (source, checksum, file_size, high_water_mark, rows_synced)
+        column_types = {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({table_name})")}
+        jobs.append((csv_path, table_name, column_types, offset))
+    if not jobs:
+        print(f"🔺 No new or changed CSV files to load in {directory}")
+        return {"total": {"rows": 0, "seconds": 0.0, "rows_per_sec": 0.0}}
+
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    stats = {
+        str(csv_path): {"table": table_name, "rows": 0, "parse_seconds": 0.0,
+                        "write_seconds": 0.0, "rows_per_sec": 0.0, "error": None}
+        for csv_path, table_name, _, _ in jobs
+    }
+    written_tables = set()
+    started = time.perf_counter()
+
+    context = multiprocessing.get_context()
+    queue = context.Queue(maxsize=queue_size)
+    stop = context.Event()
+    with bulk_changes(conn), ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                                 initializer=_init_parser, initargs=(queue, stop)) as pool:
+        futures = [
+            pool.submit(_parse_in_pool, csv_path, table_name, column_types, chunk_size, offset)
+            for csv_path, table_name, column_types, offset in jobs
+        ]
+        try:
+            _write_parsed_chunks(conn, queue, futures, len(jobs), stats, syncs, upsert, written_tables)
+        except BaseException:
+            # Parsers blocked on a full queue would keep the pool from shutting
+            # down: tell them to stop and read until every one has returned.
+            stop.set()
+            for future in futures:
+                future.cancel()
+            while not all(future.done() for future in futures):
+                try:
+                    queue.get(timeout=0.1)
+                except Empty:
+                    pass
+            raise
+
+        for future in futures:
+            future.result()
+
+    if written_tables:
+        note_write(conn, *written_tables)
+
+    elapsed = time.perf_counter() - started
+    total_rows = sum(s["rows"] for s in stats.values())
+    print(f"\n{'File':<32} {'Table':<20} {'Rows':>10} {'Parse s':>8} {'Write s':>8} {'Rows/s':>10}")
+    print("-" * 92)
+    for source, s in stats.items():
+        flag = "  ❌" if s["error"] else ""
+        print(f"{Path(source).name:<32} {s['table']:<20} {s['rows']:>10,} {s['parse_seconds']:>8.2f} "
+              f"{s['write_seconds']:>8.2f} {s['rows_per_sec']:>10,.0f}{flag}")
+    print(f"✅ Loaded {total_rows:,} rows from {len(jobs)} files in {elapsed:.2f}s "
+          f"({total_rows / max(elapsed, 1e-9):,.0f} rows/s, {workers} parser processes)")
+
+    stats["total"] = {"rows": total_rows, "seconds": elapsed, "rows_per_sec": total_rows / max(elapsed, 1e-9)}
+    return stats
+
+def load_all_csv_data(conn, streaming=False, incremental=False, parallel=False):
     """
     Load all CSV datasets into the database.
+
+    With incremental=True, files that have not changed since the last run are
+    skipped and only new or changed rows are upserted, so setup can be re-run
+    against fresh exports. With parallel=True, every CSV in DATA_DIR goes
+    through load_csv_directory() instead.
+
     Returns total number of rows loaded.
     """
+    if parallel:
+        return load_csv_directory(conn, DATA_DIR, upsert=incremental)["total"]["rows"]
+
     total = 0
-    total += load_csv_to_table(conn, DATA_DIR / "cyber_incidents.csv", "cyber_incidents")
-    total += load_csv_to_table(conn, DATA_DIR / "datasets_metadata.csv", "datasets_metadata")
-    total += load_csv_to_table(conn, DATA_DIR / "it_tickets.csv", "it_tickets")
+    for table_name in ("cyber_incidents", "datasets_metadata", "it_tickets"):
+        total += load_csv_to_table(
+            conn, DATA_DIR / f"{table_name}.csv", table_name, streaming, incremental=incremental
+        )
     return total
 
 # ---------- Context Summarization ----------
@@ -45,42 +696,40 @@ def get_domain_context(domain: str) -> str:
     """
     Load domain-specific context from the database and return as a text summary.
     """
-    conn = connect_database()
-
-    if domain == "Cybersecurity":
-        df_all = incidents.get_all_incidents(conn).head(5)
-        df1 = analytic.get_incidents_by_category_count(conn)
-        df2 = analytic.get_high_severity_by_status(conn)
-        summary = (
-            f"Recent incidents:\n{df_all.to_string(index=False)}\n\n"
-            f"Incident categories:\n{df1.to_string(index=False)}\n\n"
-            f"High severity by status:\n{df2.to_string(index=False)}"
-        )
+    with get_connection() as conn:
+        if domain == "Cybersecurity":
+            df_all = incidents.get_all_incidents(conn).head(5)
+            df1 = analytic.get_incidents_by_category_count(conn)
+            df2 = analytic.get_high_severity_by_status(conn)
+            summary = (
+                f"Recent incidents:\n{df_all.to_string(index=False)}\n\n"
+                f"Incident categories:\n{df1.to_string(index=False)}\n\n"
+                f"High severity by status:\n{df2.to_string(index=False)}"
+            )
 
-    elif domain == "Datasets":
-        df_all = datasets.get_all_datasets(conn).head(5)
-        df2 = analytic.get_datasets_by_uploader(conn)
-        df3 = analytic.get_dataset_sizes(conn)
-        summary = (
-            f"Recent datasets:\n{df_all.to_string(index=False)}\n\n"
-            f"Datasets by uploader:\n{df2.to_string(index=False)}\n\n"
-            f"Dataset sizes:\n{df3.to_string(index=False)}"
-        )
+        elif domain == "Datasets":
+            df_all = datasets.get_all_datasets(conn).head(5)
+            df2 = analytic.get_datasets_by_uploader(conn)
+            df3 = analytic.get_dataset_sizes(conn)
+            summary = (
+                f"Recent datasets:\n{df_all.to_string(index=False)}\n\n"
+                f"Datasets by uploader:\n{df2.to_string(index=False)}\n\n"
+                f"Dataset sizes:\n{df3.to_string(index=False)}"
+            )
 
-    elif domain == "Tickets":
-        df_all = tickets.get_all_tickets(conn).head(5)
-        df1 = analytic.get_tickets_by_status(conn)
-        df2 = analytic.get_avg_resolution_time(conn)
-        df3 = analytic.get_tickets_by_assignee(conn)
-        summary = (
-            f"Recent tickets:\n{df_all.to_string(index=False)}\n\n"
-            f"Tickets by status:\n{df1.to_string(index=False)}\n\n"
-            f"Avg resolution time:\n{df2.to_string(index=False)}\n\n"
-            f"Tickets by assignee:\n{df3.to_string(index=False)}"
-        )
+        elif domain == "Tickets":
+            df_all = tickets.get_all_tickets(conn).head(5)
+            df1 = analytic.get_tickets_by_status(conn)
+            df2 = analytic.get_avg_resolution_time(conn)
+            df3 = analytic.get_tickets_by_assignee(conn)
+            summary = (
+                f"Recent tickets:\n{df_all.to_string(index=False)}\n\n"
+                f"Tickets by status:\n{df1.to_string(index=False)}\n\n"
+                f"Avg resolution time:\n{df2.to_string(index=False)}\n\n"
+                f"Tickets by assignee:\n{df3.to_string(index=False)}"
+            )
 
-    else:
-        summary = "No domain-specific context available."
+        else:
+            summary = "No domain-specific context available."
 
-    conn.close()
     return summary
\ No newline at end of file
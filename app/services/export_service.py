@@ -0,0 +1,178 @@
+import gzip
+import tempfile
+import pandas as pd
+import streamlit as st
+from config import EXPORT_CHUNK_SIZE
+from app.data.db import get_connection
+from app.data.search import build_search_query
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is offered only when pyarrow is installed
+    pa = pq = None
+
+# Format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "CSV (gzip)": (".csv.gz", "application/gzip"),
+}
+if pq is not None:
+    EXPORT_FORMATS["Parquet"] = (".parquet", "application/vnd.apache.parquet")
+
+# Whole-table exports use the same newest-first order as the record pages:
+# table -> (order column, tie-breaker), both indexed.
+EXPORT_ORDER = {
+    "cyber_incidents": ("timestamp_epoch", "incident_id"),
+    "datasets_metadata": ("upload_date", "dataset_id"),
+    "it_tickets": ("created_at_epoch", "rowid"),
+}
+
+def build_export_query(table, columns, term=None, order_by=None):
+    """
+    Build the SQL for every record an export covers.
+
+    Args:
+        table: Domain table name (a key of EXPORT_ORDER)
+        columns: Columns to export
+        term: Search text; exports all matches (best first) instead of the whole table
+        order_by: ORDER BY clause for a whole-table export instead of the
+            newest-first default (e.g. "rows DESC")
+
+    Returns:
+        tuple: (sql, params)
+    """
+    if term:
+        sql, params = build_search_query(table, columns, term, limit=None)
+        if sql is not None:
+            return sql, params
+    if order_by is None:
+        order_column, key_column = EXPORT_ORDER[table]
+        order_by = f"{order_column} DESC, {key_column} DESC"
+    sql = f"SELECT {', '.join(columns)} FROM {table} ORDER BY {order_by}"
+    return sql, []
+
+def _parquet_schema(chunk):
+    # Columns that are all NULL in the first chunk would get pyarrow's "null"
+    # type and reject later values; store them as text.
+    schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(i, pa.field(field.name, pa.string()))
+    return schema
+
+def _query_columns(conn, sql, params):
+    cursor = conn.execute(f"SELECT * FROM ({sql}) LIMIT 0", params or [])
+    return [d[0] for d in cursor.description]
+
+def write_export(conn, out, sql, params=None, fmt="CSV", labels=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Stream a query result to a binary file in chunks.
+
+    Rows are fetched chunk_size at a time with a cursor and each chunk is
+    written before the next is read, so memory stays at one chunk however
+    many rows the query returns.
+
+    Args:
+        conn: Database connection
+        out: Binary file object to write to
+        sql: SELECT to export
+        params: Query parameters
+        fmt: A key of EXPORT_FORMATS
+        labels: {column: header} renames for the written file
+        chunk_size: Rows per chunk
+
+    Returns:
+        int: Number of rows written
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    chunks = pd.read_sql_query(sql, conn, params=params or [], chunksize=chunk_size)
+    rows = 0
+
+    if fmt == "Parquet":
+        writer = None
+        try:
+            for chunk in chunks:
+                chunk = chunk.rename(columns=labels or {})
+                if writer is None:
+                    writer = pq.ParquetWriter(out, _parquet_schema(chunk))
+                writer.write_table(pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False))
+                rows += len(chunk)
+            if writer is None:
+                # No chunks at all: still write a file with the columns
+                header = [(labels or {}).get(c, c) for c in _query_columns(conn, sql, params)]
+                writer = pq.ParquetWriter(out, pa.schema([(c, pa.string()) for c in header]))
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    target = gzip.GzipFile(fileobj=out, mode="wb") if fmt == "CSV (gzip)" else out
+    header_written = False
+    try:
+        for chunk in chunks:
+            chunk = chunk.rename(columns=labels or {})
+            target.write(chunk.to_csv(index=False, header=not header_written).encode("utf-8"))
+            header_written = True
+            rows += len(chunk)
+        if not header_written:
+            # No chunks at all: still write the header row
+            header = [(labels or {}).get(c, c) for c in _query_columns(conn, sql, params)]
+            target.write(pd.DataFrame(columns=header).to_csv(index=False).encode("utf-8"))
+    finally:
+        if target is not out:
+            target.close()  # flushes the gzip trailer; leaves out open
+    return rows
+
+def export_records(table, columns, term=None, fmt="CSV", labels=None, order_by=None,
+                   chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Export a table's records (or all search matches) to a temporary file.
+
+    Opens its own read-only pooled connection, so it can run on the thread
+    Streamlit uses for deferred downloads. The rows are written chunk by chunk
+    to a temporary file, which is read back and closed (and so deleted) before
+    returning: Streamlit reads a returned file into bytes but never closes it.
+
+    Returns:
+        bytes: The exported file
+    """
+    sql, params = build_export_query(table, columns, term, order_by)
+    with tempfile.TemporaryFile(buffering=1024 * 1024) as out:
+        with get_connection(read_only=True) as conn:
+            write_export(conn, out, sql, params, fmt, labels, chunk_size)
+        out.seek(0)
+        return out.read()
+
+def render_export_button(key, table, columns, term=None, labels=None, noun="records", order_by=None):
+    """
+    Show a format picker and a download button for a table's records.
+
+    Nothing is exported until the button is clicked; the file is then built
+    by export_records() on Streamlit's download thread, without a rerun.
+
+    Args:
+        key: Unique widget key prefix (e.g. "incidents")
+        table: Domain table name
+        columns: Columns to export
+        term: Current search text (exports all matches), or None for every record
+        labels: {column: header} renames for the file
+        noun: What the records are called on the button and in the file name
+        order_by: ORDER BY clause for a whole-table export (see build_export_query)
+    """
+    col1, col2 = st.columns([1, 3])
+    fmt = col1.selectbox("Format", list(EXPORT_FORMATS), key=f"{key}_export_format",
+                         label_visibility="collapsed")
+    extension, mime = EXPORT_FORMATS[fmt]
+    scope = "matching" if term else "all"
+    col2.download_button(
+        label=f"📥 Export {scope} {noun} ({fmt})",
+        data=lambda: export_records(table, columns, term, fmt, labels, order_by),
+        file_name=f"{'filtered' if term else 'all'}_{noun.replace(' ', '_')}{extension}",
+        mime=mime,
+        on_click="ignore",
+        key=f"{key}_export",
+        width="stretch"
+    )
@@ -0,0 +1,47 @@
+import streamlit as st
+from app.data.changes import apply_kpi_changes, change_log_covers, get_change_version, get_changes_since
+
+# KPI dicts shown by a page live in st.session_state under "<key>_kpis", with
+# the change_log version they reflect under "<key>_kpis_version".
+
+def kpi_state_keys(key):
+    """Session-state entries get_live_kpis() keeps for a key."""
+    return [f"{key}_kpis", f"{key}_kpis_version"]
+
+def get_live_kpis(conn, key, table, load, state=None):
+    """
+    Return a table's KPIs for this session, patched from the change log.
+
+    The first call loads them in full; later reruns read only the changes
+    since then and adjust the numbers, falling back to a full load when the
+    changes can't be applied (a bulk reload, or a KPI that needs every row).
+
+    Args:
+        conn: Database connection
+        key: Session-state prefix, e.g. "incidents"
+        table: Table the KPIs summarise, e.g. "cyber_incidents"
+        load: Full KPI query, e.g. analytic.get_incident_kpis
+        state: Dict to keep the KPIs in instead of st.session_state (for loader
+            threads, which must not touch session state)
+
+    Returns:
+        dict: KPI name -> value
+    """
+    state = st.session_state if state is None else state
+    kpis_key, version_key = kpi_state_keys(key)
+    if kpis_key in state:
+        version = state[version_key]
+        changes = get_changes_since(conn, version, [table])
+        if changes.empty:
+            return state[kpis_key]
+        kpis = None
+        if change_log_covers(conn, version):
+            kpis = apply_kpi_changes(table, state[kpis_key], changes)
+        if kpis is not None:
+            state[kpis_key] = kpis
+            state[version_key] = int(changes["version"].max())
+            return kpis
+
+    state[version_key] = get_change_version(conn)
+    state[kpis_key] = load(conn)
+    return state[kpis_key]
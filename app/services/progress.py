@@ -0,0 +1,3 @@
+def print_progress(name, rows_done, rows_per_sec):
+    """Default progress reporter for streaming loads and migrations."""
+    print(f"   ⏳ {name}: {rows_done:,} rows committed ({rows_per_sec:,.0f} rows/s)")
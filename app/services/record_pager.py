@@ -0,0 +1,132 @@
+import pandas as pd
+import streamlit as st
+from config import RECORDS_PAGE_SIZE
+from app.data.db import get_connection
+from app.data.changes import apply_changes_to_frame, change_log_covers, get_change_version, get_changes_since
+from app.data.timeutil import to_epoch
+from app.data.typed_frames import apply_domain_types
+
+# Rows already fetched for each record table live in st.session_state under
+# "<key>_records" (DataFrame), "<key>_cursor" (keyset cursor or None) and
+# "<key>_version" (change_log version they reflect). Every session keeps its
+# own copy, so the frames are stored in their compact typed form
+# (categoricals, downcast numbers, datetimes; see app/data/typed_frames.py).
+
+# key -> (table, key column, time column, cursor order value of a time, cursor tie-breaker)
+LIVE_RECORDS = {
+    "incidents": ("cyber_incidents", "incident_id", "timestamp", to_epoch, "incident_id"),
+    "datasets": ("datasets_metadata", "dataset_id", "upload_date", str, "dataset_id"),
+    "tickets": ("it_tickets", "ticket_id", "created_at", to_epoch, "rowid"),
+}
+
+def record_state_keys(key):
+    """Session-state entries get_loaded_records() keeps for a key."""
+    return [f"{key}_records", f"{key}_cursor", f"{key}_version"]
+
+def _apply_record_changes(conn, key, state):
+    """Patch the session's records with changes since they were read; reset them if that's not possible."""
+    table, key_column, time_column, order_value, tie_breaker = LIVE_RECORDS[key]
+    version = state[f"{key}_version"]
+    changes = get_changes_since(conn, version, [table])
+    if changes.empty:
+        return
+
+    cursor = state[f"{key}_cursor"]
+
+    def sort_value(row):
+        try:
+            return order_value(row[time_column]) if row.get(time_column) is not None else None
+        except (ValueError, TypeError, OverflowError):
+            return None   # unparseable: its epoch column is NULL too
+
+    def in_loaded_window(row, rowid):
+        # Newest first, NULL times last: the loaded pages hold every row before the cursor.
+        if cursor is None:
+            return True
+        value = sort_value(row)
+        tie = rowid if tie_breaker == "rowid" else row.get(tie_breaker)
+        if cursor[0] is None:
+            return value is not None or (tie is not None and tie > cursor[1])
+        return value is not None and (value, tie) > tuple(cursor)
+
+    df = None
+    if change_log_covers(conn, version):
+        df = apply_changes_to_frame(
+            state[f"{key}_records"], changes, key_column, include=in_loaded_window
+        )
+    if df is None:
+        reset_records(key, state)
+        return
+    # Typing parses the time column, so patched and original rows sort together.
+    df = apply_domain_types(df, table)
+    df = df.sort_values([time_column, key_column], ascending=False, na_position="last", ignore_index=True)
+    state[f"{key}_records"] = df
+    state[f"{key}_version"] = int(changes["version"].max())
+
+def _typed(key, df):
+    return apply_domain_types(df, LIVE_RECORDS[key][0]) if key in LIVE_RECORDS else df
+
+def get_loaded_records(conn, key, fetch_page, page_size=RECORDS_PAGE_SIZE, state=None):
+    """
+    Return the records loaded so far for this session, fetching the first page on first use.
+
+    Rows written since they were loaded (by this or any other session) are
+    applied from the change log, so a rerun only reads the delta.
+
+    Args:
+        conn: Database connection
+        key: Session-state prefix, e.g. "incidents"
+        fetch_page: Keyset page function, e.g. incidents.get_incidents_page
+        page_size: Rows per page
+        state: Dict to keep the records in instead of st.session_state (for
+            loader threads, which must not touch session state)
+
+    Returns:
+        tuple: (pandas.DataFrame loaded rows, bool has_more)
+    """
+    state = st.session_state if state is None else state
+    records_key, cursor_key, version_key = record_state_keys(key)
+    if records_key in state and key in LIVE_RECORDS:
+        _apply_record_changes(conn, key, state)
+    if records_key not in state:
+        # Read the version first: anything written during the fetch is re-applied, not missed.
+        state[version_key] = get_change_version(conn)
+        df, cursor = fetch_page(conn, page_size=page_size)
+        state[records_key] = _typed(key, df)
+        state[cursor_key] = cursor
+    return state[records_key], state[cursor_key] is not None
+
+def load_next_page(conn, key, fetch_page, page_size=RECORDS_PAGE_SIZE):
+    """Fetch the page after the session's cursor and append it to the loaded records."""
+    records_key, cursor_key = f"{key}_records", f"{key}_cursor"
+    cursor = st.session_state.get(cursor_key)
+    if cursor is None:
+        return
+    df, next_cursor = fetch_page(conn, page_size=page_size, cursor=cursor)
+    # Re-typing after concat merges pages whose categories differ.
+    st.session_state[records_key] = _typed(key, pd.concat([st.session_state[records_key], df], ignore_index=True))
+    st.session_state[cursor_key] = next_cursor
+
+def reset_records(key, state=None):
+    """Forget the loaded records so the next run starts again from the first page."""
+    state = st.session_state if state is None else state
+    for name in record_state_keys(key):
+        state.pop(name, None)
+
+def _load_next_page_on_click(key, fetch_page, page_size):
+    # Button callbacks run before the next run, after this run's connection was returned.
+    with get_connection() as conn:
+        load_next_page(conn, key, fetch_page, page_size)
+
+def render_load_more(conn, key, fetch_page, has_more, page_size=RECORDS_PAGE_SIZE):
+    """
+    Show "Load more" / "Reload" buttons under a records table.
+
+    The buttons act in click callbacks, so the rerun they trigger (the whole
+    page, or just the fragment the table is drawn in) already shows the result.
+    """
+    col1, col2 = st.columns(2)
+    col1.button("⬇️ Load more", key=f"{key}_load_more", disabled=not has_more, width="stretch",
+                on_click=_load_next_page_on_click, args=(key, fetch_page, page_size))
+    col2.button("🔄 Reload from newest", key=f"{key}_reload", width="stretch",
+                on_click=reset_records, args=(key,))
@@ -0,0 +1,69 @@
+import functools
+import time
+from contextlib import contextmanager
+import pandas as pd
+import streamlit as st
+from config import LOG_RENDER_TIMINGS
+
+# Per-session render statistics live in st.session_state["render_timings"]:
+# {region: {"runs", "last_ms", "total_ms"}}. Pages time their whole script as
+# one region and each fragment as another, so a widget that only reruns its
+# fragment shows up as that fragment's run count going up while the page's
+# stays the same.
+
+def _stats():
+    return st.session_state.setdefault("render_timings", {})
+
+def record_region_time(name, elapsed_ms):
+    """Add one run of elapsed_ms to the session's render timings for name."""
+    entry = _stats().setdefault(name, {"runs": 0, "last_ms": 0.0, "total_ms": 0.0})
+    entry["runs"] += 1
+    entry["last_ms"] = elapsed_ms
+    entry["total_ms"] += elapsed_ms
+    if LOG_RENDER_TIMINGS:
+        print(f"⏱️ {name}: {elapsed_ms:.1f} ms")
+
+@contextmanager
+def timed_region(name):
+    """Time a block of a page and record it under name in the session's render timings."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_region_time(name, (time.perf_counter() - started) * 1000)
+
+def timed_fragment(name):
+    """
+    Decorator: run a page region as a Streamlit fragment and time every run of it.
+
+    A widget inside the fragment reruns only that function (with the arguments
+    of its last full run); everything else on the page is left as drawn.
+    """
+    def decorator(func):
+        @st.fragment
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed_region(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def get_render_timings():
+    """
+    Return this session's render timings.
+
+    Returns:
+        pandas.DataFrame: region, runs, last_ms, avg_ms (slowest last run first)
+    """
+    rows = [
+        {"region": name, "runs": s["runs"], "last_ms": s["last_ms"], "avg_ms": s["total_ms"] / s["runs"]}
+        for name, s in _stats().items()
+    ]
+    df = pd.DataFrame(rows, columns=["region", "runs", "last_ms", "avg_ms"])
+    return df.sort_values("last_ms", ascending=False, ignore_index=True)
+
+def render_timings_panel():
+    """Show the session's render timings in a sidebar expander."""
+    with st.sidebar.expander("⏱️ Render timings"):
+        st.caption("Runs per region this session. A fragment rerun only adds to its own row.")
+        st.dataframe(get_render_timings().round(1), hide_index=True, width="stretch")
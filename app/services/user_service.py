@@ -1,8 +1,21 @@
-import bcrypt
-from config import DATA_DIR
+from config import DATA_DIR, SESSION_SECRET, SESSION_TTL, BCRYPT_ROUNDS, USER_MIGRATION_BATCH_SIZE
+import base64
+import hashlib
+import hmac
+import secrets
 import sqlite3
-from app.data.db import connect_database
+import threading
+import time
+from collections import namedtuple
+from itertools import islice
+from pathlib import Path
+import pandas as pd
+from app.data.db import get_connection
 from app.data.schema import create_users_table
+from app.services.auth_executor import AuthBusyError, get_auth_executor, hash_rounds
+from app.services.progress import print_progress
+
+BUSY_MESSAGE = "The sign-in service is busy right now. Please try again in a few seconds."
 
 def register_user(username, password, role="user"):
     """
@@ -16,31 +29,82 @@ def register_user(username, password, role="user"):
     Returns:
         tuple: (success: bool, message: str)
     """
-    conn = connect_database()
-    cursor = conn.cursor()
+    with get_connection() as conn:
+        cursor = conn.cursor()
 
-    # Check if user already exists
-    cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-    if cursor.fetchone():
-        conn.close()
-        return False, f"Username '{username}' already exists."
+        # Check if user already exists
+        cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
+        if cursor.fetchone():
+            return False, f"Username '{username}' already exists."
 
-    # Hash the password
-    password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    password_hash = hashed.decode('utf-8')
+    # Hash the password on the bounded hashing pool (outside the checkout so
+    # the connection isn't held during bcrypt)
+    try:
+        password_hash = get_auth_executor().hash_password(password)
+    except AuthBusyError:
+        return False, BUSY_MESSAGE
 
     # Insert new user
-    cursor.execute(
-        "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-        (username, password_hash, role)
-    )
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        try:
+            conn.execute(
+                "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+                (username, password_hash, role)
+            )
+            conn.commit()
+        except sqlite3.IntegrityError:
+            return False, f"Username '{username}' already exists."
 
     return True, f"User '{username}' registered successfully!"
 
+def _authenticate(username, password):
+    """Check a username and password; returns (success, message, role)."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        # Find user
+        cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
+        user = cursor.fetchone()
+
+    if not user:
+        return False, "Username not found.", None
+
+    # Verify password on the hashing pool (user[2] is password_hash column)
+    stored_hash = user[2]
+    try:
+        valid = get_auth_executor().check_password(password, stored_hash)
+    except AuthBusyError:
+        return False, BUSY_MESSAGE, None
+
+    if not valid:
+        return False, "Invalid password.", None
+
+    if hash_rounds(stored_hash) != BCRYPT_ROUNDS:
+        _rehash_password(username, password, stored_hash)
+    return True, f"Welcome, {username}!", user[3] or "user"
+
+def _rehash_password(username, password, stored_hash):
+    """
+    Replace a verified password's hash with one made at the calibrated cost.
+
+    Runs right after a successful login (the only time the plain password is
+    known), so hashes migrated from users.txt or made before a recalibration
+    move to BCRYPT_ROUNDS and every later login costs the same. Skipped
+    when the hashing pool is busy; the next login tries again.
+    """
+    try:
+        new_hash = get_auth_executor().hash_password(password, BCRYPT_ROUNDS)
+    except AuthBusyError:
+        return False
+    with get_connection() as conn:
+        # Only if the hash wasn't changed meanwhile (e.g. a concurrent login already rehashed it)
+        cursor = conn.execute(
+            "UPDATE users SET password_hash = ? WHERE username = ? AND password_hash = ?",
+            (new_hash, username, stored_hash)
+        )
+        conn.commit()
+    return cursor.rowcount > 0
+
 def login_user(username, password):
     """
     Authenticate a user against the database.
@@ -52,63 +116,271 @@ def login_user(username, password):
     Returns:
         tuple: (success: bool, message: str)
     """
-    conn = connect_database()
-    cursor = conn.cursor()
+    success, message, _ = _authenticate(username, password)
+    return success, message
 
-    # Find user
-    cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-    user = cursor.fetchone()
-    conn.close()
+def login_session(username, password):
+    """
+    Authenticate a user and open a session for them.
 
-    if not user:
-        return False, "Username not found."
+    Returns:
+        tuple: (success: bool, message: str, session token or None)
+    """
+    success, message, role = _authenticate(username, password)
+    if not success:
+        return False, message, None
+    return True, message, issue_session_token(username, role)
 
-    # Verify password (user[2] is password_hash column)
-    stored_hash = user[2]
-    password_bytes = password.encode('utf-8')
-    hash_bytes = stored_hash.encode('utf-8')
+# ---------- Session tokens ----------
+# A token is "<session id>.<expiry>.<HMAC of both>", signed with SESSION_SECRET.
+# The principal it stands for lives in this process's memory, so pages
+# resolve who is logged in (and their role) with an HMAC check and a dict
+# lookup, never a users-table query or bcrypt. Tokens not found in the cache
+# (logged out, invalidated, issued before a restart) are rejected.
+
+Principal = namedtuple("Principal", ["username", "role", "expires"])
+
+_sessions = {}          # session id -> Principal
+_user_sessions = {}     # username -> {session ids}
+_sessions_lock = threading.Lock()
 
-    if bcrypt.checkpw(password_bytes, hash_bytes):
-        return True, f"Welcome, {username}!"
-    else:
-        return False, "Invalid password."
+def _sign(payload):
+    digest = hmac.new(SESSION_SECRET, payload.encode("utf-8"), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+def _drop_session(session_id):
+    principal = _sessions.pop(session_id, None)
+    if principal is not None:
+        ids = _user_sessions.get(principal.username)
+        if ids is not None:
+            ids.discard(session_id)
+            if not ids:
+                del _user_sessions[principal.username]
+
+def _prune_expired(now):
+    for session_id in [sid for sid, p in _sessions.items() if p.expires <= now]:
+        _drop_session(session_id)
+
+def _verify_token(token):
+    """Return (session_id, expires) of a correctly signed token, or None."""
+    if not token:
+        return None
+    try:
+        session_id, expires, signature = token.split(".")
+        expires = int(expires)
+    except ValueError:
+        return None
+    if not hmac.compare_digest(signature, _sign(f"{session_id}.{expires}")):
+        return None
+    return session_id, expires
+
+def issue_session_token(username, role="user", ttl=SESSION_TTL):
+    """
+    Open a session for an authenticated user.
+
+    Args:
+        username: User's login name
+        role: User's role (cached for the life of the session)
+        ttl: Seconds until the token expires
+
+    Returns:
+        str: Signed session token (keep it in st.session_state)
+    """
+    now = time.time()
+    session_id = secrets.token_urlsafe(16)
+    expires = int(now + ttl)
+    payload = f"{session_id}.{expires}"
+    with _sessions_lock:
+        _prune_expired(now)
+        _sessions[session_id] = Principal(username, role, expires)
+        _user_sessions.setdefault(username, set()).add(session_id)
+    return f"{payload}.{_sign(payload)}"
+
+def resolve_session_token(token):
+    """
+    Return who a session token belongs to, without touching the database.
+
+    Args:
+        token: Token from issue_session_token(), or None
+
+    Returns:
+        Principal: (username, role, expires), or None if the token is missing,
+        forged, expired, logged out or invalidated
+    """
+    verified = _verify_token(token)
+    if verified is None:
+        return None
+    session_id, expires = verified
+    if expires <= time.time():
+        with _sessions_lock:
+            _drop_session(session_id)
+        return None
+    return _sessions.get(session_id)
+
+def revoke_session_token(token):
+    """End one session (logout). A token that isn't correctly signed ends nothing."""
+    verified = _verify_token(token)
+    if verified is None:
+        return
+    with _sessions_lock:
+        _drop_session(verified[0])
 
-def migrate_users_from_file(conn, filepath=DATA_DIR / "users.txt"):
+def invalidate_user_sessions(username, role=None):
+    """
+    Invalidate the cached principals of every session of a user.
+
+    Args:
+        username: User whose sessions change
+        role: New role to give the open sessions; None ends them instead
+
+    Returns:
+        int: Number of sessions affected
+    """
+    with _sessions_lock:
+        session_ids = list(_user_sessions.get(username, ()))
+        for session_id in session_ids:
+            if role is None:
+                _drop_session(session_id)
+            else:
+                _sessions[session_id] = _sessions[session_id]._replace(role=role)
+    return len(session_ids)
+
+def update_user_role(username, role):
+    """
+    Change a user's role and apply it to their open sessions.
+
+    Args:
+        username: User's login name
+        role: New role
+
+    Returns:
+        tuple: (success: bool, message: str)
+    """
+    with get_connection() as conn:
+        cursor = conn.execute("UPDATE users SET role = ? WHERE username = ?", (role, username))
+        conn.commit()
+    if cursor.rowcount == 0:
+        return False, f"Username '{username}' not found."
+    invalidate_user_sessions(username, role=role)
+    return True, f"User '{username}' is now '{role}'."
+
+# ---------- Migration from users.txt ----------
+# "username,hash[,ignored...]": a non-empty username without commas and a
+# bcrypt hash ("$2b$12$" + 22-character salt + 31-character digest).
+USER_LINE_PATTERN = r"\s*[^,\s][^,]*,\s*\$2[abxy]?\$\d{2}\$[./A-Za-z0-9]{53}\s*(?:,.*)?"
+
+def _empty_migration_stats():
+    return {"read": 0, "inserted": 0, "skipped": 0, "invalid": 0, "failed": 0, "elapsed": 0.0}
+
+def _parse_user_lines(lines):
+    """
+    Validate a batch of users.txt lines in one vectorized pass and split the valid ones.
+
+    Returns:
+        tuple: (list of (username, password_hash) rows, number of invalid lines)
+    """
+    text = pd.Series(lines, dtype="str").str.strip()
+    text = text[text.str.len() > 0]
+    valid = text.str.fullmatch(USER_LINE_PATTERN)
+    rows = []
+    for line in text[valid].tolist():
+        username, password_hash = line.split(",", 2)[:2]
+        rows.append((username.strip(), password_hash.strip()))
+    return rows, len(text) - len(rows)
+
+def migrate_users_from_file(conn, filepath=DATA_DIR / "users.txt", batch_size=USER_MIGRATION_BATCH_SIZE,
+                            progress=print_progress):
     """
     Migrate users from users.txt to the database.
 
+    The file is streamed batch_size lines at a time. Each batch is validated
+    (non-empty username, well-formed bcrypt hash) in one vectorized pass and
+    inserted with executemany in its own transaction; usernames already in
+    the database are left as they are. A batch the database rejects is rolled
+    back and stops the migration: its rows are counted as failed and the rest
+    of the file is not read, so the migration can simply be run again.
+
     Args:
         conn: Database connection
-        filepath: Path to users.txt file
+        filepath: Path to users.txt file ("username,bcrypt hash" per line)
+        batch_size: Lines per batch / transaction
+        progress: Callable(name, lines_read, lines_per_sec) called after each batch, or None
+
+    Returns:
+        dict: read (non-blank lines), inserted, skipped (already registered),
+        invalid (malformed lines), failed (valid lines in a rejected batch),
+        elapsed (seconds)
     """
+    stats = _empty_migration_stats()
+    filepath = Path(filepath)
     if not filepath.exists():
         print(f"🔺 File not found: {filepath}")
         print("   No users to migrate.")
-        return
+        return stats
+
+    started = time.perf_counter()
+    insert = "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, 'user')"
+
+    with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+        while True:
+            lines = list(islice(f, batch_size))
+            if not lines:
+                break
+            rows, invalid = _parse_user_lines(lines)
+            stats["read"] += len(rows) + invalid
+            stats["invalid"] += invalid
+
+            before = conn.total_changes
+            try:
+                conn.executemany(insert, rows)
+                conn.commit()
+            except sqlite3.Error as e:
+                conn.rollback()
+                print(f"❌ Error migrating a batch from {filepath.name}: {e}")
+                stats["failed"] += len(rows)
+                break
+            inserted = conn.total_changes - before
+            stats["inserted"] += inserted
+            stats["skipped"] += len(rows) - inserted
 
-    cursor = conn.cursor()
-    migrated_count = 0
-
-    with open(filepath, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-
-            parts = line.split(',')
-            if len(parts) >= 2:
-                username = parts[0]
-                password_hash = parts[1]
-
-                try:
-                    cursor.execute(
-                        "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-                        (username, password_hash, 'user')
-                    )
-                    if cursor.rowcount > 0:
-                        migrated_count += 1
-                except sqlite3.Error as e:
-                    print(f"Error migrating user {username}: {e}")
-
-    conn.commit()
-    print(f"✅ Migrated {migrated_count} users from {filepath.name}")
\ No newline at end of file
+            if progress:
+                elapsed = time.perf_counter() - started
+                progress(filepath.name, stats["read"], stats["read"] / elapsed if elapsed else 0.0)
+
+    stats["elapsed"] = time.perf_counter() - started
+    status = "⚠️ Stopped after migrating" if stats["failed"] else "✅ Migrated"
+    print(f"{status} {stats['inserted']} users from {filepath.name} "
+          f"({stats['skipped']} already registered, {stats['invalid']} invalid, {stats['failed']} failed, "
+          f"{stats['elapsed']:.2f}s)")
+    return stats
+
+def migrate_users_from_directory(conn, folder, pattern="*.txt", batch_size=USER_MIGRATION_BATCH_SIZE,
+                                 progress=print_progress):
+    """
+    Migrate every legacy user file in a folder (e.g. exports split across files).
+
+    Args:
+        conn: Database connection
+        folder: Directory to read
+        pattern: Glob of the user files in it
+
+    Returns:
+        dict: Totals over all files, as migrate_users_from_file(), plus files
+        (files read; a file with a failed batch is the last one)
+    """
+    started = time.perf_counter()
+    totals = _empty_migration_stats()
+    files = sorted(Path(folder).glob(pattern))
+    totals["files"] = 0
+    for filepath in files:
+        stats = migrate_users_from_file(conn, filepath, batch_size, progress)
+        for key in ("read", "inserted", "skipped", "invalid", "failed"):
+            totals[key] += stats[key]
+        totals["files"] += 1
+        if stats["failed"]:
+            break
+    totals["elapsed"] = time.perf_counter() - started
+    status = "⚠️ Stopped after migrating" if totals["failed"] else "✅ Migrated"
+    print(f"{status} {totals['inserted']} users from {totals['files']} of {len(files)} files "
+          f"in {totals['elapsed']:.2f}s")
+    return totals
@@ -0,0 +1,87 @@
+"""
+Approximate distinct-count and top-N tests for app/data/approx.py.
+
+Estimates over the seeded tables must match exact counts. A Space-Saving
+counter must never undercount and never overcount by more than its
+documented bound, even after values are taken off it; the registry must
+stream the column again once deletes and updates have stretched that bound
+past twice the row count, or once a value's last row is deleted (a
+HyperLogLog can't forget it).
+
+Run with:
+    python -m pytest -q approx_test.py
+"""
+import random
+from collections import Counter
+import pandas as pd
+import pytest
+from app.data.approx import SpaceSaving, approx_distinct, approx_registry, approx_top_k
+from app.data.db import connect_database
+
+@pytest.fixture(scope="module")
+def conn(seeded_db):
+    conn = connect_database(seeded_db, profile="sqlite_defaults")
+    yield conn
+    conn.close()
+
+@pytest.mark.parametrize("table, column", [
+    ("cyber_incidents", "category"), ("datasets_metadata", "uploaded_by"), ("it_tickets", "assigned_to"),
+])
+def test_approx_counts_match_exact(conn, table, column):
+    exact = pd.read_sql_query(
+        f"SELECT {column}, COUNT(*) AS count FROM {table} WHERE {column} IS NOT NULL "
+        f"GROUP BY {column} ORDER BY count DESC", conn
+    )
+    assert approx_distinct(conn, table, column) == len(exact)
+    top = approx_top_k(conn, table, column, n=3)
+    assert top["count"].tolist() == exact["count"].head(3).tolist()
+
+def test_space_saving_bound_holds_after_removals():
+    rng = random.Random(15)
+    heavy, exact = SpaceSaving(error=0.05), Counter()
+    for _ in range(20):
+        added = [f"v{int(rng.paretovariate(1.2))}" for _ in range(500)]
+        heavy.add_many(added)
+        exact.update(added)
+        removed = rng.sample(sorted(exact.elements()), 300)
+        heavy.remove_many(removed)
+        exact.subtract(removed)
+
+    assert heavy.total == sum(exact.values())
+    bound = heavy.added / heavy.capacity
+    reported = {value: (count, error) for value, count, error in heavy.top(heavy.capacity)}
+    for value, (count, error) in reported.items():
+        assert exact[value] <= count <= exact[value] + error
+        assert error <= bound
+    # Anything more frequent than the bound is reported.
+    assert {value for value, count in exact.items() if count > bound} <= set(reported)
+
+def test_churn_past_the_row_count_rescans_the_column(db, monkeypatch):
+    approx_top_k(db, "it_tickets", "assigned_to")
+    rebuilds = []
+    build = approx_registry._build
+    monkeypatch.setattr(approx_registry, "_build", lambda *args: rebuilds.append(args) or build(*args))
+
+    # Handing every ticket to the next assignee twice folds in two values per row,
+    # while every assignee keeps some tickets.
+    assignees = [row[0] for row in db.execute("SELECT DISTINCT assigned_to FROM it_tickets ORDER BY 1")]
+    rotate = " ".join(f"WHEN '{a}' THEN '{b}'" for a, b in zip(assignees, assignees[1:] + assignees[:1]))
+    for _ in range(2):
+        db.execute(f"UPDATE it_tickets SET assigned_to = CASE assigned_to {rotate} END")
+        db.commit()
+        top = approx_top_k(db, "it_tickets", "assigned_to", n=3)
+    assert len(rebuilds) == 1
+    exact = db.execute(
+        "SELECT COUNT(*) FROM it_tickets GROUP BY assigned_to ORDER BY COUNT(*) DESC LIMIT 3"
+    ).fetchall()
+    assert top["count"].tolist() == [count for count, in exact]
+    assert top["error"].tolist() == [0, 0, 0]
+
+def test_value_with_no_rows_left_leaves_the_distinct_count(db):
+    assert approx_distinct(db, "datasets_metadata", "uploaded_by") == 4
+    db.execute("INSERT INTO datasets_metadata (name, rows, columns, uploaded_by) VALUES ('new', 5, 2, 'newcomer')")
+    db.commit()
+    assert approx_distinct(db, "datasets_metadata", "uploaded_by") == 5
+    db.execute("DELETE FROM datasets_metadata WHERE uploaded_by = 'newcomer'")
+    db.commit()
+    assert approx_distinct(db, "datasets_metadata", "uploaded_by") == 4
@@ -1,11 +1,20 @@
 import bcrypt
 import os
+import sqlite3
+from contextlib import closing
+from config import BCRYPT_ROUNDS
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory file locks
+    fcntl = None
 
 USER_DATA_FILE = "user.txt"
+USER_INDEX_FILE = USER_DATA_FILE + ".idx"
 
 def hash_password(plain_text_password):
     password_bytes = plain_text_password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(BCRYPT_ROUNDS)
     hashed_str = bcrypt.hashpw(password_bytes, salt)
     return hashed_str
 
@@ -17,24 +26,142 @@ def verify_password(plain_text_password, hashed_password):
         hashed_bytes = hashed_password
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
+# ---------- Sidecar index ----------
+# user.txt stays a plain "username,hash" text file. USER_INDEX_FILE is a
+# small SQLite file mapping each username to the byte offset of its line,
+# so lookups read one line instead of scanning the whole file. The index
+# records how many bytes of user.txt it covers: lines appended by older
+# code, by hand or by a register that crashed before indexing are picked
+# up from that point on the next open, and the index is rebuilt if the file
+# shrank. Deleting the index is always safe.
+
+def _lock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+def _parse_line(line):
+    """Split a user.txt line into (username, hash), or None for blank/malformed lines."""
+    line = line.decode('utf-8', errors='replace').strip()
+    if ',' not in line:
+        return None
+    stored_username, stored_hash = line.split(',', 1)
+    return stored_username, stored_hash
+
+def _catch_up(conn):
+    """Index the lines appended to user.txt since the index was last updated."""
+    size = os.path.getsize(USER_DATA_FILE) if os.path.exists(USER_DATA_FILE) else 0
+    indexed = conn.execute("SELECT indexed_bytes FROM index_state WHERE id = 1").fetchone()[0]
+    if size == indexed:
+        return
+    if size < indexed:
+        # The file was truncated or rewritten: start over
+        conn.execute("DELETE FROM user_offsets")
+        indexed = 0
+
+    # First line wins for duplicate usernames, as in a top-to-bottom scan
+    insert = "INSERT OR IGNORE INTO user_offsets (username, offset) VALUES (?, ?)"
+    offset = indexed
+    with open(USER_DATA_FILE, 'rb') as f:
+        f.seek(offset)
+        batch = []
+        for line in f:
+            parsed = _parse_line(line)
+            if parsed:
+                batch.append((parsed[0], offset))
+                if len(batch) >= 100_000:
+                    conn.executemany(insert, batch)
+                    batch.clear()
+            if not line.endswith(b'\n'):
+                break  # last line still being written (or no newline): index it, but re-read it next time
+            offset += len(line)
+            indexed = offset
+    conn.executemany(insert, batch)
+    conn.execute("UPDATE index_state SET indexed_bytes = ? WHERE id = 1", (indexed,))
+    conn.commit()
+
+def _open_index():
+    """Open the sidecar index, bringing it up to date with user.txt."""
+    conn = sqlite3.connect(USER_INDEX_FILE, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS user_offsets (username TEXT PRIMARY KEY, offset INTEGER NOT NULL) WITHOUT ROWID"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS index_state (id INTEGER PRIMARY KEY CHECK (id = 1), indexed_bytes INTEGER NOT NULL)"
+    )
+    conn.execute("INSERT OR IGNORE INTO index_state (id, indexed_bytes) VALUES (1, 0)")
+    conn.commit()
+    _catch_up(conn)
+    return conn
+
+def _find_user(conn, username):
+    """Return the stored hash for username using the index, or None if not registered."""
+    for attempt in range(2):
+        row = conn.execute("SELECT offset FROM user_offsets WHERE username = ?", (username,)).fetchone()
+        if row is None:
+            return None
+        with open(USER_DATA_FILE, 'rb') as f:
+            f.seek(row[0])
+            parsed = _parse_line(f.readline())
+        if parsed and parsed[0] == username:
+            return parsed[1]
+        # The file changed under the index (edited in place): rebuild once
+        conn.execute("DELETE FROM user_offsets")
+        conn.execute("UPDATE index_state SET indexed_bytes = 0 WHERE id = 1")
+        _catch_up(conn)
+    return None
+
+def _append_user(username, password_hash):
+    """
+    Append a user to user.txt and index it.
+
+    The line is written (and flushed) before the index is updated, so a
+    crash in between leaves a line the next _catch_up() indexes.
+
+    Returns:
+        bool: False if the username was already taken
+    """
+    with open(USER_DATA_FILE, 'ab') as f:
+        _lock(f)  # one writer at a time; released when the file closes
+        with closing(_open_index()) as conn:
+            if _find_user(conn, username) is not None:
+                return False
+            end = f.seek(0, os.SEEK_END)
+            line = f"{username},{password_hash}\n".encode('utf-8')
+            if end:
+                with open(USER_DATA_FILE, 'rb') as r:
+                    r.seek(end - 1)
+                    if r.read(1) != b'\n':
+                        line = b'\n' + line  # finish a last line written without a newline
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+            offset = end + len(line) - len(line.lstrip(b'\n'))
+            conn.execute("INSERT OR IGNORE INTO user_offsets (username, offset) VALUES (?, ?)", (username, offset))
+            # Advance the covered range only if everything before this line was already indexed
+            conn.execute(
+                "UPDATE index_state SET indexed_bytes = ? WHERE id = 1 AND indexed_bytes = ?",
+                (end + len(line), end)
+            )
+            conn.commit()
+    return True
+
 def register_user(username, password):
     if not os.path.exists(USER_DATA_FILE):
         open(USER_DATA_FILE, 'w').close()
 
-    with open(USER_DATA_FILE, 'r') as f:
-        for line in f:
-            if line.strip():
-                stored_username, _ = line.strip().split(',', 1)
-                if stored_username == username:
-                    print("Username already exists.")
-                    return False
+    if user_exists(username):
+        print("Username already exists.")
+        return False
 
     password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(BCRYPT_ROUNDS)
     hashed_password = bcrypt.hashpw(password_bytes, salt)
 
-    with open(USER_DATA_FILE, 'a') as f:
-        f.write(f"{username},{hashed_password.decode('utf-8')}\n")
+    # Checked again under the file lock, in case it was registered meanwhile
+    if not _append_user(username, hashed_password.decode('utf-8')):
+        print("Username already exists.")
+        return False
 
     print("User registered successfully.")
     return True
@@ -43,13 +170,8 @@ def user_exists(username):
     if not os.path.exists(USER_DATA_FILE):
         return False
 
-    with open(USER_DATA_FILE, 'r') as f:
-        for line in f:
-            if line.strip():
-                stored_username, _ = line.strip().split(',', 1)
-                if stored_username == username:
-                    return True
-    return False
+    with closing(_open_index()) as conn:
+        return _find_user(conn, username) is not None
 
 def login_user(username, password):
     # Step 1: Handle case where no users are registered yet
@@ -57,23 +179,22 @@ def login_user(username, password):
         print("No users registered yet.")
         return False
 
-    # Step 2: Search for the username in the file
-    with open(USER_DATA_FILE, 'r') as f:
-        for line in f:
-            if line.strip():
-                stored_username, stored_hash = line.strip().split(',', 1)
-                if stored_username == username:
-                    # Step 3: Verify the password
-                    if verify_password(password, stored_hash):
-                        print("Login successful.")
-                        return True
-                    else:
-                        print("Incorrect password.")
-                        return False
-
-    # Step 4: Username not found
-    print("Username not found.")
-    return False
+    # Step 2: Look the username up in the index (reads one line of the file)
+    with closing(_open_index()) as conn:
+        stored_hash = _find_user(conn, username)
+
+    if stored_hash is None:
+        # Step 4: Username not found
+        print("Username not found.")
+        return False
+
+    # Step 3: Verify the password
+    if verify_password(password, stored_hash):
+        print("Login successful.")
+        return True
+    else:
+        print("Incorrect password.")
+        return False
 
 def validate_username(username):
     if not username:
@@ -0,0 +1,84 @@
+"""
+bcrypt worker pool tests for app/services/auth_executor.py.
+
+Once every worker is busy and the waiting slots are full, a login or
+registration must be turned away at once with AuthBusyError (shown to the
+user as BUSY_MESSAGE) instead of queueing behind the burst; one whose hash
+takes longer than the timeout gives up the same way.
+
+Run with:
+    python -m pytest -q auth_executor_test.py
+"""
+import threading
+import time
+import pytest
+from app.services import user_service
+from app.services.auth_executor import AuthBusyError, AuthExecutor, hash_rounds
+
+@pytest.fixture
+def executor():
+    executor = AuthExecutor(workers=1, queue_depth=1, timeout=5)
+    yield executor
+    executor.shutdown()
+
+def _saturate(executor, release):
+    """Fill every worker and waiting slot with a call that blocks until release is set."""
+    threads = [
+        threading.Thread(target=executor._run, args=(release.wait,))
+        for _ in range(executor.workers + executor.queue_depth)
+    ]
+    for thread in threads:
+        thread.start()
+    while executor.stats()["in_flight"] < len(threads):
+        time.sleep(0.01)
+    return threads
+
+def test_requests_beyond_the_queue_are_rejected_at_once(executor):
+    release = threading.Event()
+    threads = _saturate(executor, release)
+    try:
+        started = time.perf_counter()
+        with pytest.raises(AuthBusyError):
+            executor.hash_password("Secret123!", rounds=4)
+        assert time.perf_counter() - started < 1
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+
+    stats = executor.stats()
+    assert (stats["rejected"], stats["completed"], stats["in_flight"]) == (1, 2, 0)
+    # The freed slots take new work again.
+    password_hash = executor.hash_password("Secret123!", rounds=4)
+    assert executor.check_password("Secret123!", password_hash)
+
+def test_slow_hash_times_out_and_frees_its_slot_when_done():
+    executor = AuthExecutor(workers=1, queue_depth=0, timeout=0.1)
+    with pytest.raises(AuthBusyError):
+        executor._run(time.sleep, 0.3)
+    assert executor.stats()["timeouts"] == 1
+    executor.shutdown()
+    assert executor.stats()["in_flight"] == 0
+
+def test_busy_pool_is_reported_to_the_user(user_db, executor, monkeypatch):
+    monkeypatch.setattr(user_service, "get_auth_executor", lambda: executor)
+    assert user_service.register_user("alice", "Secret123!")[0]
+
+    release = threading.Event()
+    threads = _saturate(executor, release)
+    try:
+        assert user_service.register_user("bob", "Secret123!") == (False, user_service.BUSY_MESSAGE)
+        assert user_service.login_user("alice", "Secret123!") == (False, user_service.BUSY_MESSAGE)
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+    assert user_service.login_user("alice", "Secret123!") == (True, "Welcome, alice!")
+
+@pytest.mark.parametrize("password_hash, rounds", [
+    ("$2b$12$" + "a" * 53, 12),
+    ("$2a$04$" + "a" * 53, 4),
+    ("plain text", None),
+])
+def test_hash_rounds(password_hash, rounds):
+    assert hash_rounds(password_hash) == rounds
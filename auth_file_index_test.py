@@ -0,0 +1,78 @@
+"""
+Sidecar index tests for the user.txt store in auth.py.
+
+Lookups go through user.txt.idx, which must catch up with lines it hasn't
+seen (appended by hand, by older code or without a final newline) and
+rebuild itself when user.txt shrinks or is edited in place, so it always
+answers like a top-to-bottom scan of the file would.
+
+Run with:
+    python -m pytest -q auth_file_index_test.py
+"""
+import os
+import bcrypt
+import pytest
+import auth
+
+@pytest.fixture(autouse=True)
+def user_store(tmp_path, monkeypatch):
+    """Run every test against its own user.txt, hashing at bcrypt's cheapest cost."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(auth, "BCRYPT_ROUNDS", 4)
+    return tmp_path
+
+def _line(username, password):
+    return f"{username},{bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(4)).decode('utf-8')}\n"
+
+def _append(text):
+    with open(auth.USER_DATA_FILE, "a", encoding="utf-8") as f:
+        f.write(text)
+
+def test_register_then_login(user_store):
+    assert auth.register_user("alice1", "Secret123!")
+    assert not auth.register_user("alice1", "Another123!")
+    assert auth.login_user("alice1", "Secret123!")
+    assert not auth.login_user("alice1", "Wrong123!")
+    assert not auth.login_user("nobody1", "Secret123!")
+    assert (user_store / auth.USER_INDEX_FILE).exists()
+
+def test_lines_appended_outside_register_are_found():
+    auth.register_user("alice1", "Secret123!")
+    # Written by hand after the index was built; the first of two duplicates wins.
+    _append(_line("bob1", "First123!") + "not a user line\n" + _line("bob1", "Second123!"))
+    assert auth.login_user("bob1", "First123!")
+    assert not auth.login_user("bob1", "Second123!")
+    assert auth.user_exists("alice1")
+
+def test_last_line_without_newline_is_indexed_and_finished():
+    _append(_line("carol1", "Secret123!").rstrip("\n"))
+    assert auth.login_user("carol1", "Secret123!")
+    assert auth.register_user("dave1", "Secret123!")
+    with open(auth.USER_DATA_FILE, encoding="utf-8") as f:
+        assert [line.split(",")[0] for line in f] == ["carol1", "dave1"]
+    assert auth.login_user("dave1", "Secret123!")
+
+def test_shrunk_file_rebuilds_the_index():
+    auth.register_user("alice1", "Secret123!")
+    auth.register_user("bob1", "Secret123!")
+    with open(auth.USER_DATA_FILE, "w", encoding="utf-8") as f:
+        f.write(_line("erin1", "Secret123!"))
+    assert not auth.user_exists("alice1")
+    assert auth.login_user("erin1", "Secret123!")
+
+def test_file_edited_in_place_rebuilds_the_index():
+    auth.register_user("alice1", "Secret123!")
+    auth.register_user("bob1", "Secret123!")
+    with open(auth.USER_DATA_FILE, encoding="utf-8") as f:
+        lines = f.readlines()
+    # Same size, different order: every stored offset now points at the other user.
+    with open(auth.USER_DATA_FILE, "w", encoding="utf-8") as f:
+        f.writelines(reversed(lines))
+    assert auth.login_user("alice1", "Secret123!")
+    assert auth.login_user("bob1", "Secret123!")
+
+def test_deleting_the_index_is_safe():
+    auth.register_user("alice1", "Secret123!")
+    os.remove(auth.USER_INDEX_FILE)
+    assert auth.login_user("alice1", "Secret123!")
+    assert not auth.register_user("alice1", "Secret123!")
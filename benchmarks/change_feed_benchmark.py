@@ -0,0 +1,104 @@
+"""
+Refresh cost: full reload vs. applying the change feed, on the incidents table.
+
+A dashboard session holds the incident KPIs and the incidents-by-category
+counts. After a batch of writes, the "reload" column re-runs both queries over
+the whole table (what every rerun used to do); the "delta" column reads the
+changes since the session's version and patches what it holds. Reload time
+grows with the table, delta time with the number of changed rows.
+
+Run from the project root:
+    python -m benchmarks.change_feed_benchmark --sizes 10000 100000 1000000 --deltas 1 100 1000
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from app.data import analytic
+from app.data.changes import (
+    apply_changes_to_counts, apply_kpi_changes, bulk_changes, get_change_version, get_changes_since
+)
+from app.data.db import connect_database
+from app.data.schema import create_all_tables
+
+SEVERITIES = ["Low", "Medium", "High", "Critical"]
+CATEGORIES = ["Phishing", "Malware", "Data Breach", "Unauthorized Access", "DDoS", "Other"]
+STATUSES = ["Open", "In Progress", "Resolved", "Closed"]
+
+def random_incident(rng):
+    return (f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:00:00",
+            rng.choice(SEVERITIES), rng.choice(CATEGORIES), rng.choice(STATUSES), "benchmark incident")
+
+def build_database(db_path, rows, batch=100_000):
+    conn = connect_database(db_path, profile="bulk_import")
+    create_all_tables(conn)
+    rng = random.Random(7)
+    with bulk_changes(conn):
+        for start in range(0, rows, batch):
+            conn.executemany(
+                "INSERT INTO cyber_incidents (timestamp, severity, category, status, description) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [random_incident(rng) for _ in range(min(batch, rows - start))],
+            )
+            conn.commit()
+    return conn
+
+def write_delta(conn, rng, rows, size):
+    """Half inserts, half status/severity updates of random existing incidents."""
+    inserts = size // 2 or 1
+    conn.executemany(
+        "INSERT INTO cyber_incidents (timestamp, severity, category, status, description) VALUES (?, ?, ?, ?, ?)",
+        [random_incident(rng) for _ in range(inserts)],
+    )
+    conn.executemany(
+        "UPDATE cyber_incidents SET status = ?, severity = ? WHERE incident_id = ?",
+        [(rng.choice(STATUSES), rng.choice(SEVERITIES), rng.randint(1, rows)) for _ in range(size - inserts)],
+    )
+    conn.commit()
+
+def full_reload(conn):
+    return (analytic.get_incident_kpis.__wrapped__(conn),
+            analytic.get_incidents_by_category_count.__wrapped__(conn))
+
+def apply_delta(conn, version, kpis, counts):
+    changes = get_changes_since(conn, version, ["cyber_incidents"])
+    return (apply_kpi_changes("cyber_incidents", kpis, changes),
+            apply_changes_to_counts(counts, changes, "category"))
+
+def best_of(repeats, func, *args):
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--deltas", type=int, nargs="+", default=[1, 100, 1_000, 10_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"\n{'Table rows':>11} {'Delta rows':>11} {'reload (ms)':>12} {'delta (ms)':>11} {'speed-up':>9}")
+    print("-" * 58)
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.sizes:
+            conn = build_database(Path(tmp) / f"changes_{rows}.db", rows)
+            rng = random.Random(11)
+            for size in args.deltas:
+                version = get_change_version(conn)
+                kpis, counts = full_reload(conn)
+                write_delta(conn, rng, rows, size)
+
+                reload_time, (fresh_kpis, _) = best_of(args.repeats, full_reload, conn)
+                delta_time, (patched_kpis, _) = best_of(args.repeats, apply_delta, conn, version, kpis, counts)
+                assert patched_kpis == fresh_kpis, "delta KPIs differ from a full reload"
+                print(f"{rows:>11,} {size:>11,} {reload_time * 1000:>12.2f} {delta_time * 1000:>11.2f} "
+                      f"{reload_time / max(delta_time, 1e-9):>8.1f}x")
+            conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Concurrent read/write throughput of the SQLite performance profiles.
+
+Simulates dashboard sessions (readers running the page queries) while other
+sessions submit incidents (writers), once per profile on a fresh database.
+
+Run from the project root:
+    python -m benchmarks.db_profile_benchmark --rows 50000 --readers 8 --writers 2 --seconds 5
+"""
+import argparse
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from app.data.db import connect_database
+from app.data.schema import create_cyber_incidents_table
+
+SEVERITIES = ["Low", "Medium", "High", "Critical"]
+CATEGORIES = ["Phishing", "Malware", "Data Breach", "Unauthorized Access", "DDoS", "Other"]
+STATUSES = ["Open", "In Progress", "Resolved", "Closed"]
+
+READ_QUERIES = [
+    "SELECT category, COUNT(*) FROM cyber_incidents GROUP BY category",
+    "SELECT status, COUNT(*) FROM cyber_incidents WHERE severity = 'High' GROUP BY status",
+    "SELECT * FROM cyber_incidents ORDER BY timestamp DESC LIMIT 50",
+]
+
+def _random_incident(rng):
+    day = rng.randint(1, 28)
+    return (
+        f"2024-{rng.randint(1, 12):02d}-{day:02d} {rng.randint(0, 23):02d}:00:00",
+        rng.choice(SEVERITIES),
+        rng.choice(CATEGORIES),
+        rng.choice(STATUSES),
+        "benchmark incident",
+    )
+
+def build_database(db_path, rows):
+    """Create a cyber_incidents table filled with random rows."""
+    conn = connect_database(db_path, profile="sqlite_defaults")
+    create_cyber_incidents_table(conn)
+    rng = random.Random(42)
+    conn.executemany(
+        "INSERT INTO cyber_incidents (timestamp, severity, category, status, description) VALUES (?, ?, ?, ?, ?)",
+        (_random_incident(rng) for _ in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+def run_workload(db_path, profile, readers, writers, seconds):
+    """
+    Run reader and writer threads against db_path for a fixed duration.
+
+    Returns:
+        dict: reads, writes, lock errors and per-second rates
+    """
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "locked": 0}
+    lock = threading.Lock()
+
+    def reader():
+        conn = connect_database(db_path, profile=profile)
+        done = locked = 0
+        while not stop.is_set():
+            try:
+                for query in READ_QUERIES:
+                    conn.execute(query).fetchall()
+                done += 1
+            except sqlite3.OperationalError:
+                locked += 1
+        conn.close()
+        with lock:
+            counts["reads"] += done
+            counts["locked"] += locked
+
+    def writer(seed):
+        conn = connect_database(db_path, profile=profile)
+        rng = random.Random(seed)
+        done = locked = 0
+        while not stop.is_set():
+            try:
+                conn.execute(
+                    "INSERT INTO cyber_incidents (timestamp, severity, category, status, description) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    _random_incident(rng),
+                )
+                conn.commit()
+                done += 1
+            except sqlite3.OperationalError:
+                conn.rollback()
+                locked += 1
+        conn.close()
+        with lock:
+            counts["writes"] += done
+            counts["locked"] += locked
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    counts["reads_per_sec"] = counts["reads"] / elapsed
+    counts["writes_per_sec"] = counts["writes"] / elapsed
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--profiles", nargs="+", default=["sqlite_defaults", "balanced", "read_heavy_dashboard"])
+    args = parser.parse_args()
+
+    print(f"\n{args.rows} rows, {args.readers} readers, {args.writers} writers, {args.seconds}s per profile")
+    print(f"{'Profile':<24} {'Reads/s':>10} {'Writes/s':>10} {'Locked':>8}")
+    print("-" * 56)
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in args.profiles:
+            db_path = Path(tmp) / f"{profile}.db"
+            build_database(db_path, args.rows)
+            result = run_workload(db_path, profile, args.readers, args.writers, args.seconds)
+            print(
+                f"{profile:<24} {result['reads_per_sec']:>10.1f} "
+                f"{result['writes_per_sec']:>10.1f} {result['locked']:>8}"
+            )
+
+if __name__ == "__main__":
+    main()
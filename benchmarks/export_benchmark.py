@@ -0,0 +1,90 @@
+"""
+Peak memory and time of exporting every incident: DataFrame.to_csv() vs. chunked streaming.
+
+The old export read the whole table into a DataFrame and encoded it to one
+bytes object; write_export() reads EXPORT_CHUNK_SIZE rows at a time and
+writes each chunk to a file before fetching the next. Peak memory is the
+Python heap high-water mark measured with tracemalloc (pyarrow's own buffers
+for Parquet are not included).
+
+Run from the project root:
+    python -m benchmarks.export_benchmark --rows 1000000
+"""
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+import pandas as pd
+from config import EXPORT_CHUNK_SIZE
+from app.data.changes import bulk_changes
+from app.data.db import connect_database
+from app.data.incidents import INCIDENT_COLUMNS
+from app.data.schema import create_all_tables
+from app.services.export_service import EXPORT_FORMATS, build_export_query, write_export
+
+SEVERITIES = ["Low", "Medium", "High", "Critical"]
+CATEGORIES = ["Phishing", "Malware", "Data Breach", "Unauthorized Access", "DDoS", "Other"]
+STATUSES = ["Open", "In Progress", "Resolved", "Closed"]
+
+def build_database(db_path, rows, batch=100_000):
+    conn = connect_database(db_path, profile="bulk_import")
+    create_all_tables(conn)
+    rng = random.Random(20)
+    with bulk_changes(conn):
+        for start in range(0, rows, batch):
+            conn.executemany(
+                "INSERT INTO cyber_incidents (timestamp, severity, category, status, description) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:00:00",
+                  rng.choice(SEVERITIES), rng.choice(CATEGORIES), rng.choice(STATUSES),
+                  f"Incident {start + i} reported by monitoring") for i in range(min(batch, rows - start))],
+            )
+            conn.commit()
+    return conn
+
+def measure(func):
+    """Run func() and return (result, seconds, peak MiB)."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / 2**20
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Incidents to generate")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE, help="Rows per export chunk")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"\nBuilding {args.rows:,} incidents...")
+        conn = build_database(Path(tmp) / "export.db", args.rows)
+        sql, params = build_export_query("cyber_incidents", INCIDENT_COLUMNS)
+
+        def materialized():
+            return pd.read_sql_query(sql, conn, params=params).to_csv(index=False).encode("utf-8")
+
+        results = []
+        data, seconds, peak = measure(materialized)
+        results.append(("to_csv() in memory", "CSV", seconds, peak, len(data)))
+        del data
+
+        for fmt, (extension, _) in EXPORT_FORMATS.items():
+            path = Path(tmp) / f"export{extension}"
+            with open(path, "wb") as out:
+                _, seconds, peak = measure(lambda: write_export(conn, out, sql, params, fmt,
+                                                                chunk_size=args.chunk_size))
+            results.append(("streamed", fmt, seconds, peak, path.stat().st_size))
+        conn.close()
+
+    print(f"\n{'Method':<20} {'Format':<12} {'Seconds':>9} {'Peak MiB':>10} {'File MiB':>10}")
+    print("-" * 65)
+    for method, fmt, seconds, peak, size in results:
+        print(f"{method:<20} {fmt:<12} {seconds:>9.2f} {peak:>10.1f} {size / 2**20:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+auth.py file user store: linear scan of user.txt vs. the sidecar offset index.
+
+Writes N users to a temporary user.txt (one pre-computed hash, so bcrypt is
+not what is measured), then times building the index once, existence checks
+for random users, and registering new users (append + index).
+
+Run from the project root:
+    python -m benchmarks.file_user_store_benchmark --users 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import bcrypt
+import auth
+
+def scan_user_exists(username):
+    """The old user_exists(): read user.txt top to bottom."""
+    with open(auth.USER_DATA_FILE, 'r') as f:
+        for line in f:
+            if line.strip():
+                stored_username, _ = line.strip().split(',', 1)
+                if stored_username == username:
+                    return True
+    return False
+
+def time_lookups(func, names):
+    started = time.perf_counter()
+    for name in names:
+        assert func(name)
+    return (time.perf_counter() - started) / len(names)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000, help="Users in user.txt")
+    parser.add_argument("--lookups", type=int, default=200, help="Indexed existence checks to time")
+    parser.add_argument("--scan-lookups", type=int, default=5, help="Linear-scan checks to time (slow)")
+    parser.add_argument("--registrations", type=int, default=200, help="New users to append")
+    args = parser.parse_args()
+
+    password_hash = bcrypt.hashpw(b"Benchmark1", bcrypt.gensalt(4)).decode("utf-8")
+    rng = random.Random(24)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            print(f"\nWriting {args.users:,} users to user.txt...")
+            with open(auth.USER_DATA_FILE, "w") as f:
+                for i in range(args.users):
+                    f.write(f"user{i},{password_hash}\n")
+
+            started = time.perf_counter()
+            auth.user_exists("warm-up")
+            build = time.perf_counter() - started
+
+            names = [f"user{rng.randrange(args.users)}" for _ in range(args.lookups)]
+            indexed = time_lookups(auth.user_exists, names)
+            scan = time_lookups(scan_user_exists, names[:args.scan_lookups])
+
+            started = time.perf_counter()
+            for i in range(args.registrations):
+                assert auth._append_user(f"new{i}", password_hash)
+            append = (time.perf_counter() - started) / args.registrations
+        finally:
+            os.chdir(cwd)
+
+    print(f"\n{'Operation':<40} {'Time':>14}")
+    print("-" * 56)
+    print(f"{'Build index (first open, once)':<40} {build:>12.2f} s")
+    print(f"{'user_exists, linear scan':<40} {scan * 1000:>11.1f} ms")
+    print(f"{'user_exists, indexed':<40} {indexed * 1000:>11.2f} ms")
+    print(f"{'Register (append + fsync + index)':<40} {append * 1000:>11.2f} ms")
+    print(f"\nIndexed lookups are {scan / indexed:,.0f}x faster at {args.users:,} users.")
+
+if __name__ == "__main__":
+    main()
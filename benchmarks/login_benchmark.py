@@ -0,0 +1,100 @@
+"""
+Login throughput and latency under a burst of N concurrent logins.
+
+"inline" verifies every password with bcrypt.checkpw on the caller's own
+thread, as login_user used to on the Streamlit script thread; "executor"
+sends them through a bounded AuthExecutor. While the burst runs, a probe
+thread stands in for another session's page rerun (a short pure-Python
+task) and its latency is reported too: it shows how much the burst slows
+down everyone else on the same server.
+
+Run from the project root:
+    python -m benchmarks.login_benchmark --logins 64 --rounds 12
+"""
+import argparse
+import threading
+import time
+import bcrypt
+from config import AUTH_QUEUE_DEPTH, AUTH_WORKERS
+from app.services.auth_executor import AuthBusyError, AuthExecutor
+
+PASSWORD = "correct horse battery staple"
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+def probe(stop, latencies):
+    """Stand-in for another session's rerun: a few ms of GIL-holding Python work."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        sum(i * i for i in range(20_000))
+        latencies.append(time.perf_counter() - started)
+        time.sleep(0.01)
+
+def run_burst(verify, logins):
+    """Start `logins` threads at once, each verifying one password with verify()."""
+    latencies, rejected = [], []
+    lock = threading.Lock()
+    start = threading.Barrier(logins + 1)
+
+    def login():
+        start.wait()
+        started = time.perf_counter()
+        try:
+            assert verify()
+        except AuthBusyError:
+            with lock:
+                rejected.append(time.perf_counter() - started)
+            return
+        with lock:
+            latencies.append(time.perf_counter() - started)
+
+    stop, probe_latencies = threading.Event(), []
+    probe_thread = threading.Thread(target=probe, args=(stop, probe_latencies))
+    threads = [threading.Thread(target=login) for _ in range(logins)]
+    for t in threads:
+        t.start()
+    probe_thread.start()
+    started = time.perf_counter()
+    start.wait()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    probe_thread.join()
+    return latencies, rejected, elapsed, probe_latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64, help="Concurrent logins in the burst")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost of the stored hash")
+    parser.add_argument("--workers", type=int, default=AUTH_WORKERS, help="AuthExecutor workers")
+    parser.add_argument("--queue-depth", type=int, default=AUTH_QUEUE_DEPTH, help="AuthExecutor queue depth")
+    args = parser.parse_args()
+
+    stored = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(args.rounds)).decode("utf-8")
+    executor = AuthExecutor(workers=args.workers, queue_depth=args.queue_depth, timeout=600)
+    modes = {
+        "inline": lambda: bcrypt.checkpw(PASSWORD.encode("utf-8"), stored.encode("utf-8")),
+        "executor": lambda: executor.check_password(PASSWORD, stored),
+    }
+
+    print(f"\n{args.logins} concurrent logins, bcrypt cost {args.rounds}, "
+          f"executor: {args.workers} workers + {args.queue_depth} queued")
+    print(f"\n{'Mode':<10} {'OK':>5} {'Rejected':>9} {'Logins/s':>9} {'p50 s':>8} {'p99 s':>8} "
+          f"{'Probe p50 ms':>13} {'Probe p99 ms':>13}")
+    print("-" * 82)
+    for mode, verify in modes.items():
+        latencies, rejected, elapsed, probe_latencies = run_burst(verify, args.logins)
+        print(f"{mode:<10} {len(latencies):>5} {len(rejected):>9} {len(latencies) / elapsed:>9.1f} "
+              f"{percentile(latencies, 50):>8.2f} {percentile(latencies, 99):>8.2f} "
+              f"{percentile(probe_latencies, 50) * 1000:>13.1f} {percentile(probe_latencies, 99) * 1000:>13.1f}")
+    executor.shutdown()
+
+    print("\nRejected logins fail fast with a 'try again' message instead of queueing behind the burst.")
+
+if __name__ == "__main__":
+    main()
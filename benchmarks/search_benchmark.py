@@ -0,0 +1,86 @@
+"""
+FTS5 search vs. the old DataFrame.apply search on the incidents table.
+
+The "apply" column reproduces what the pages used to do on every keystroke:
+load the whole table into pandas and test every cell of every row with
+str.contains. The "fts5" column is search_incidents() on the same data.
+
+Run from the project root (1M rows takes a few minutes for the apply side):
+    python -m benchmarks.search_benchmark --rows 1000000
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+import pandas as pd
+from app.data.db import connect_database
+from app.data.schema import create_all_tables
+from app.data.incidents import search_incidents
+
+SEVERITIES = ["Low", "Medium", "High", "Critical"]
+CATEGORIES = ["Phishing", "Malware", "Data Breach", "Unauthorized Access", "DDoS", "Other"]
+STATUSES = ["Open", "In Progress", "Resolved", "Closed"]
+WORDS = [
+    "suspicious", "login", "email", "trojan", "ransomware", "firewall", "vpn", "credential",
+    "exfiltration", "botnet", "payload", "endpoint", "server", "laptop", "attachment", "macro",
+    "spoofed", "domain", "brute", "force", "usb", "insider", "misconfigured", "bucket",
+]
+SEARCH_TERMS = ["ransomware", "phish", "exfiltration server", "critical usb", "zzznomatch"]
+
+def build_database(db_path, rows, batch=100_000):
+    conn = connect_database(db_path, profile="bulk_import")
+    create_all_tables(conn)
+    rng = random.Random(7)
+    for start in range(0, rows, batch):
+        conn.executemany(
+            "INSERT INTO cyber_incidents (timestamp, severity, category, status, description) VALUES (?, ?, ?, ?, ?)",
+            [
+                (f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:00:00",
+                 rng.choice(SEVERITIES), rng.choice(CATEGORIES), rng.choice(STATUSES),
+                 " ".join(rng.sample(WORDS, 5)))
+                for _ in range(min(batch, rows - start))
+            ],
+        )
+        conn.commit()
+    return conn
+
+def apply_search(df, term):
+    return df[df.apply(lambda row: row.astype(str).str.contains(term, case=False).any(), axis=1)]
+
+def time_call(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=200, help="FTS result limit (as on the pages)")
+    parser.add_argument("--skip-apply", action="store_true", help="Only time the FTS side")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"\nBuilding {args.rows:,} incidents...")
+        conn = build_database(Path(tmp) / "search.db", args.rows)
+
+        df = None
+        if not args.skip_apply:
+            load_time, df = time_call(pd.read_sql_query, "SELECT * FROM cyber_incidents", conn)
+            print(f"Full-table load for apply search: {load_time:.2f}s "
+                  f"({df.memory_usage(deep=True).sum() / 1e6:.0f} MB)")
+
+        print(f"\n{'Term':<22} {'apply (s)':>10} {'matches':>9} {'fts5 (ms)':>10} {'returned':>9}")
+        print("-" * 64)
+        for term in SEARCH_TERMS:
+            fts_time, fts_df = time_call(search_incidents, conn, term, limit=args.limit)
+            if df is not None:
+                apply_time, matched = time_call(apply_search, df, term)
+                apply_cell, matches = f"{apply_time:>10.2f}", f"{len(matched):>9}"
+            else:
+                apply_cell, matches = f"{'-':>10}", f"{'-':>9}"
+            print(f"{term:<22} {apply_cell} {matches} {fts_time * 1000:>10.1f} {len(fts_df):>9}")
+        conn.close()
+
+if __name__ == "__main__":
+    main()
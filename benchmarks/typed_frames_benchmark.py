@@ -0,0 +1,95 @@
+"""
+Memory of domain frames as read by pd.read_sql_query vs. after apply_domain_types().
+
+For each domain table, a full-table frame and a frame of the records a
+session typically holds (a few "Load more" pages) are read both ways and
+their deep memory usage compared, column by column for the full tables.
+
+Run from the project root:
+    python -m benchmarks.typed_frames_benchmark --rows 500000 --session-rows 500
+"""
+import argparse
+import random
+import tempfile
+from pathlib import Path
+import pandas as pd
+from app.data.changes import bulk_changes
+from app.data.db import connect_database
+from app.data.schema import create_all_tables
+from app.data.typed_frames import (
+    DOMAIN_TYPES, INCIDENT_CATEGORIES, PRIORITY_LEVELS, SEVERITY_LEVELS, STATUSES,
+    apply_domain_types, column_memory_report, memory_report
+)
+
+ASSIGNEES = [f"IT_Support_{c}" for c in "ABCDEFGH"]
+UPLOADERS = ["data_scientist", "cyber_admin", "it_admin", "analyst"]
+
+def random_time(rng):
+    return f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:00:00"
+
+def build_database(db_path, rows, batch=100_000):
+    conn = connect_database(db_path, profile="bulk_import")
+    create_all_tables(conn)
+    rng = random.Random(5)
+    with bulk_changes(conn):
+        for start in range(0, rows, batch):
+            n = min(batch, rows - start)
+            conn.executemany(
+                "INSERT INTO cyber_incidents (timestamp, severity, category, status, description) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(random_time(rng), rng.choice(SEVERITY_LEVELS), rng.choice(INCIDENT_CATEGORIES),
+                  rng.choice(STATUSES), f"Incident {start + i} description") for i in range(n)],
+            )
+            conn.executemany(
+                "INSERT INTO it_tickets (ticket_id, priority, description, status, assigned_to, created_at, "
+                "resolution_time_hours) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(f"T{start + i}", rng.choice(PRIORITY_LEVELS), f"Ticket {start + i} description",
+                  rng.choice(STATUSES), rng.choice(ASSIGNEES), random_time(rng), rng.randint(1, 96) / 2)
+                 for i in range(n)],
+            )
+            conn.executemany(
+                "INSERT INTO datasets_metadata (name, rows, columns, uploaded_by, upload_date) VALUES (?, ?, ?, ?, ?)",
+                [(f"Dataset_{start + i}", rng.randint(100, 5_000_000), rng.randint(2, 200),
+                  rng.choice(UPLOADERS), random_time(rng)[:10]) for i in range(n // 100 or 1)],
+            )
+            conn.commit()
+    return conn
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000, help="Incidents and tickets to generate")
+    parser.add_argument("--session-rows", type=int, default=500, help="Records held by one session per table")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"\nBuilding {args.rows:,} incidents and tickets...")
+        conn = build_database(Path(tmp) / "typed.db", args.rows)
+
+        frames, full = {}, {}
+        for table in DOMAIN_TYPES:
+            raw = pd.read_sql_query(f"SELECT * FROM {table}", conn)
+            full[table] = (raw, apply_domain_types(raw, table))
+            frames[f"{table} (all rows)"] = full[table]
+            session = raw.head(args.session_rows)
+            frames[f"{table} (session)"] = (session, apply_domain_types(session, table))
+        conn.close()
+
+    report = memory_report(frames)
+    print(f"\n{'Frame':<32} {'Rows':>10} {'Before KiB':>12} {'After KiB':>12} {'Saved':>7}")
+    print("-" * 77)
+    for row in report.itertuples():
+        print(f"{row.frame:<32} {row.rows:>10,} {row.before_kb:>12,.0f} {row.after_kb:>12,.0f} {row.saved_pct:>6.0f}%")
+
+    for table, (raw, typed) in full.items():
+        print(f"\n{table}")
+        print(f"  {'Column':<24} {'Before dtype':<16} {'After dtype':<16} {'Before KiB':>11} {'After KiB':>11}")
+        for row in column_memory_report(raw, typed).itertuples():
+            print(f"  {row.column:<24} {row.before_dtype:<16} {row.after_dtype:<16} "
+                  f"{row.before_kb:>11,.0f} {row.after_kb:>11,.0f}")
+
+    sessions = report[report["frame"].str.endswith("(session)")]
+    before, after = sessions["before_kb"].sum(), sessions["after_kb"].sum()
+    print(f"\nPer session (three record tables): {before:,.0f} KiB -> {after:,.0f} KiB")
+
+if __name__ == "__main__":
+    main()
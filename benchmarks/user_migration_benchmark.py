@@ -0,0 +1,90 @@
+"""
+Legacy user migration: one INSERT per line vs. batched, validated executemany.
+
+Writes N users (one pre-computed bcrypt hash, a few malformed lines mixed
+in) split across several files, then migrates them into a fresh database
+with the old per-line loop and with migrate_users_from_directory().
+
+Both run at about the same speed: the old loop already used one transaction,
+and the cost is inserting into the username index either way. The batched
+path is there for validation, bounded memory and per-batch transactions; this
+benchmark checks that those cost no throughput.
+
+Run from the project root:
+    python -m benchmarks.user_migration_benchmark --users 1000000 --files 10
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+import bcrypt
+from app.data.db import connect_database
+from app.data.schema import create_users_table
+from app.services.user_service import migrate_users_from_directory
+
+def legacy_migrate(conn, filepath):
+    """The old migrate_users_from_file() loop: one execute per line."""
+    cursor = conn.cursor()
+    migrated = 0
+    with open(filepath, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            parts = line.split(',')
+            if len(parts) >= 2:
+                cursor.execute(
+                    "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+                    (parts[0], parts[1], 'user')
+                )
+                if cursor.rowcount > 0:
+                    migrated += 1
+    conn.commit()
+    return migrated
+
+def write_user_files(folder, users, files, password_hash):
+    per_file = -(-users // files)
+    for n in range(files):
+        with open(folder / f"users_{n:03d}.txt", "w") as f:
+            for i in range(n * per_file, min(users, (n + 1) * per_file)):
+                if i % 10_000 == 0:
+                    f.write(f"broken_line_{i}\n")
+                f.write(f"user{i},{password_hash}\n")
+
+def fresh_database(path):
+    conn = connect_database(path, profile="bulk_import")
+    create_users_table(conn)
+    return conn
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000, help="Users to migrate")
+    parser.add_argument("--files", type=int, default=10, help="Files the users are split across")
+    args = parser.parse_args()
+
+    password_hash = bcrypt.hashpw(b"Benchmark1", bcrypt.gensalt(4)).decode("utf-8")
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp) / "legacy"
+        folder.mkdir()
+        print(f"\nWriting {args.users:,} users to {args.files} files...")
+        write_user_files(folder, args.users, args.files, password_hash)
+
+        conn = fresh_database(Path(tmp) / "legacy.db")
+        started = time.perf_counter()
+        legacy_inserted = sum(legacy_migrate(conn, path) for path in sorted(folder.glob("*.txt")))
+        legacy_seconds = time.perf_counter() - started
+        conn.close()
+
+        conn = fresh_database(Path(tmp) / "bulk.db")
+        stats = migrate_users_from_directory(conn, folder, progress=None)
+        conn.close()
+
+    print(f"\n{'Method':<28} {'Inserted':>10} {'Invalid':>8} {'Failed':>7} {'Seconds':>9} {'Users/s':>11}")
+    print("-" * 78)
+    print(f"{'per-line INSERT (old)':<28} {legacy_inserted:>10,} {'-':>8} {'-':>7} {legacy_seconds:>9.2f} "
+          f"{legacy_inserted / legacy_seconds:>11,.0f}")
+    print(f"{'batched executemany':<28} {stats['inserted']:>10,} {stats['invalid']:>8,} {stats['failed']:>7,} "
+          f"{stats['elapsed']:>9.2f} {stats['inserted'] / stats['elapsed']:>11,.0f}")
+
+if __name__ == "__main__":
+    main()
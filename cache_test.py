@@ -0,0 +1,106 @@
+"""
+Query cache tests for app/data/cache.py.
+
+A cached result must be served until one of the tables it read is written:
+by note_write() for this process's own commits, or through PRAGMA
+data_version for commits made by any other connection.
+
+Run with:
+    python -m pytest -q cache_test.py
+"""
+import pandas as pd
+import pytest
+from app.data.cache import QueryCache, _database_path
+from app.data.db import connect_database
+
+def _count(conn, table):
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+@pytest.fixture
+def cache():
+    return QueryCache(max_entries=8)
+
+def _cached_count(cache, conn, table):
+    return cache.call(_count, (table,), conn, (table,), {})
+
+def _insert_incident(conn):
+    conn.execute(
+        "INSERT INTO cyber_incidents (timestamp, severity, category, status, description) "
+        "VALUES ('2024-05-01 10:00:00', 'High', 'Malware', 'Open', 'cache test')"
+    )
+    conn.commit()
+
+def test_note_write_invalidates_only_the_written_table(db, cache):
+    incidents = _cached_count(cache, db, "cyber_incidents")
+    tickets = _cached_count(cache, db, "it_tickets")
+    assert cache.stats()["misses"] == 2
+
+    _insert_incident(db)
+    cache.note_write(_database_path(db), "cyber_incidents", conn=db)
+
+    assert _cached_count(cache, db, "it_tickets") == tickets
+    assert cache.stats()["hits"] == 1
+    # Our own commit moved data_version too, but it was absorbed by note_write().
+    assert _cached_count(cache, db, "cyber_incidents") == incidents + 1
+    assert cache.stats()["misses"] == 3
+
+def test_external_commit_invalidates_every_table(db, cache):
+    incidents = _cached_count(cache, db, "cyber_incidents")
+    _cached_count(cache, db, "it_tickets")
+
+    other = connect_database(db.db_path, profile="sqlite_defaults")
+    _insert_incident(other)
+    other.close()
+
+    assert _cached_count(cache, db, "cyber_incidents") == incidents + 1
+    _cached_count(cache, db, "it_tickets")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (0, 4)
+
+def test_external_commit_next_to_our_own_is_not_absorbed(db, cache):
+    _cached_count(cache, db, "cyber_incidents")
+    tickets = _cached_count(cache, db, "it_tickets")
+    other = connect_database(db.db_path, profile="sqlite_defaults")
+
+    # Another connection commits right before our commit, then right after it.
+    for external_first in (True, False):
+        if external_first:
+            other.execute("DELETE FROM it_tickets WHERE rowid = (SELECT MIN(rowid) FROM it_tickets)")
+            other.commit()
+            _insert_incident(db)
+        else:
+            _insert_incident(db)
+            other.execute("DELETE FROM it_tickets WHERE rowid = (SELECT MIN(rowid) FROM it_tickets)")
+            other.commit()
+        cache.note_write(_database_path(db), "cyber_incidents", conn=db)
+        tickets -= 1
+        assert _cached_count(cache, db, "it_tickets") == tickets
+    other.close()
+
+def test_repeat_reads_are_hits_and_copies(db, cache):
+    def frame(conn):
+        return pd.read_sql_query("SELECT severity, COUNT(*) AS n FROM cyber_incidents GROUP BY severity", conn)
+
+    first = cache.call(frame, ("cyber_incidents",), db, (), {})
+    first["n"] = 0
+    second = cache.call(frame, ("cyber_incidents",), db, (), {})
+    assert cache.stats()["hits"] == 1
+    assert (second["n"] > 0).all()
+
+def test_least_recently_used_entries_are_evicted(db, cache):
+    cache.max_entries = 2
+    for table in ("cyber_incidents", "it_tickets", "datasets_metadata"):
+        _cached_count(cache, db, table)
+    stats = cache.stats()
+    assert (stats["entries"], stats["evictions"]) == (2, 1)
+    _cached_count(cache, db, "cyber_incidents")
+    assert cache.stats()["misses"] == 4
+
+def test_in_memory_databases_are_never_cached(cache):
+    conn = connect_database(":memory:", profile="sqlite_defaults")
+    conn.execute("CREATE TABLE cyber_incidents (x)")
+    _cached_count(cache, conn, "cyber_incidents")
+    _cached_count(cache, conn, "cyber_incidents")
+    stats = cache.stats()
+    assert (stats["uncacheable"], stats["entries"]) == (2, 0)
+    conn.close()
@@ -0,0 +1,98 @@
+import argparse
+import json
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+import bcrypt
+from config import (
+    AUTH_SETTINGS_PATH, BCRYPT_MAX_ROUNDS, BCRYPT_MIN_ROUNDS, BCRYPT_ROUNDS, BCRYPT_TARGET_MS
+)
+
+def measure_verify_ms(rounds, samples=3):
+    """
+    Median time of one bcrypt.checkpw at a given cost on this host.
+
+    Args:
+        rounds: bcrypt cost
+        samples: Verifications to time
+
+    Returns:
+        float: Milliseconds
+    """
+    password = b"calibration password"
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        bcrypt.checkpw(password, hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+def calibrate_bcrypt_rounds(target_ms=BCRYPT_TARGET_MS, min_rounds=BCRYPT_MIN_ROUNDS,
+                            max_rounds=BCRYPT_MAX_ROUNDS, samples=3):
+    """
+    Pick the highest bcrypt cost whose verification stays within target_ms here.
+
+    Each extra round doubles the work, so the cost is extrapolated from a
+    measurement at min_rounds and then confirmed (and lowered if needed) by
+    timing the chosen cost itself.
+
+    Args:
+        target_ms: Verification latency to stay within
+        min_rounds: Lowest cost to accept, even if slower than the target
+        max_rounds: Highest cost to consider
+        samples: Verifications timed per cost
+
+    Returns:
+        tuple: (rounds, measured milliseconds at that cost)
+    """
+    base_ms = measure_verify_ms(min_rounds, samples)
+    rounds = min_rounds
+    while rounds < max_rounds and base_ms * 2 ** (rounds + 1 - min_rounds) <= target_ms:
+        rounds += 1
+
+    measured = base_ms if rounds == min_rounds else measure_verify_ms(rounds, samples)
+    while rounds > min_rounds and measured > target_ms:
+        rounds -= 1
+        measured = measure_verify_ms(rounds, samples)
+    return rounds, measured
+
+def save_bcrypt_rounds(rounds, target_ms, measured_ms, path=AUTH_SETTINGS_PATH):
+    """Write the calibrated cost where config.py loads BCRYPT_ROUNDS from."""
+    settings = {
+        "bcrypt_rounds": rounds,
+        "target_ms": target_ms,
+        "measured_ms": round(measured_ms, 1),
+        "host": platform.node(),
+        "calibrated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(settings, indent=2))
+    tmp.replace(path)
+    return settings
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate the bcrypt work factor for this host.")
+    parser.add_argument("--target-ms", type=float, default=BCRYPT_TARGET_MS,
+                        help="Verification latency to stay within")
+    parser.add_argument("--samples", type=int, default=3, help="Verifications timed per cost")
+    parser.add_argument("--dry-run", action="store_true", help="Report the cost without saving it")
+    args = parser.parse_args()
+
+    print(f"\n⏱️ Calibrating bcrypt for a {args.target_ms:.0f} ms verification "
+          f"(cost {BCRYPT_MIN_ROUNDS}-{BCRYPT_MAX_ROUNDS})...")
+    rounds, measured = calibrate_bcrypt_rounds(args.target_ms, samples=args.samples)
+    print(f"   Cost {rounds}: {measured:.0f} ms per verification (currently configured: {BCRYPT_ROUNDS})")
+    if measured > args.target_ms:
+        print(f"🔺 Even the minimum cost {BCRYPT_MIN_ROUNDS} is slower than the target on this host.")
+
+    if args.dry_run:
+        return
+    save_bcrypt_rounds(rounds, args.target_ms, measured)
+    print(f"✅ Saved to {AUTH_SETTINGS_PATH}. Restart the app to use it; "
+          f"existing passwords are rehashed at the next successful login.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Change-feed tests for app/data/changes.py.
+
+KPIs and record frames patched from change_log deltas must equal a fresh
+read, and bulk loads must only silence the per-row entries of their own
+connection, logging one 'R' marker for each domain table they wrote.
+
+Run with:
+    python -m pytest -q changes_test.py
+"""
+import sqlite3
+import pandas as pd
+import pytest
+from app.data import analytic
+from app.data.approx import approx_registry, approx_top_k
+from app.data.changes import (
+    apply_changes_to_counts, apply_changes_to_frame, apply_kpi_changes, bulk_changes, get_change_version,
+    get_changes_since
+)
+from app.data.db import connect_database
+from app.data.incidents import get_incidents_page
+from app.data.schema import CHANGE_FEED_TABLES
+from app.services.data_loader import load_csv_to_table
+from app.services.record_pager import get_loaded_records
+
+KPI_TABLES = [
+    ("cyber_incidents", "get_incident_kpis"),
+    ("it_tickets", "get_ticket_kpis"),
+    ("datasets_metadata", "get_dataset_kpis"),
+]
+
+def _logged(conn, version):
+    return conn.execute(
+        "SELECT table_name, op FROM change_log WHERE version > ? ORDER BY version", (version,)
+    ).fetchall()
+
+def _insert_incident(conn, description="bulk"):
+    conn.execute(
+        "INSERT INTO cyber_incidents (timestamp, severity, category, status, description) "
+        "VALUES ('2024-05-01 10:00:00', 'High', 'Malware', 'Open', ?)", (description,)
+    )
+
+def test_change_feed_deltas_match_fresh_reads(db):
+    version = get_change_version(db)
+    kpis = {table: getattr(analytic, name).__wrapped__(db) for table, name in KPI_TABLES}
+    columns = ", ".join(CHANGE_FEED_TABLES["cyber_incidents"])
+    incidents = pd.read_sql_query(f"SELECT {columns} FROM cyber_incidents WHERE incident_id % 3 = 0", db)
+    categories = pd.read_sql_query(
+        "SELECT category, COUNT(*) AS count FROM cyber_incidents GROUP BY category", db
+    )
+
+    db.execute("UPDATE cyber_incidents SET severity = 'Critical', status = 'Open' WHERE incident_id % 7 = 0")
+    db.execute("UPDATE cyber_incidents SET category = 'Phishing' WHERE incident_id % 17 = 0")
+    db.execute("DELETE FROM cyber_incidents WHERE incident_id % 11 = 0")
+    db.execute("INSERT INTO cyber_incidents (timestamp, severity, status) VALUES ('2024-05-01', 'High', 'Open')")
+    db.execute("UPDATE it_tickets SET resolution_time_hours = NULL WHERE rowid % 5 = 0")
+    db.execute("UPDATE it_tickets SET resolution_time_hours = 1.5, status = 'Open' WHERE rowid % 9 = 0")
+    db.execute("DELETE FROM it_tickets WHERE rowid % 13 = 0")
+    db.execute("UPDATE datasets_metadata SET uploaded_by = 'analyst' WHERE rowid % 7 = 0")
+    db.execute("DELETE FROM datasets_metadata WHERE rowid % 11 = 0 "
+               "AND rows < (SELECT MAX(rows) FROM datasets_metadata)")
+    db.execute("INSERT INTO datasets_metadata (name, rows, columns, uploaded_by) VALUES ('new', 5, 2, 'newcomer')")
+
+    for table, name in KPI_TABLES:
+        patched = apply_kpi_changes(table, kpis[table], get_changes_since(db, version, [table]))
+        fresh = getattr(analytic, name).__wrapped__(db)
+        assert patched == pytest.approx(fresh), table
+
+    changes = get_changes_since(db, version, ["cyber_incidents"])
+    patched = apply_changes_to_frame(
+        incidents, changes, "incident_id", include=lambda row, rowid: row["incident_id"] % 3 == 0
+    )
+    fresh = pd.read_sql_query(f"SELECT {columns} FROM cyber_incidents WHERE incident_id % 3 = 0", db)
+    patched = patched.sort_values("incident_id").reset_index(drop=True)
+    assert patched.astype(str).equals(fresh.astype(str))
+
+    patched = apply_changes_to_counts(categories, changes, "category").dropna().set_index("category")["count"]
+    fresh = pd.read_sql_query(
+        "SELECT category, COUNT(*) AS count FROM cyber_incidents WHERE category IS NOT NULL GROUP BY category", db
+    ).set_index("category")["count"]
+    assert patched.sort_index().to_dict() == fresh.sort_index().to_dict()
+
+def test_bulk_pause_is_local_to_its_connection(db):
+    other = connect_database(db.db_path, profile="sqlite_defaults")
+    version = get_change_version(db)
+    with bulk_changes(db):
+        _insert_incident(db)
+        db.commit()
+        other.execute(
+            "INSERT INTO it_tickets (ticket_id, priority, description, status, assigned_to, created_at) "
+            "VALUES ('T-1', 'Low', 'from another session', 'Open', 'IT_Support_A', '2024-05-01 08:00:00')"
+        )
+        other.commit()
+        _insert_incident(db)
+        db.commit()
+    assert _logged(db, version) == [("it_tickets", "I"), ("cyber_incidents", "R")]
+
+    # A connection that dies mid-load leaves nothing paused for anyone else.
+    loader = connect_database(db.db_path, profile="sqlite_defaults")
+    bulk_changes(loader).__enter__()
+    loader.close()
+    version = get_change_version(db)
+    _insert_incident(other, "after the crash")
+    other.commit()
+    assert _logged(db, version) == [("cyber_incidents", "I")]
+    other.close()
+
+def test_plain_connections_write_and_log_during_a_bulk_load(db):
+    # e.g. the sqlite3 shell or DB Browser: no functions or hooks registered.
+    plain = sqlite3.connect(db.db_path)
+    version = get_change_version(db)
+    with bulk_changes(db):
+        _insert_incident(db)
+        db.commit()
+        _insert_incident(plain, "from the shell")
+        plain.commit()
+        _insert_incident(db)
+    assert _logged(db, version) == [("cyber_incidents", "I"), ("cyber_incidents", "R")]
+    assert plain.execute("SELECT COUNT(*) FROM change_feed_pause").fetchone()[0] == 0
+    plain.close()
+
+def test_bulk_marks_only_written_domain_tables(db):
+    version = get_change_version(db)
+    with bulk_changes(db):
+        db.execute("INSERT INTO import_checkpoints (source, table_name, rows_committed) VALUES ('x', 'y', 1)")
+        db.commit()
+    assert _logged(db, version) == []
+
+    with bulk_changes(db):
+        with bulk_changes(db):
+            db.execute("UPDATE it_tickets SET status = 'Closed' WHERE rowid = 1")
+        _insert_incident(db)
+        db.commit()
+    assert _logged(db, version) == [("cyber_incidents", "R"), ("it_tickets", "R")]
+
+    # A failed load still tells readers to reload what it committed, and only that.
+    version = get_change_version(db)
+    with pytest.raises(RuntimeError):
+        with bulk_changes(db):
+            _insert_incident(db)
+            db.commit()
+            db.execute("DELETE FROM it_tickets WHERE rowid = 2")
+            raise RuntimeError("load failed")
+    assert _logged(db, version) == [("cyber_incidents", "R")]
+
+def test_unchanged_incremental_sync_logs_nothing(db, tmp_path):
+    csv_path = tmp_path / "it_tickets.csv"
+    pd.DataFrame({
+        "ticket_id": [f"CSV-{i}" for i in range(50)],
+        "priority": "High",
+        "description": "synced",
+        "status": "Open",
+        "assigned_to": "IT_Support_B",
+        "created_at": "2024-07-01 09:00:00",
+    }).to_csv(csv_path, index=False)
+
+    version = get_change_version(db)
+    assert load_csv_to_table(db, csv_path, "it_tickets", incremental=True) == 50
+    assert _logged(db, version) == [("it_tickets", "R")]
+
+    # Forget the checksum so every row is upserted again; none of them changes.
+    db.execute("DELETE FROM import_watermarks")
+    db.commit()
+    version = get_change_version(db)
+    assert load_csv_to_table(db, csv_path, "it_tickets", incremental=True) == 0
+    assert _logged(db, version) == []
+
+@pytest.mark.parametrize("page_size, holds_bad_row", [(20, False), (100_000, True)],
+                         ids=["partial", "everything"])
+def test_record_delta_tolerates_unparseable_timestamps(db, page_size, holds_bad_row):
+    state = {}
+    get_loaded_records(db, "incidents", get_incidents_page, page_size=page_size, state=state)
+    db.executemany(
+        "INSERT INTO cyber_incidents (timestamp, severity, category, status, description) "
+        "VALUES (?, 'Low', 'Other', 'Open', ?)",
+        [("2025-01-01 09:00:00", "newest"), ("sometime last week", "bad timestamp")]
+    )
+    db.commit()
+
+    records, _ = get_loaded_records(db, "incidents", get_incidents_page, page_size=page_size, state=state)
+    assert state["incidents_version"] == get_change_version(db)   # patched, not reset
+    assert records["description"].iloc[0] == "newest"
+    # The bad row has a NULL epoch and sorts last: only a session that loaded everything holds it.
+    assert ("bad timestamp" in set(records["description"])) == holds_bad_row
+
+def test_approx_summaries_follow_the_change_log(db, monkeypatch):
+    def exact_counts():
+        return dict(db.execute(
+            "SELECT category, COUNT(*) FROM cyber_incidents WHERE category IS NOT NULL GROUP BY category"
+        ).fetchall())
+
+    approx_top_k(db, "cyber_incidents", "category")
+    db.execute("UPDATE cyber_incidents SET category = 'Phishing' WHERE incident_id % 17 = 0")
+    db.execute("DELETE FROM cyber_incidents WHERE incident_id % 11 = 0")
+    _insert_incident(db)
+    db.commit()
+
+    rebuilds = []
+    build = approx_registry._build
+    monkeypatch.setattr(approx_registry, "_build", lambda *args: rebuilds.append(args) or build(*args))
+    top = approx_top_k(db, "cyber_incidents", "category", n=len(exact_counts()))
+    assert dict(zip(top["category"], top["count"])) == exact_counts()
+    assert rebuilds == []
+
+    # A bulk reload carries no values, so the column is streamed again.
+    with bulk_changes(db):
+        db.execute("DELETE FROM cyber_incidents WHERE category = 'Malware'")
+        db.commit()
+    top = approx_top_k(db, "cyber_incidents", "category", n=10)
+    assert dict(zip(top["category"], top["count"])) == exact_counts()
+    assert len(rebuilds) == 1
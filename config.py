@@ -1,15 +1,76 @@
+import json
+import os
 import sqlite3
 import pandas as pd
 import bcrypt
 from pathlib import Path
 
-# Define paths
+# Define paths (importing config has no side effects: setup.py, connect_database()
+# and calibrate_bcrypt.py create DATA when they first write to it)
 DATA_DIR = Path("DATA")
 DB_PATH = DATA_DIR / "intelligence_platform.db"
 
-# Create DATA folder if it doesn't exist
-DATA_DIR.mkdir(parents=True, exist_ok=True)
+# Connection pool settings (see app/data/db.py)
+DB_POOL_SIZE = 8        # max open connections per database file
+DB_POOL_TIMEOUT = 30    # seconds to wait for a free connection
 
-print(" Imports successful!")
-print(f" DATA folder: {DATA_DIR.resolve()}")
-print(f" Database will be created at: {DB_PATH.resolve()}")
\ No newline at end of file
+# SQLite performance profile applied to every connection
+# (one of app.data.db.PERFORMANCE_PROFILES; override with the DB_PROFILE env var)
+DB_PROFILE = os.environ.get("DB_PROFILE", "read_heavy_dashboard")
+
+# Rows fetched per "page" in the record tables on the Streamlit pages
+RECORDS_PAGE_SIZE = 50
+
+# Maximum rows returned by the full-text search boxes
+SEARCH_RESULT_LIMIT = 200
+
+# Shared analytic query cache (see app/data/cache.py)
+QUERY_CACHE_MAX_ENTRIES = 256
+QUERY_CACHE_MAX_MB = 64
+
+# Streaming CSV import: rows per executemany chunk
+CSV_CHUNK_SIZE = 50_000
+# Parallel CSV pipeline: parsed chunks buffered between the parser processes and the writer
+CSV_PIPELINE_QUEUE_SIZE = 8
+
+# Legacy users.txt migration: lines validated and inserted per batch / transaction
+USER_MIGRATION_BATCH_SIZE = 50_000
+
+# Approximate unique counts / top-N (see app/data/approx.py)
+APPROX_DISTINCT_ERROR = 0.01   # HyperLogLog relative standard error
+APPROX_TOP_K_ERROR = 0.005     # Space-Saving: counts are at most twice this fraction of all rows too high
+
+# Print every page region's render time to the console (LOG_RENDER_TIMINGS=1)
+LOG_RENDER_TIMINGS = os.environ.get("LOG_RENDER_TIMINGS") == "1"
+
+# Dashboard sections loaded in parallel (see app/services/dashboard_loader.py)
+DASHBOARD_LOADER_WORKERS = 3
+DASHBOARD_SECTION_TIMEOUT = 10   # seconds before a section is shown as timed out
+
+# Change feed: newest change_log entries kept by setup.py (older sessions just reload)
+CHANGE_LOG_KEEP_VERSIONS = 100_000
+
+# Record exports: rows read from SQLite and written out per chunk (see app/services/export_service.py)
+EXPORT_CHUNK_SIZE = 50_000
+
+# bcrypt hashing worker pool for logins and registrations (see app/services/auth_executor.py)
+AUTH_WORKERS = max(1, min(4, os.cpu_count() or 1))
+AUTH_QUEUE_DEPTH = 16   # hashes allowed to wait for a worker before new requests are turned away
+AUTH_TIMEOUT = 15       # seconds a login/registration waits for its hash
+
+# Signed session tokens (see app/services/user_service.py). Without SESSION_SECRET a random
+# key is made per process, so a restart logs everyone out.
+SESSION_SECRET = os.environ.get("SESSION_SECRET", "").encode("utf-8") or os.urandom(32)
+SESSION_TTL = 8 * 60 * 60   # seconds
+
+# bcrypt work factor for new and rehashed passwords. calibrate_bcrypt.py measures this host and
+# writes the cost meeting BCRYPT_TARGET_MS to AUTH_SETTINGS_PATH; until then bcrypt's default is used.
+AUTH_SETTINGS_PATH = DATA_DIR / "auth_settings.json"
+BCRYPT_TARGET_MS = 250
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+BCRYPT_DEFAULT_ROUNDS = 12
+try:
+    BCRYPT_ROUNDS = int(json.loads(AUTH_SETTINGS_PATH.read_text())["bcrypt_rounds"])
+except (OSError, ValueError, KeyError, TypeError):
+    BCRYPT_ROUNDS = BCRYPT_DEFAULT_ROUNDS
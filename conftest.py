@@ -0,0 +1,92 @@
+"""
+Shared pytest fixtures: a seeded copy of the platform schema.
+
+The database is built and seeded once per test session. `seeded_db` is its
+path, for module-scoped fixtures that only read it or roll back what they
+write; `db` is a connection to a private copy for tests that commit.
+`user_db` points app/services/user_service.py at an empty users table of
+its own, with bcrypt at its cheapest cost.
+"""
+import random
+import sqlite3
+import pytest
+from app.data.db import connect_database, get_connection
+from app.data.schema import create_all_tables, create_users_table
+from app.services import auth_executor, user_service
+
+# Rows seeded into each domain table (just above query_plan_test.PLAN_ROW_THRESHOLD)
+SEED_ROWS = 5001
+
+SEVERITIES = ["Low", "Medium", "High", "Critical"]
+CATEGORIES = ["Phishing", "Malware", "Data Breach", "Unauthorized Access", "DDoS", "Other"]
+STATUSES = ["Open", "In Progress", "Resolved", "Closed"]
+ASSIGNEES = [f"IT_Support_{c}" for c in "ABCDEFGH"]
+UPLOADERS = ["data_scientist", "cyber_admin", "it_admin", "analyst"]
+
+def seed_database(conn, rows):
+    """Insert `rows` random incidents, tickets and datasets (same data on every run)."""
+    rng = random.Random(1510)
+    conn.executemany(
+        "INSERT INTO cyber_incidents (timestamp, severity, category, status, description) VALUES (?, ?, ?, ?, ?)",
+        [
+            (f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 10:00:00",
+             rng.choice(SEVERITIES), rng.choice(CATEGORIES), rng.choice(STATUSES), "seeded incident")
+            for _ in range(rows)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO it_tickets (ticket_id, priority, description, status, assigned_to, created_at, "
+        "resolution_time_hours) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (str(2000 + i), rng.choice(SEVERITIES), "seeded ticket", rng.choice(STATUSES),
+             rng.choice(ASSIGNEES), f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 08:00:00",
+             round(rng.uniform(1, 120), 1))
+            for i in range(rows)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO datasets_metadata (name, rows, columns, uploaded_by, upload_date) VALUES (?, ?, ?, ?, ?)",
+        [
+            (f"dataset_{i}", rng.randint(100, 1_000_000), rng.randint(2, 60),
+             rng.choice(UPLOADERS), f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+            for i in range(rows)
+        ],
+    )
+    conn.commit()
+
+@pytest.fixture(scope="session")
+def seeded_db(tmp_path_factory):
+    """Path of a database with every table created and SEED_ROWS rows per domain table."""
+    db_path = tmp_path_factory.mktemp("seeded") / "seeded.db"
+    conn = connect_database(db_path, profile="sqlite_defaults")
+    create_all_tables(conn)
+    seed_database(conn, SEED_ROWS)
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+    return db_path
+
+@pytest.fixture
+def db(seeded_db, tmp_path):
+    """Connection to this test's own copy of the seeded database."""
+    db_path = tmp_path / "copy.db"
+    source = sqlite3.connect(seeded_db)
+    target = sqlite3.connect(db_path)
+    source.backup(target)
+    source.close()
+    target.close()
+    conn = connect_database(db_path, profile="sqlite_defaults")
+    yield conn
+    conn.close()
+
+@pytest.fixture
+def user_db(tmp_path, monkeypatch):
+    """Path of the private database user_service reads and writes users in."""
+    db_path = tmp_path / "users.db"
+    conn = connect_database(db_path, profile="sqlite_defaults")
+    create_users_table(conn)
+    conn.close()
+    monkeypatch.setattr(user_service, "get_connection", lambda **kwargs: get_connection(db_path, **kwargs))
+    monkeypatch.setattr(user_service, "BCRYPT_ROUNDS", 4)
+    monkeypatch.setattr(auth_executor, "BCRYPT_ROUNDS", 4)
+    return db_path
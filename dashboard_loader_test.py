@@ -0,0 +1,98 @@
+"""
+Concurrent section loading tests for app/services/dashboard_loader.py.
+
+Sections must be yielded in the order they finish, a section past its
+deadline must come back as a SectionTimeoutError without holding up the
+others, a loader's exception must be returned as its error instead of
+raised, and loaders must only see a plain copy of the session state, which
+the script thread writes back.
+
+Run with:
+    python -m pytest -q dashboard_loader_test.py
+"""
+import threading
+import time
+from contextlib import contextmanager
+import pytest
+from streamlit.testing.v1 import AppTest
+from app.services import dashboard_loader
+from app.services.dashboard_loader import SectionTimeoutError, load_sections
+
+@pytest.fixture(autouse=True)
+def no_database(monkeypatch):
+    """The loaders below don't query, so hand them a stand-in instead of a pooled connection."""
+    @contextmanager
+    def get_connection(read_only=False):
+        yield "conn"
+    monkeypatch.setattr(dashboard_loader, "get_connection", get_connection)
+
+def _sleep(conn, seconds, value):
+    time.sleep(seconds)
+    return value
+
+def _fail(conn):
+    raise ValueError("broken section")
+
+def test_sections_are_yielded_as_they_finish():
+    sections = {"slow": (_sleep, (0.3, "s")), "fast": (_sleep, (0.0, "f"))}
+    results = [(name, result, error) for name, result, _, error in load_sections(sections, workers=2)]
+    assert results == [("fast", "f", None), ("slow", "s", None)]
+
+def test_section_past_its_deadline_times_out_alone():
+    release = threading.Event()
+    sections = {"stuck": (lambda conn: release.wait(5), ()), "quick": (_sleep, (0.05, "q"))}
+    started = time.perf_counter()
+    try:
+        results = list(load_sections(sections, timeouts={"stuck": 0.2}, default_timeout=5, workers=2))
+    finally:
+        release.set()
+    assert time.perf_counter() - started < 2
+    assert [(name, result) for name, result, _, _ in results] == [("quick", "q"), ("stuck", None)]
+    assert isinstance(results[1][3], SectionTimeoutError)
+    assert results[1][2] >= 0.2
+
+def test_loader_exceptions_are_returned_not_raised():
+    sections = {"broken": (_fail, ()), "fine": (_sleep, (0.05, "ok"))}
+    results = {name: (result, error) for name, result, _, error in load_sections(sections, workers=2)}
+    assert results["fine"] == ("ok", None)
+    result, error = results["broken"]
+    assert result is None and isinstance(error, ValueError)
+
+def _session_state_page():
+    import threading
+    import streamlit as st
+    from app.services.dashboard_loader import copy_session_state, load_sections, store_session_state
+
+    keys = ["pages", "cursor", "missing"]
+    st.session_state.setdefault("pages", [1])
+    st.session_state.setdefault("cursor", 10)
+    script_thread = threading.current_thread()
+
+    def loader(conn, state):
+        # A plain dict, read and changed off the script thread.
+        assert type(state) is dict
+        assert threading.current_thread() is not script_thread
+        state["pages"] = state["pages"] + [len(state["pages"]) + 1]
+        del state["cursor"]
+        state["missing"] = "added"
+        return state
+
+    state = copy_session_state(keys)
+    for name, result, seconds, error in load_sections({"section": (loader, (state,))}):
+        if error is not None:
+            raise error
+        store_session_state(result, keys)
+
+def test_session_state_round_trips_through_a_copy():
+    at = AppTest.from_function(_session_state_page, default_timeout=10)
+    at.run()
+    assert not at.exception
+    assert at.session_state["pages"] == [1, 2]
+    assert "cursor" not in at.session_state
+    assert at.session_state["missing"] == "added"
+
+    # The copy is taken again on the next run, from the stored values.
+    at.session_state["cursor"] = 20
+    at.run()
+    assert at.session_state["pages"] == [1, 2, 3]
+    assert "cursor" not in at.session_state
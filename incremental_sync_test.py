@@ -0,0 +1,93 @@
+"""
+Incremental CSV sync tests for sync_csv_to_table() in app/services/data_loader.py.
+
+An unchanged file must be skipped, a file that only grew must be read from
+where the last sync stopped, and a rewritten file must be upserted on the
+table's key so that only rows whose values changed are written.
+
+Run with:
+    python -m pytest -q incremental_sync_test.py
+"""
+import pandas as pd
+import pytest
+from app.services.data_loader import build_upsert_statement, sync_csv_to_table
+
+ROWS = 300
+
+def _tickets(start, stop, description="synced"):
+    return pd.DataFrame({
+        "ticket_id": [str(9000 + i) for i in range(start, stop)],
+        "priority": "High",
+        "description": description,
+        "status": "Open",
+        "assigned_to": "IT_Support_C",
+        "created_at": "2024-07-01 09:00:00",
+    })
+
+def _watermark(conn):
+    return conn.execute("SELECT high_water_mark, rows_synced FROM import_watermarks").fetchone()
+
+def _description(conn, ticket_id):
+    return conn.execute("SELECT description FROM it_tickets WHERE ticket_id = ?", (ticket_id,)).fetchone()[0]
+
+@pytest.fixture
+def csv_path(db, tmp_path):
+    path = tmp_path / "it_tickets.csv"
+    _tickets(0, ROWS).to_csv(path, index=False)
+    assert sync_csv_to_table(db, path, "it_tickets", chunk_size=100, progress=None) == ROWS
+    assert _watermark(db) == (str(9000 + ROWS - 1), ROWS)
+    return path
+
+def test_unchanged_file_is_skipped(db, csv_path):
+    db.execute("UPDATE it_tickets SET description = 'edited in the app' WHERE ticket_id = '9000'")
+    db.commit()
+    assert sync_csv_to_table(db, csv_path, "it_tickets", progress=None) == 0
+    # Skipped without being read: the edit made since the last sync is kept.
+    assert _description(db, "9000") == "edited in the app"
+
+def test_grown_file_reads_only_the_appended_rows(db, csv_path):
+    db.execute("UPDATE it_tickets SET description = 'edited in the app' WHERE ticket_id = '9000'")
+    db.commit()
+    _tickets(ROWS, ROWS + 40).to_csv(csv_path, mode="a", header=False, index=False)
+
+    assert sync_csv_to_table(db, csv_path, "it_tickets", chunk_size=100, progress=None) == 40
+    assert _description(db, "9000") == "edited in the app"
+    assert _watermark(db) == (str(9000 + ROWS + 39), ROWS + 40)
+
+def test_rewritten_file_upserts_only_changed_rows(db, csv_path):
+    df = _tickets(0, ROWS)
+    df.loc[df["ticket_id"].isin(["9005", "9200"]), "status"] = "Closed"
+    df.to_csv(csv_path, index=False)
+
+    assert sync_csv_to_table(db, csv_path, "it_tickets", chunk_size=100, progress=None) == 2
+    closed = db.execute("SELECT ticket_id FROM it_tickets WHERE ticket_id LIKE '9%' AND status = 'Closed' "
+                        "AND description = 'synced' ORDER BY ticket_id").fetchall()
+    assert closed == [("9005",), ("9200",)]
+
+def test_append_only_skips_rows_below_the_high_water_mark(db, csv_path):
+    df = pd.concat([_tickets(0, ROWS, description="rewritten"), _tickets(ROWS, ROWS + 10)])
+    df.to_csv(csv_path, index=False)
+
+    assert sync_csv_to_table(db, csv_path, "it_tickets", append_only=True, progress=None) == 10
+    assert _description(db, "9000") == "synced"
+
+def test_rows_without_a_key_are_skipped(db, tmp_path):
+    path = tmp_path / "it_tickets.csv"
+    df = _tickets(0, 5)
+    df.loc[2, "ticket_id"] = None
+    df.to_csv(path, index=False)
+    assert sync_csv_to_table(db, path, "it_tickets", progress=None) == 4
+
+def test_high_water_mark_orders_numeric_keys_as_numbers(db, tmp_path):
+    path = tmp_path / "it_tickets.csv"
+    pd.concat([_tickets(1000, 1001), _tickets(0, 1)]).to_csv(path, index=False)
+    sync_csv_to_table(db, path, "it_tickets", progress=None)
+    assert _watermark(db)[0] == "10000"
+
+def test_upsert_statement_only_updates_changed_values():
+    sql = build_upsert_statement("it_tickets", ["ticket_id", "status"], "ticket_id")
+    assert sql.endswith(
+        "ON CONFLICT (ticket_id) DO UPDATE SET status = excluded.status "
+        "WHERE (it_tickets.status) IS NOT (excluded.status)"
+    )
+    assert build_upsert_statement("it_tickets", ["ticket_id"], "ticket_id").endswith("DO NOTHING")
@@ -0,0 +1,70 @@
+"""
+One-statement KPI tests for the get_*_kpis functions in app/data/analytic.py.
+
+Each KPI dict must match what the pages used to compute by loading the whole
+table into pandas and filtering it, on the seeded database and on empty
+tables (where the average resolution time is None, not 0).
+
+Run with:
+    python -m pytest -q kpis_test.py
+"""
+import pandas as pd
+import pytest
+from app.data.analytic import get_dataset_kpis, get_incident_kpis, get_ticket_kpis
+from app.data.db import connect_database
+from app.data.schema import create_all_tables
+
+def _old_page_metrics(conn):
+    """The metric cards as the pages computed them before the KPI API."""
+    incidents = pd.read_sql_query("SELECT * FROM cyber_incidents", conn)
+    datasets = pd.read_sql_query("SELECT * FROM datasets_metadata", conn)
+    tickets = pd.read_sql_query("SELECT * FROM it_tickets", conn)
+    return {
+        "incidents": {
+            "total_incidents": len(incidents),
+            "high_critical": incidents[incidents["severity"].isin(["High", "Critical"])].shape[0],
+            "open_incidents": incidents[incidents["status"] == "Open"].shape[0],
+        },
+        "datasets": {
+            "total_datasets": len(datasets),
+            "largest_dataset": datasets["rows"].max() if not datasets.empty else 0,
+        },
+        "tickets": {
+            "total_tickets": len(tickets),
+            "open_tickets": tickets[tickets["status"] == "Open"].shape[0],
+            "avg_resolution": tickets["resolution_time_hours"].mean(),
+            "resolution_count": int(tickets["resolution_time_hours"].notna().sum()),
+        },
+    }
+
+def _kpis(conn):
+    return {
+        "incidents": get_incident_kpis.__wrapped__(conn),
+        "datasets": get_dataset_kpis.__wrapped__(conn),
+        "tickets": get_ticket_kpis.__wrapped__(conn),
+    }
+
+def test_kpis_match_the_old_page_metrics(db):
+    # Rows the old filters had to handle: NULL severity/status and tickets never resolved.
+    db.execute("INSERT INTO cyber_incidents (timestamp, severity, status) VALUES ('2024-05-01', NULL, NULL)")
+    db.execute("UPDATE it_tickets SET resolution_time_hours = NULL WHERE rowid % 6 = 0")
+    db.commit()
+    old, new = _old_page_metrics(db), _kpis(db)
+    assert new["incidents"] == old["incidents"]
+    assert new["datasets"] == old["datasets"]
+    assert new["tickets"] == pytest.approx(old["tickets"])
+    assert min(new["incidents"].values()) > 0 and new["tickets"]["open_tickets"] > 0
+
+def test_empty_tables(tmp_path):
+    conn = connect_database(tmp_path / "empty.db", profile="sqlite_defaults")
+    create_all_tables(conn)
+    assert _kpis(conn) == {
+        "incidents": {"total_incidents": 0, "high_critical": 0, "open_incidents": 0},
+        "datasets": {"total_datasets": 0, "largest_dataset": 0},
+        "tickets": {"total_tickets": 0, "open_tickets": 0, "avg_resolution": None, "resolution_count": 0},
+    }
+    # Tickets without any resolution time have no average either.
+    conn.execute("INSERT INTO it_tickets (ticket_id, status) VALUES ('T-1', 'Open')")
+    conn.commit()
+    assert get_ticket_kpis.__wrapped__(conn)["avg_resolution"] is None
+    conn.close()
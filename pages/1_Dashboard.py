@@ -2,23 +2,33 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from app.data.analytic import (
-    get_incidents_by_category_count,
-    get_datasets_by_uploader,
-    get_tickets_by_status
+    get_incidents_by_category_rollup,
+    get_incidents_by_severity_rollup,
+    get_tickets_by_status_rollup,
+    get_incident_kpis,
+    get_dataset_kpis,
+    get_ticket_kpis
 )
-from app.data.db import connect_database
+from app.data.approx import approx_distinct, approx_top_k
+from app.data.cache import get_cache_stats
+from app.data.trends import get_incident_trend, get_ticket_backlog_trend
+from app.data.db import get_connection
+from app.data.incidents import get_incidents_page
+from app.data.datasets import get_datasets_page
+from app.data.tickets import get_tickets_page
+from app.services.live_view import get_live_kpis, kpi_state_keys
+from app.services.record_pager import get_loaded_records, record_state_keys, render_load_more
+from app.services.dashboard_loader import SectionTimeoutError, copy_session_state, load_sections, store_session_state
+from app.services.render_timer import record_region_time, timed_fragment, timed_region, render_timings_panel
+from app.services.user_service import resolve_session_token, revoke_session_token
+from config import APPROX_DISTINCT_ERROR
 import time
 
 st.set_page_config(page_title="Dashboard", page_icon="📊", layout="wide")
 
-# Ensure session state keys exist
-if "logged_in" not in st.session_state:
-    st.session_state.logged_in = False
-if "username" not in st.session_state:
-    st.session_state.username = ""
-
-# Guard: if not logged in, send user back
-if not st.session_state.logged_in:
+# Guard: resolve the session token (signature check + in-memory cache, no database query)
+principal = resolve_session_token(st.session_state.get("session_token"))
+if principal is None:
     st.error("You must be logged in to view the dashboard.")
     if st.button("Go to login page"):
         st.switch_page("Login.py")
@@ -26,141 +36,236 @@ if not st.session_state.logged_in:
 
 # Logged-in view
 st.title("📊 Dashboard")
-st.success(f"Hello, **{st.session_state.username}**! You are logged in.")
+st.success(f"Hello, **{principal.username}**! You are logged in.")
 st.toast("Dashboard loaded successfully!")
 
-# Connect to DB
-conn = connect_database()
-
-# Sidebar filters
-with st.sidebar:
-    st.header("Filters")
-    st.caption("Adjust filters to refine analytics.")
-    min_cases = st.slider("Minimum incident cases", 1, 20, 5)
+# The three sections are loaded at the same time by app/services/dashboard_loader.py
+# (one worker thread and read-only connection each) and drawn as each one
+# finishes, so the page waits for the slowest section, not for all three in a
+# row. The load_* functions only query and build figures; render_* draw them.
+# Loaders run off the script thread, so they update a copy of their session
+# state entries, which is written back to st.session_state before drawing.
+# Record tables are fragments, so "Load more" under one redraws only that table.
 
 # --- Cyber Incidents Section ---
-st.subheader("🚨 Cyber Incidents")
-
-incident_table_query = """
-    SELECT incident_id, timestamp, severity, category, status, description
-    FROM cyber_incidents
-    ORDER BY timestamp DESC
-"""
-incident_table_df = pd.read_sql_query(incident_table_query, conn)
-
-total_incidents = len(incident_table_df)
-high_critical = incident_table_df[incident_table_df["severity"].isin(["High", "Critical"])].shape[0]
-open_incidents = incident_table_df[incident_table_df["status"] == "Open"].shape[0]
-
-col1, col2, col3 = st.columns(3)
-col1.metric("🧮 Total Incidents", total_incidents)
-col2.metric("🔥 High/Critical", high_critical)
-col3.metric("📬 Open Incidents", open_incidents)
-
-if not incident_table_df.empty:
-    severity_counts = incident_table_df["severity"].value_counts().reset_index()
-    severity_counts.columns = ["Severity", "Count"]
-    fig = px.bar(severity_counts, x="Severity", y="Count", title="Severity Breakdown", color="Severity")
-    st.plotly_chart(fig, width="stretch")
+def load_incident_section(conn, state, top_n, trend_granularity):
+    kpis = get_live_kpis(conn, "incidents", "cyber_incidents", get_incident_kpis, state=state)
+    figures = []
+    if kpis["total_incidents"]:
+        severity_counts = get_incidents_by_severity_rollup(conn)
+        severity_counts.columns = ["Severity", "Count"]
+        figures.append(px.bar(severity_counts, x="Severity", y="Count", title="Severity Breakdown", color="Severity"))
+
+        top_categories = approx_top_k(conn, "cyber_incidents", "category", top_n)
+        top_categories = top_categories[["category", "count"]]
+        top_categories.columns = ["Category", "Count"]
+        figures.append(px.bar(top_categories, x="Category", y="Count", title=f"Top {top_n} Categories",
+                              color="Category"))
+
+        incident_trend = get_incident_trend(conn, trend_granularity, window=4)
+        incident_trend.columns = ["Period", "Incidents", "Rolling Mean (4 periods)"]
+        figures.append(px.line(incident_trend, x="Period", y=["Incidents", "Rolling Mean (4 periods)"],
+                               title=f"Incidents per {trend_granularity}"))
+
+        # Warm the session's first page of records for the table fragment.
+        get_loaded_records(conn, "incidents", get_incidents_page, state=state)
+    return {"kpis": kpis, "figures": figures, "state": state}
 
+@timed_fragment("Incident records")
+def incident_records():
     st.markdown("#### Incident Records")
-    incident_table_df = incident_table_df.rename(columns={
-        "incident_id": "ID",
-        "timestamp": "Date",
-        "severity": "Severity",
-        "category": "Category",
-        "status": "Status",
-        "description": "Description"
-    })
-    st.dataframe(incident_table_df, width="stretch")
-else:
-    st.info("No incident records available.")
-
-st.markdown("---")
+    with get_connection() as conn:
+        incident_table_df, incidents_has_more = get_loaded_records(conn, "incidents", get_incidents_page)
+        incident_table_df = incident_table_df.rename(columns={
+            "incident_id": "ID",
+            "timestamp": "Date",
+            "severity": "Severity",
+            "category": "Category",
+            "status": "Status",
+            "description": "Description"
+        })
+        st.dataframe(incident_table_df, width="stretch")
+        render_load_more(conn, "incidents", get_incidents_page, incidents_has_more)
+
+def render_incident_section(section):
+    incident_kpis = section["kpis"]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("🧮 Total Incidents", incident_kpis["total_incidents"])
+    col2.metric("🔥 High/Critical", incident_kpis["high_critical"])
+    col3.metric("📬 Open Incidents", incident_kpis["open_incidents"])
+
+    if incident_kpis["total_incidents"]:
+        for fig in section["figures"]:
+            st.plotly_chart(fig, width="stretch")
+        incident_records()
+    else:
+        st.info("No incident records available.")
 
 # --- Datasets Section ---
-st.subheader("📂 Datasets")
-
-datasets_query = """
-    SELECT dataset_id, name, rows, columns, uploaded_by, upload_date
-    FROM datasets_metadata
-    ORDER BY upload_date DESC
-"""
-datasets_df = pd.read_sql_query(datasets_query, conn)
-
-total_datasets = len(datasets_df)
-largest_dataset = datasets_df["rows"].max() if not datasets_df.empty else 0
-unique_uploaders = datasets_df["uploaded_by"].nunique() if not datasets_df.empty else 0
-
-col1, col2, col3 = st.columns(3)
-col1.metric("📊 Total Datasets", total_datasets)
-col2.metric("📈 Largest Dataset (rows)", largest_dataset)
-col3.metric("👤 Unique Uploaders", unique_uploaders)
-
-if not datasets_df.empty:
-    uploader_counts = datasets_df["uploaded_by"].value_counts().reset_index()
-    uploader_counts.columns = ["Uploader", "Count"]
-    fig = px.bar(uploader_counts, x="Uploader", y="Count", title="Datasets by Uploader", color="Uploader")
-    st.plotly_chart(fig, width="stretch")
+def load_dataset_section(conn, state, top_n):
+    kpis = get_live_kpis(conn, "datasets", "datasets_metadata", get_dataset_kpis, state=state)
+    figures = []
+    if kpis["total_datasets"]:
+        uploader_counts = approx_top_k(conn, "datasets_metadata", "uploaded_by", top_n)
+        uploader_counts = uploader_counts[["uploaded_by", "count"]]
+        uploader_counts.columns = ["Uploader", "Count"]
+        figures.append(px.bar(uploader_counts, x="Uploader", y="Count", title=f"Top {top_n} Uploaders",
+                              color="Uploader"))
+        get_loaded_records(conn, "datasets", get_datasets_page, state=state)
+    unique_uploaders = approx_distinct(conn, "datasets_metadata", "uploaded_by")
+    return {"kpis": kpis, "unique_uploaders": unique_uploaders, "figures": figures, "state": state}
 
+@timed_fragment("Dataset records")
+def dataset_records():
     st.markdown("#### Dataset Records")
-    datasets_df = datasets_df.rename(columns={
-        "dataset_id": "ID",
-        "name": "Name",
-        "rows": "Rows",
-        "columns": "Columns",
-        "uploaded_by": "Uploaded By",
-        "upload_date": "Upload Date"
-    })
-    st.dataframe(datasets_df, width="stretch")
-else:
-    st.info("No dataset records available.")
-
-st.markdown("---")
+    with get_connection() as conn:
+        datasets_df, datasets_has_more = get_loaded_records(conn, "datasets", get_datasets_page)
+        datasets_df = datasets_df.rename(columns={
+            "dataset_id": "ID",
+            "name": "Name",
+            "rows": "Rows",
+            "columns": "Columns",
+            "uploaded_by": "Uploaded By",
+            "upload_date": "Upload Date"
+        })
+        st.dataframe(datasets_df, width="stretch")
+        render_load_more(conn, "datasets", get_datasets_page, datasets_has_more)
+
+def render_dataset_section(section):
+    dataset_kpis = section["kpis"]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("📊 Total Datasets", dataset_kpis["total_datasets"])
+    col2.metric("📈 Largest Dataset (rows)", dataset_kpis["largest_dataset"])
+    col3.metric("👤 Unique Uploaders", section["unique_uploaders"],
+                help=f"HyperLogLog estimate, within about ±{APPROX_DISTINCT_ERROR:.0%}")
+
+    if dataset_kpis["total_datasets"]:
+        for fig in section["figures"]:
+            st.plotly_chart(fig, width="stretch")
+        dataset_records()
+    else:
+        st.info("No dataset records available.")
 
 # --- Tickets Section ---
-st.subheader("🎟️ Tickets")
-
-tickets_query = """
-    SELECT ticket_id, priority, description, status, assigned_to, created_at, resolution_time_hours
-    FROM it_tickets
-    ORDER BY created_at DESC
-"""
-tickets_df = pd.read_sql_query(tickets_query, conn)
-
-total_tickets = len(tickets_df)
-open_tickets = tickets_df[tickets_df["status"] == "Open"].shape[0]
-avg_resolution = tickets_df["resolution_time_hours"].mean() if not tickets_df.empty else 0
-
-col1, col2, col3 = st.columns(3)
-col1.metric("🎫 Total Tickets", total_tickets)
-col2.metric("📬 Open Tickets", open_tickets)
-col3.metric("⏱️ Avg Resolution (hrs)", round(avg_resolution, 2))
-
-if not tickets_df.empty:
-    status_counts = tickets_df["status"].value_counts().reset_index()
-    status_counts.columns = ["Status", "Count"]
-    fig = px.bar(status_counts, x="Status", y="Count", title="Ticket Status Breakdown", color="Status")
-    st.plotly_chart(fig, width="stretch")
+def load_ticket_section(conn, state, top_n, trend_granularity):
+    kpis = get_live_kpis(conn, "tickets", "it_tickets", get_ticket_kpis, state=state)
+    figures = []
+    if kpis["total_tickets"]:
+        status_counts = get_tickets_by_status_rollup(conn)
+        status_counts.columns = ["Status", "Count"]
+        figures.append(px.bar(status_counts, x="Status", y="Count", title="Ticket Status Breakdown", color="Status"))
+
+        top_assignees = approx_top_k(conn, "it_tickets", "assigned_to", top_n)
+        top_assignees = top_assignees[["assigned_to", "count"]]
+        top_assignees.columns = ["Assignee", "Count"]
+        figures.append(px.bar(top_assignees, x="Assignee", y="Count", title=f"Top {top_n} Assignees",
+                              color="Assignee"))
 
+        backlog_trend = get_ticket_backlog_trend(conn, trend_granularity)
+        backlog_trend.columns = ["Period", "Opened", "Closed", "Open Backlog"]
+        figures.append(px.line(backlog_trend, x="Period", y=["Opened", "Closed", "Open Backlog"],
+                               title=f"Ticket backlog per {trend_granularity}"))
+        get_loaded_records(conn, "tickets", get_tickets_page, state=state)
+    return {"kpis": kpis, "figures": figures, "state": state}
+
+@timed_fragment("Ticket records")
+def ticket_records():
     st.markdown("#### Ticket Records")
-    tickets_df = tickets_df.rename(columns={
-        "ticket_id": "ID",
-        "priority": "Priority",
-        "description": "Description",
-        "status": "Status",
-        "assigned_to": "Assigned To",
-        "created_at": "Created At",
-        "resolution_time_hours": "Resolution Time (hrs)"
-    })
-    st.dataframe(tickets_df, width="stretch")
-else:
-    st.info("No ticket records available.")
+    with get_connection() as conn:
+        tickets_df, tickets_has_more = get_loaded_records(conn, "tickets", get_tickets_page)
+        tickets_df = tickets_df.rename(columns={
+            "ticket_id": "ID",
+            "priority": "Priority",
+            "description": "Description",
+            "status": "Status",
+            "assigned_to": "Assigned To",
+            "created_at": "Created At",
+            "resolution_time_hours": "Resolution Time (hrs)"
+        })
+        st.dataframe(tickets_df, width="stretch")
+        render_load_more(conn, "tickets", get_tickets_page, tickets_has_more)
+
+def render_ticket_section(section):
+    ticket_kpis = section["kpis"]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("🎫 Total Tickets", ticket_kpis["total_tickets"])
+    col2.metric("📬 Open Tickets", ticket_kpis["open_tickets"])
+    avg_resolution = ticket_kpis["avg_resolution"]
+    col3.metric("⏱️ Avg Resolution (hrs)", round(avg_resolution, 2) if avg_resolution is not None else "—")
+
+    if ticket_kpis["total_tickets"]:
+        for fig in section["figures"]:
+            st.plotly_chart(fig, width="stretch")
+        ticket_records()
+    else:
+        st.info("No ticket records available.")
+
+SECTION_TITLES = {
+    "incidents": "🚨 Cyber Incidents",
+    "datasets": "📂 Datasets",
+    "tickets": "🎟️ Tickets",
+}
+# Session state entries each section's loader reads and updates
+SECTION_STATE_KEYS = {
+    name: kpi_state_keys(name) + record_state_keys(name) for name in SECTION_TITLES
+}
+SECTION_RENDERERS = {
+    "incidents": render_incident_section,
+    "datasets": render_dataset_section,
+    "tickets": render_ticket_section,
+}
+
+with timed_region("Dashboard page (full run)"):
+    # Sidebar filters
+    with st.sidebar:
+        st.header("Filters")
+        st.caption("Adjust filters to refine analytics.")
+        trend_granularity = st.selectbox("Trend granularity", ["day", "week", "month"], index=1)
+        top_n = st.slider("Top N in charts", 3, 25, 10)
+
+        with st.expander("⚙️ Query cache"):
+            cache_stats = get_cache_stats()
+            st.metric("Hit rate", f"{cache_stats['hit_rate']:.0%}")
+            st.caption(
+                f"{cache_stats['hits']} hits · {cache_stats['misses']} misses · "
+                f"{cache_stats['entries']} entries · {cache_stats['bytes'] / 1024:.0f} KiB"
+            )
+
+    # Lay the sections out in a fixed order, then fill each one as it finishes loading.
+    containers, placeholders = {}, {}
+    for i, (name, title) in enumerate(SECTION_TITLES.items()):
+        if i:
+            st.markdown("---")
+        containers[name] = st.container()
+        with containers[name]:
+            st.subheader(title)
+            placeholders[name] = st.empty()
+            placeholders[name].info("⏳ Loading...")
+
+    with timed_region("Dashboard sections (parallel load)"):
+        states = {name: copy_session_state(keys) for name, keys in SECTION_STATE_KEYS.items()}
+        sections = {
+            "incidents": (load_incident_section, (states["incidents"], top_n, trend_granularity)),
+            "datasets": (load_dataset_section, (states["datasets"], top_n)),
+            "tickets": (load_ticket_section, (states["tickets"], top_n, trend_granularity)),
+        }
+        for name, section, seconds, error in load_sections(sections):
+            record_region_time(f"{SECTION_TITLES[name]} (load)", seconds * 1000)
+            placeholders[name].empty()
+            with containers[name]:
+                if isinstance(error, SectionTimeoutError):
+                    st.warning(f"⏱️ This section is taking too long to load ({error}). Try refreshing the page.")
+                elif error is not None:
+                    st.error(f"❌ Error loading this section: {error}")
+                else:
+                    store_session_state(section["state"], SECTION_STATE_KEYS[name])
+                    SECTION_RENDERERS[name](section)
+
+render_timings_panel()
 
 # Logout button
 st.divider()
 if st.button("Log out", width="stretch"):
-    st.session_state.logged_in = False
-    st.session_state.username = ""
+    revoke_session_token(st.session_state.pop("session_token", None))
     st.info("You have been logged out.")
     st.switch_page("Login.py")
\ No newline at end of file
@@ -2,147 +2,163 @@ import streamlit as st
 import pandas as pd
 import datetime
 from app.data.analytic import (
-    get_incidents_by_category_count,
-    get_high_severity_by_status,
-    get_categories_with_many_cases
+    get_incidents_by_category_rollup,
+    get_high_severity_by_status_rollup,
+    get_categories_with_many_cases_rollup,
+    get_incident_kpis
 )
-from app.data.db import connect_database
+from app.data.db import get_connection
+from config import SEARCH_RESULT_LIMIT
+from app.data.incidents import insert_incident, get_incidents_page, search_incidents, INCIDENT_COLUMNS
+from app.services.export_service import render_export_button
+from app.services.live_view import get_live_kpis
+from app.services.record_pager import get_loaded_records, render_load_more
+from app.services.render_timer import timed_fragment, timed_region, render_timings_panel
+from app.services.user_service import resolve_session_token, revoke_session_token
 
 st.set_page_config(page_title="Incidents", page_icon="🚨", layout="wide")
 
-# Ensure session state keys exist
-if "logged_in" not in st.session_state:
-    st.session_state.logged_in = False
-if "username" not in st.session_state:
-    st.session_state.username = ""
-
-# Guard: if not logged in, redirect
-if not st.session_state.logged_in:
+# Guard: resolve the session token (signature check + in-memory cache, no database query)
+principal = resolve_session_token(st.session_state.get("session_token"))
+if principal is None:
     st.error("You must be logged in to view incidents.")
     if st.button("Go to login page", width="stretch"):
         st.switch_page("Login.py")
     st.stop()
 
-# Connect to DB
-conn = connect_database()
-
-# Page title
-st.title("🚨 Incident Analytics")
-st.success(f"Hello, **{st.session_state.username}**! Here’s your incident breakdown.")
-
-# Sidebar filters
-with st.sidebar:
-    st.header("Filters")
-    min_cases = st.slider("Minimum cases per category", 1, 20, 5)
-
-# --- Add Incident Form ---
-with st.expander("➕ Add Incident"):
-    st.markdown("Fill out the form to report a new cybersecurity incident.")
-
-    incident_date = st.date_input("Date of Incident", value=datetime.date.today())
-    severity = st.selectbox("Severity", ["Low", "Medium", "High", "Critical"])
-    category = st.selectbox("Category", ["Phishing", "Malware", "Data Breach", "Unauthorized Access", "Other"])
-    status = st.selectbox("Status", ["Open", "In Progress", "Resolved", "Closed"])
-    description = st.text_area("Description")
-    reported_by = st.session_state.username or "admin"
-
-    if st.button("Submit Incident", type="primary", width="stretch"):
-        if description.strip() == "":
-            st.warning("Please enter a description before submitting.")
+# Each region below is a fragment with its own pooled connection: a widget
+# inside one (search box, slider, form field) reruns only that region.
+
+@timed_fragment("Add incident form")
+def add_incident_form():
+    with st.expander("➕ Add Incident"):
+        st.markdown("Fill out the form to report a new cybersecurity incident.")
+
+        incident_date = st.date_input("Date of Incident", value=datetime.date.today())
+        severity = st.selectbox("Severity", ["Low", "Medium", "High", "Critical"])
+        category = st.selectbox("Category", ["Phishing", "Malware", "Data Breach", "Unauthorized Access", "Other"])
+        status = st.selectbox("Status", ["Open", "In Progress", "Resolved", "Closed"])
+        description = st.text_area("Description")
+        reported_by = principal.username
+
+        if st.button("Submit Incident", type="primary", width="stretch"):
+            if description.strip() == "":
+                st.warning("Please enter a description before submitting.")
+            else:
+                with get_connection() as conn:
+                    insert_incident(
+                        conn, None, incident_date.strftime("%Y-%m-%d"), severity, category, status, description
+                    )
+                st.success("Incident submitted successfully!")
+                st.toast("New incident added.")
+                # A new incident changes every region, so rerun the whole page.
+                st.rerun()
+
+@timed_fragment("Summary metrics")
+def summary_metrics():
+    with get_connection() as conn:
+        kpis = get_live_kpis(conn, "incidents", "cyber_incidents", get_incident_kpis)
+
+    st.markdown("### 📊 Summary")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("🗂️ Total Incidents", kpis["total_incidents"])
+    col2.metric("🔥 High/Critical", kpis["high_critical"])
+    col3.metric("🚩 Open Incidents", kpis["open_incidents"])
+
+@timed_fragment("Incident records")
+def incident_records():
+    # Only the pages loaded so far are held in the session; "Load more" fetches the next one.
+    st.markdown("### 📑 Incident Records")
+    with get_connection() as conn:
+        incident_df, has_more = get_loaded_records(conn, "incidents", get_incidents_page)
+        if not incident_df.empty:
+            incident_labels = {
+                "incident_id": "ID",
+                "timestamp": "Date",
+                "severity": "Severity",
+                "category": "Category",
+                "status": "Status",
+                "description": "Description"
+            }
+            incident_df = incident_df.rename(columns=incident_labels)
+
+            # Search box (full-text index over every incident, not just the loaded pages)
+            search_term = st.text_input("🔍 Search incidents", "")
+            if search_term:
+                filtered_df = search_incidents(conn, search_term, limit=SEARCH_RESULT_LIMIT).rename(columns=incident_labels)
+                st.caption(f"{len(filtered_df)} best matches (up to {SEARCH_RESULT_LIMIT}).")
+            else:
+                filtered_df = incident_df
+                st.caption(f"Showing the {len(incident_df)} most recent incidents loaded.")
+
+            # Display table
+            st.dataframe(filtered_df, width="stretch")
+            if not search_term:
+                render_load_more(conn, "incidents", get_incidents_page, has_more)
+
+            # Export (built from SQLite in chunks only when the button is clicked)
+            render_export_button(
+                "incidents", "cyber_incidents", INCIDENT_COLUMNS,
+                term=search_term, labels=incident_labels, noun="incidents"
+            )
         else:
-            insert_query = """
-                INSERT INTO cyber_incidents (timestamp, severity, category, status, description)
-                VALUES (?, ?, ?, ?, ?)
-            """
-            conn.execute(insert_query, (incident_date.strftime("%Y-%m-%d"), severity, category, status, description))
-            conn.commit()
-            st.success("Incident submitted successfully!")
-            st.toast("New incident added.")
-            st.rerun()
-
-# --- Summary Metrics ---
-incident_query = """
-    SELECT incident_id, timestamp, severity, category, status, description
-    FROM cyber_incidents
-"""
-incident_df = pd.read_sql_query(incident_query, conn)
-
-total_incidents = len(incident_df)
-high_critical = incident_df[incident_df["severity"].isin(["High", "Critical"])].shape[0]
-open_incidents = incident_df[incident_df["status"] == "Open"].shape[0]
-
-st.markdown("### 📊 Summary")
-col1, col2, col3 = st.columns(3)
-col1.metric("🗂️ Total Incidents", total_incidents)
-col2.metric("🔥 High/Critical", high_critical)
-col3.metric("🚩 Open Incidents", open_incidents)
-
-# --- Incident Records Table (with search + export) ---
-st.markdown("### 📑 Incident Records")
-if not incident_df.empty:
-    incident_df = incident_df.rename(columns={
-        "incident_id": "ID",
-        "timestamp": "Date",
-        "severity": "Severity",
-        "category": "Category",
-        "status": "Status",
-        "description": "Description"
-    })
-
-    # Search box
-    search_term = st.text_input("🔍 Search incidents", "")
-    filtered_df = incident_df[
-        incident_df.apply(lambda row: row.astype(str).str.contains(search_term, case=False).any(), axis=1)
-    ] if search_term else incident_df
-
-    # Display table
-    st.dataframe(filtered_df, width="stretch")
-
-    # Export to CSV
-    st.download_button(
-        label="📥 Export filtered incidents to CSV",
-        data=filtered_df.to_csv(index=False).encode("utf-8"),
-        file_name="filtered_incidents.csv",
-        mime="text/csv",
-        width="stretch"
-    )
-else:
-    st.info("No incident records available.")
-
-# --- Incidents by Category ---
-st.subheader("📊 Incidents by Category")
-incidents_df = get_incidents_by_category_count(conn)
-if not incidents_df.empty:
-    st.bar_chart(incidents_df.set_index("category"))
-    with st.expander("See raw incident data"):
-        st.dataframe(incidents_df, width="stretch")
-else:
-    st.info("No incident data available.")
-
-# --- High Severity by Status ---
-st.subheader("🔥 High Severity Incidents by Status")
-high_sev_df = get_high_severity_by_status(conn)
-if not high_sev_df.empty:
-    st.bar_chart(high_sev_df.set_index("status"))
-    with st.expander("See raw high severity data"):
-        st.dataframe(high_sev_df, width="stretch")
-else:
-    st.info("No high severity data available.")
-
-# --- Categories with Many Cases ---
-st.subheader(f"📈 Categories with More Than {min_cases} Cases")
-many_cases_df = get_categories_with_many_cases(conn, min_cases)
-if not many_cases_df.empty:
-    st.bar_chart(many_cases_df.set_index("category"))
-    with st.expander("See raw filtered categories"):
-        st.dataframe(many_cases_df, width="stretch")
-else:
-    st.info("No categories meet the threshold.")
+            st.info("No incident records available.")
+
+@timed_fragment("Incidents by category")
+def incidents_by_category():
+    st.subheader("📊 Incidents by Category")
+    with get_connection() as conn:
+        incidents_df = get_incidents_by_category_rollup(conn)
+    if not incidents_df.empty:
+        st.bar_chart(incidents_df.set_index("category"))
+        with st.expander("See raw incident data"):
+            st.dataframe(incidents_df, width="stretch")
+    else:
+        st.info("No incident data available.")
+
+@timed_fragment("High severity by status")
+def high_severity_by_status():
+    st.subheader("🔥 High Severity Incidents by Status")
+    with get_connection() as conn:
+        high_sev_df = get_high_severity_by_status_rollup(conn)
+    if not high_sev_df.empty:
+        st.bar_chart(high_sev_df.set_index("status"))
+        with st.expander("See raw high severity data"):
+            st.dataframe(high_sev_df, width="stretch")
+    else:
+        st.info("No high severity data available.")
+
+@timed_fragment("Categories with many cases")
+def categories_with_many_cases():
+    # The threshold slider lives in this region, so moving it redraws only this chart.
+    min_cases = st.slider("Minimum cases per category", 1, 20, 5)
+    st.subheader(f"📈 Categories with More Than {min_cases} Cases")
+    with get_connection() as conn:
+        many_cases_df = get_categories_with_many_cases_rollup(conn, min_cases)
+    if not many_cases_df.empty:
+        st.bar_chart(many_cases_df.set_index("category"))
+        with st.expander("See raw filtered categories"):
+            st.dataframe(many_cases_df, width="stretch")
+    else:
+        st.info("No categories meet the threshold.")
+
+with timed_region("Incidents page (full run)"):
+    # Page title
+    st.title("🚨 Incident Analytics")
+    st.success(f"Hello, **{principal.username}**! Here’s your incident breakdown.")
+
+    add_incident_form()
+    summary_metrics()
+    incident_records()
+    incidents_by_category()
+    high_severity_by_status()
+    categories_with_many_cases()
+
+render_timings_panel()
 
 # Logout button
 st.divider()
 if st.button("Log out", width="stretch"):
-    st.session_state.logged_in = False
-    st.session_state.username = ""
+    revoke_session_token(st.session_state.pop("session_token", None))
     st.info("You have been logged out.")
     st.switch_page("Login.py")
\ No newline at end of file
@@ -2,136 +2,153 @@ import streamlit as st
 import pandas as pd
 import datetime
 from app.data.analytic import (
-    get_datasets_by_uploader,
-    get_dataset_sizes
+    get_datasets_by_uploader_rollup,
+    get_dataset_sizes,
+    get_dataset_kpis
 )
-from app.data.db import connect_database
+from app.data.approx import approx_distinct
+from app.data.db import get_connection
+from config import APPROX_DISTINCT_ERROR, SEARCH_RESULT_LIMIT
+from app.data.datasets import insert_dataset, get_datasets_page, search_datasets, DATASET_COLUMNS
+from app.services.export_service import render_export_button
+from app.services.live_view import get_live_kpis
+from app.services.record_pager import get_loaded_records, render_load_more
+from app.services.render_timer import timed_fragment, timed_region, render_timings_panel
+from app.services.user_service import resolve_session_token, revoke_session_token
 
 st.set_page_config(page_title="Datasets", page_icon="📂", layout="wide")
 
-# Ensure session state keys exist
-if "logged_in" not in st.session_state:
-    st.session_state.logged_in = False
-if "username" not in st.session_state:
-    st.session_state.username = ""
-
-# Guard: if not logged in, redirect
-if not st.session_state.logged_in:
+# Guard: resolve the session token (signature check + in-memory cache, no database query)
+principal = resolve_session_token(st.session_state.get("session_token"))
+if principal is None:
     st.error("You must be logged in to view datasets.")
     if st.button("Go to login page", width="stretch"):
         st.switch_page("Login.py")
     st.stop()
 
-# Connect to DB
-conn = connect_database()
-
-# Page title
-st.title("📂 Dataset Analytics")
-st.success(f"Hello, **{st.session_state.username}**! Here’s your dataset breakdown.")
-
-# --- Add Dataset Form ---
-with st.expander("➕ Add Dataset"):
-    st.markdown("Fill out the form to add a new dataset.")
-
-    dataset_name = st.text_input("Dataset Name")
-    rows = st.number_input("Number of Rows", min_value=0, step=1)
-    columns = st.number_input("Number of Columns", min_value=0, step=1)
-    uploaded_by = st.session_state.username or "admin"
-    upload_date = st.date_input("Upload Date", value=datetime.date.today())
-
-    if st.button("Submit Dataset", type="primary", width="stretch"):
-        if dataset_name.strip() == "":
-            st.warning("Please enter a dataset name before submitting.")
+# Each region below is a fragment with its own pooled connection: a widget
+# inside one (search box, form field) reruns only that region.
+
+@timed_fragment("Add dataset form")
+def add_dataset_form():
+    with st.expander("➕ Add Dataset"):
+        st.markdown("Fill out the form to add a new dataset.")
+
+        dataset_name = st.text_input("Dataset Name")
+        rows = st.number_input("Number of Rows", min_value=0, step=1)
+        columns = st.number_input("Number of Columns", min_value=0, step=1)
+        uploaded_by = principal.username
+        upload_date = st.date_input("Upload Date", value=datetime.date.today())
+
+        if st.button("Submit Dataset", type="primary", width="stretch"):
+            if dataset_name.strip() == "":
+                st.warning("Please enter a dataset name before submitting.")
+            else:
+                with get_connection() as conn:
+                    insert_dataset(
+                        conn, None, dataset_name, rows, columns, uploaded_by, upload_date.strftime("%Y-%m-%d")
+                    )
+                st.success("Dataset submitted successfully!")
+                st.toast("New dataset added.")
+                # A new dataset changes every region, so rerun the whole page.
+                st.rerun()
+
+@timed_fragment("Summary metrics")
+def summary_metrics():
+    with get_connection() as conn:
+        kpis = get_live_kpis(conn, "datasets", "datasets_metadata", get_dataset_kpis)
+        unique_uploaders = approx_distinct(conn, "datasets_metadata", "uploaded_by")
+
+    st.markdown("### 📊 Summary")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("🗂️ Total Datasets", kpis["total_datasets"])
+    col2.metric("📈 Largest Dataset (rows)", kpis["largest_dataset"])
+    col3.metric("👤 Unique Uploaders", unique_uploaders,
+                help=f"HyperLogLog estimate, within about ±{APPROX_DISTINCT_ERROR:.0%}")
+
+@timed_fragment("Dataset records")
+def dataset_records():
+    # Only the pages loaded so far are held in the session; "Load more" fetches the next one.
+    st.markdown("### 📑 Dataset Records")
+    with get_connection() as conn:
+        dataset_df, has_more = get_loaded_records(conn, "datasets", get_datasets_page)
+        if not dataset_df.empty:
+            dataset_labels = {
+                "dataset_id": "ID",
+                "name": "Name",
+                "rows": "Rows",
+                "columns": "Columns",
+                "uploaded_by": "Uploaded By",
+                "upload_date": "Upload Date"
+            }
+            dataset_df = dataset_df.rename(columns=dataset_labels)
+
+            # Search box (full-text index over every dataset, not just the loaded pages)
+            search_term = st.text_input("🔍 Search datasets", "")
+            if search_term:
+                filtered_df = search_datasets(conn, search_term, limit=SEARCH_RESULT_LIMIT).rename(columns=dataset_labels)
+                st.caption(f"{len(filtered_df)} best matches (up to {SEARCH_RESULT_LIMIT}).")
+            else:
+                filtered_df = dataset_df
+                st.caption(f"Showing the {len(dataset_df)} most recent datasets loaded.")
+
+            # Display table
+            st.dataframe(filtered_df, width="stretch")
+            if not search_term:
+                render_load_more(conn, "datasets", get_datasets_page, has_more)
+
+            # Export (built from SQLite in chunks only when the button is clicked)
+            render_export_button(
+                "datasets", "datasets_metadata", DATASET_COLUMNS,
+                term=search_term, labels=dataset_labels, noun="datasets"
+            )
         else:
-            insert_query = """
-                INSERT INTO datasets_metadata (name, rows, columns, uploaded_by, upload_date)
-                VALUES (?, ?, ?, ?, ?)
-            """
-            conn.execute(insert_query, (dataset_name, rows, columns, uploaded_by, upload_date.strftime("%Y-%m-%d")))
-            conn.commit()
-            st.success("Dataset submitted successfully!")
-            st.toast("New dataset added.")
-            st.rerun()
-
-# --- Summary Metrics ---
-dataset_query = """
-    SELECT dataset_id, name, rows, columns, uploaded_by, upload_date
-    FROM datasets_metadata
-"""
-dataset_df = pd.read_sql_query(dataset_query, conn)
-
-total_datasets = len(dataset_df)
-largest_dataset = dataset_df["rows"].max() if not dataset_df.empty else 0
-unique_uploaders = dataset_df["uploaded_by"].nunique() if not dataset_df.empty else 0
-
-st.markdown("### 📊 Summary")
-col1, col2, col3 = st.columns(3)
-col1.metric("🗂️ Total Datasets", total_datasets)
-col2.metric("📈 Largest Dataset (rows)", largest_dataset)
-col3.metric("👤 Unique Uploaders", unique_uploaders)
-
-# --- Dataset Records Table (with search + export) ---
-st.markdown("### 📑 Dataset Records")
-if not dataset_df.empty:
-    dataset_df = dataset_df.rename(columns={
-        "dataset_id": "ID",
-        "name": "Name",
-        "rows": "Rows",
-        "columns": "Columns",
-        "uploaded_by": "Uploaded By",
-        "upload_date": "Upload Date"
-    })
-
-    # Search box
-    search_term = st.text_input("🔍 Search datasets", "")
-    filtered_df = dataset_df[
-        dataset_df.apply(lambda row: row.astype(str).str.contains(search_term, case=False).any(), axis=1)
-    ] if search_term else dataset_df
-
-    # Display table
-    st.dataframe(filtered_df, width="stretch")
-
-    # Export to CSV
-    st.download_button(
-        label="📥 Export filtered datasets to CSV",
-        data=filtered_df.to_csv(index=False).encode("utf-8"),
-        file_name="filtered_datasets.csv",
-        mime="text/csv",
-        width="stretch"
-    )
-else:
-    st.info("No dataset records available.")
-
-# --- Datasets by Uploader ---
-st.subheader("📊 Datasets by Uploader")
-datasets_df = get_datasets_by_uploader(conn)
-if not datasets_df.empty:
-    st.bar_chart(datasets_df.set_index("uploaded_by"))
-    with st.expander("See raw dataset data"):
-        st.dataframe(datasets_df, width="stretch")
-else:
-    st.info("No dataset data available.")
-
-# --- Dataset Sizes ---
-st.subheader("📏 Dataset Sizes (Rows & Columns)")
-sizes_df = get_dataset_sizes(conn)
-if not sizes_df.empty:
-    st.dataframe(sizes_df, width="stretch")
-
-    st.download_button(
-        label="📥 Export dataset sizes to CSV",
-        data=sizes_df.to_csv(index=False).encode("utf-8"),
-        file_name="dataset_sizes.csv",
-        mime="text/csv",
-        width="stretch"
-    )
-else:
-    st.info("No dataset size information available.")
+            st.info("No dataset records available.")
+
+@timed_fragment("Datasets by uploader")
+def datasets_by_uploader():
+    st.subheader("📊 Datasets by Uploader")
+    with get_connection() as conn:
+        datasets_df = get_datasets_by_uploader_rollup(conn)
+    if not datasets_df.empty:
+        st.bar_chart(datasets_df.set_index("uploaded_by"))
+        with st.expander("See raw dataset data"):
+            st.dataframe(datasets_df, width="stretch")
+    else:
+        st.info("No dataset data available.")
+
+@timed_fragment("Dataset sizes")
+def dataset_sizes():
+    st.subheader("📏 Dataset Sizes (Rows & Columns)")
+    with get_connection() as conn:
+        sizes_df = get_dataset_sizes(conn)
+    if not sizes_df.empty:
+        st.dataframe(sizes_df, width="stretch")
+
+        # Export (built from SQLite in chunks only when the button is clicked)
+        render_export_button(
+            "dataset_sizes", "datasets_metadata", list(sizes_df.columns),
+            noun="dataset sizes", order_by="rows DESC"
+        )
+    else:
+        st.info("No dataset size information available.")
+
+with timed_region("Datasets page (full run)"):
+    # Page title
+    st.title("📂 Dataset Analytics")
+    st.success(f"Hello, **{principal.username}**! Here’s your dataset breakdown.")
+
+    add_dataset_form()
+    summary_metrics()
+    dataset_records()
+    datasets_by_uploader()
+    dataset_sizes()
+
+render_timings_panel()
 
 # Logout button
 st.divider()
 if st.button("Log out", width="stretch"):
-    st.session_state.logged_in = False
-    st.session_state.username = ""
+    revoke_session_token(st.session_state.pop("session_token", None))
     st.info("You have been logged out.")
     st.switch_page("Login.py")
\ No newline at end of file
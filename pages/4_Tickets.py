@@ -2,149 +2,189 @@ import streamlit as st
 import pandas as pd
 import datetime
 from app.data.analytic import (
-    get_tickets_by_status,
-    get_tickets_by_assignee,
-    get_avg_resolution_time
+    get_tickets_by_status_rollup,
+    get_tickets_by_assignee_rollup,
+    get_avg_resolution_time_rollup,
+    get_ticket_kpis
 )
-from app.data.db import connect_database
+from app.data.db import get_connection
+from app.data.sketches import get_resolution_percentiles, get_resolution_percentiles_by
+from config import SEARCH_RESULT_LIMIT
+from app.data.tickets import insert_ticket, get_tickets_page, search_tickets, TICKET_COLUMNS
+from app.services.export_service import render_export_button
+from app.services.live_view import get_live_kpis
+from app.services.record_pager import get_loaded_records, render_load_more
+from app.services.render_timer import timed_fragment, timed_region, render_timings_panel
+from app.services.user_service import resolve_session_token, revoke_session_token
 
 st.set_page_config(page_title="Tickets", page_icon="🎟️", layout="wide")
 
-# Ensure session state keys exist
-if "logged_in" not in st.session_state:
-    st.session_state.logged_in = False
-if "username" not in st.session_state:
-    st.session_state.username = ""
-
-# Guard: if not logged in, redirect
-if not st.session_state.logged_in:
+# Guard: resolve the session token (signature check + in-memory cache, no database query)
+principal = resolve_session_token(st.session_state.get("session_token"))
+if principal is None:
     st.error("You must be logged in to view tickets.")
     if st.button("Go to login page", width="stretch"):
         st.switch_page("Login.py")
     st.stop()
 
-# Connect to DB
-conn = connect_database()
-
-# Page title
-st.title("🎟️ Ticket Analytics")
-st.success(f"Hello, **{st.session_state.username}**! Here’s your ticket breakdown.")
+# Each region below is a fragment with its own pooled connection: a widget
+# inside one (search box, breakdown selector, form field) reruns only that region.
+
+@timed_fragment("Add ticket form")
+def add_ticket_form():
+    with st.expander("➕ Add Ticket"):
+        st.markdown("Fill out the form to create a new IT ticket.")
+
+        priority = st.selectbox("Priority", ["Low", "Medium", "High", "Critical"])
+        description = st.text_area("Description")
+        status = st.selectbox("Status", ["Open", "In Progress", "Resolved", "Closed"])
+        assigned_to = st.text_input("Assigned To")
+        created_at = st.date_input("Created At", value=datetime.date.today())
+        resolution_time_hours = st.number_input("Resolution Time (hours)", min_value=0.0, step=0.5)
+
+        if st.button("Submit Ticket", type="primary", width="stretch"):
+            if description.strip() == "":
+                st.warning("Please enter a description before submitting.")
+            else:
+                with get_connection() as conn:
+                    insert_ticket(
+                        conn,
+                        None,
+                        priority,
+                        description,
+                        status,
+                        assigned_to,
+                        created_at.strftime("%Y-%m-%d"),
+                        resolution_time_hours
+                    )
+                st.success("Ticket submitted successfully!")
+                st.toast("New ticket added.")
+                # A new ticket changes every region, so rerun the whole page.
+                st.rerun()
+
+@timed_fragment("Summary metrics")
+def summary_metrics():
+    with get_connection() as conn:
+        kpis = get_live_kpis(conn, "tickets", "it_tickets", get_ticket_kpis)
+
+    st.markdown("### 📊 Summary")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("🎫 Total Tickets", kpis["total_tickets"])
+    col2.metric("📬 Open Tickets", kpis["open_tickets"])
+    avg_resolution = kpis["avg_resolution"]
+    col3.metric("⏱️ Avg Resolution (hrs)", round(avg_resolution, 2) if avg_resolution is not None else "—")
+
+@timed_fragment("Ticket records")
+def ticket_records():
+    # Only the pages loaded so far are held in the session; "Load more" fetches the next one.
+    st.markdown("### 📑 Ticket Records")
+    with get_connection() as conn:
+        ticket_df, has_more = get_loaded_records(conn, "tickets", get_tickets_page)
+        if not ticket_df.empty:
+            ticket_labels = {
+                "ticket_id": "ID",
+                "priority": "Priority",
+                "description": "Description",
+                "status": "Status",
+                "assigned_to": "Assigned To",
+                "created_at": "Created At",
+                "resolution_time_hours": "Resolution Time (hrs)"
+            }
+            ticket_df = ticket_df.rename(columns=ticket_labels)
+
+            # Search box (full-text index over every ticket, not just the loaded pages)
+            search_term = st.text_input("🔍 Search tickets", "")
+            if search_term:
+                filtered_df = search_tickets(conn, search_term, limit=SEARCH_RESULT_LIMIT).rename(columns=ticket_labels)
+                st.caption(f"{len(filtered_df)} best matches (up to {SEARCH_RESULT_LIMIT}).")
+            else:
+                filtered_df = ticket_df
+                st.caption(f"Showing the {len(ticket_df)} most recent tickets loaded.")
+
+            # Display table
+            st.dataframe(filtered_df, width="stretch")
+            if not search_term:
+                render_load_more(conn, "tickets", get_tickets_page, has_more)
+
+            # Export (built from SQLite in chunks only when the button is clicked)
+            render_export_button(
+                "tickets", "it_tickets", TICKET_COLUMNS,
+                term=search_term, labels=ticket_labels, noun="tickets"
+            )
+        else:
+            st.info("No ticket records available.")
+
+@timed_fragment("Tickets by status")
+def tickets_by_status():
+    st.subheader("📊 Tickets by Status")
+    with get_connection() as conn:
+        tickets_df = get_tickets_by_status_rollup(conn)
+    if not tickets_df.empty:
+        st.bar_chart(tickets_df.set_index("status"))
+        with st.expander("See raw ticket data"):
+            st.dataframe(tickets_df, width="stretch")
+    else:
+        st.info("No ticket data available.")
+
+@timed_fragment("Tickets by assignee")
+def tickets_by_assignee():
+    st.subheader("👤 Tickets by Assignee")
+    with get_connection() as conn:
+        assignee_df = get_tickets_by_assignee_rollup(conn)
+    if not assignee_df.empty:
+        st.bar_chart(assignee_df.set_index("assigned_to"))
+        with st.expander("See raw assignee data"):
+            st.dataframe(assignee_df, width="stretch")
+    else:
+        st.info("No assignee data available.")
+
+@timed_fragment("Average resolution time")
+def average_resolution_time():
+    st.subheader("⏱️ Average Resolution Time")
+    with get_connection() as conn:
+        avg_res_df = get_avg_resolution_time_rollup(conn)
+    if not avg_res_df.empty:
+        avg_hours = avg_res_df["avg_resolution"].iloc[0]
+        st.metric("Avg Resolution Time (hours)", f"{avg_hours:.2f}")
+    else:
+        st.info("No resolution time data available.")
+
+@timed_fragment("Resolution time percentiles")
+def resolution_percentiles():
+    # From the streaming sketch, ±1%
+    st.subheader("📐 Resolution Time Percentiles")
+    with get_connection() as conn:
+        percentiles = get_resolution_percentiles(conn)
+        if percentiles["count"]:
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Median (p50, hrs)", f"{percentiles['p50']:.1f}")
+            col2.metric("p90 (hrs)", f"{percentiles['p90']:.1f}")
+            col3.metric("p99 (hrs)", f"{percentiles['p99']:.1f}")
+
+            breakdown = st.selectbox("Break down by", ["assigned_to", "priority", "status"],
+                                     format_func=lambda d: d.replace("_", " ").title())
+            st.dataframe(get_resolution_percentiles_by(conn, breakdown).round(1), width="stretch")
+        else:
+            st.info("No resolution time data available.")
 
-# --- Add Ticket Form ---
-with st.expander("➕ Add Ticket"):
-    st.markdown("Fill out the form to create a new IT ticket.")
+with timed_region("Tickets page (full run)"):
+    # Page title
+    st.title("🎟️ Ticket Analytics")
+    st.success(f"Hello, **{principal.username}**! Here’s your ticket breakdown.")
 
-    priority = st.selectbox("Priority", ["Low", "Medium", "High", "Critical"])
-    description = st.text_area("Description")
-    status = st.selectbox("Status", ["Open", "In Progress", "Resolved", "Closed"])
-    assigned_to = st.text_input("Assigned To")
-    created_at = st.date_input("Created At", value=datetime.date.today())
-    resolution_time_hours = st.number_input("Resolution Time (hours)", min_value=0.0, step=0.5)
+    add_ticket_form()
+    summary_metrics()
+    ticket_records()
+    tickets_by_status()
+    tickets_by_assignee()
+    average_resolution_time()
+    resolution_percentiles()
 
-    if st.button("Submit Ticket", type="primary", width="stretch"):
-        if description.strip() == "":
-            st.warning("Please enter a description before submitting.")
-        else:
-            insert_query = """
-                INSERT INTO it_tickets (priority, description, status, assigned_to, created_at, resolution_time_hours)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """
-            conn.execute(insert_query, (
-                priority,
-                description,
-                status,
-                assigned_to,
-                created_at.strftime("%Y-%m-%d"),
-                resolution_time_hours
-            ))
-            conn.commit()
-            st.success("Ticket submitted successfully!")
-            st.toast("New ticket added.")
-            st.rerun()
-
-# --- Summary Metrics ---
-ticket_query = """
-    SELECT ticket_id, priority, description, status, assigned_to, created_at, resolution_time_hours
-    FROM it_tickets
-"""
-ticket_df = pd.read_sql_query(ticket_query, conn)
-
-total_tickets = len(ticket_df)
-open_tickets = ticket_df[ticket_df["status"] == "Open"].shape[0]
-avg_resolution = ticket_df["resolution_time_hours"].mean() if not ticket_df.empty else 0
-
-st.markdown("### 📊 Summary")
-col1, col2, col3 = st.columns(3)
-col1.metric("🎫 Total Tickets", total_tickets)
-col2.metric("📬 Open Tickets", open_tickets)
-col3.metric("⏱️ Avg Resolution (hrs)", round(avg_resolution, 2))
-
-# --- Ticket Records Table (with search + export) ---
-st.markdown("### 📑 Ticket Records")
-if not ticket_df.empty:
-    ticket_df = ticket_df.rename(columns={
-        "ticket_id": "ID",
-        "priority": "Priority",
-        "description": "Description",
-        "status": "Status",
-        "assigned_to": "Assigned To",
-        "created_at": "Created At",
-        "resolution_time_hours": "Resolution Time (hrs)"
-    })
-
-    # Search box
-    search_term = st.text_input("🔍 Search tickets", "")
-    filtered_df = ticket_df[
-        ticket_df.apply(lambda row: row.astype(str).str.contains(search_term, case=False).any(), axis=1)
-    ] if search_term else ticket_df
-
-    # Display table
-    st.dataframe(filtered_df, width="stretch")
-
-    # Export to CSV
-    st.download_button(
-        label="📥 Export filtered tickets to CSV",
-        data=filtered_df.to_csv(index=False).encode("utf-8"),
-        file_name="filtered_tickets.csv",
-        mime="text/csv",
-        width="stretch"
-    )
-else:
-    st.info("No ticket records available.")
-
-# --- Tickets by Status ---
-st.subheader("📊 Tickets by Status")
-tickets_df = get_tickets_by_status(conn)
-if not tickets_df.empty:
-    st.bar_chart(tickets_df.set_index("status"))
-    with st.expander("See raw ticket data"):
-        st.dataframe(tickets_df, width="stretch")
-else:
-    st.info("No ticket data available.")
-
-# --- Tickets by Assignee ---
-st.subheader("👤 Tickets by Assignee")
-assignee_df = get_tickets_by_assignee(conn)
-if not assignee_df.empty:
-    st.bar_chart(assignee_df.set_index("assigned_to"))
-    with st.expander("See raw assignee data"):
-        st.dataframe(assignee_df, width="stretch")
-else:
-    st.info("No assignee data available.")
-
-# --- Average Resolution Time ---
-st.subheader("⏱️ Average Resolution Time")
-avg_res_df = get_avg_resolution_time(conn)
-if not avg_res_df.empty:
-    avg_hours = avg_res_df["avg_resolution"].iloc[0]
-    st.metric("Avg Resolution Time (hours)", f"{avg_hours:.2f}")
-else:
-    st.info("No resolution time data available.")
+render_timings_panel()
 
 # Logout button
 st.divider()
 if st.button("Log out", width="stretch"):
-    st.session_state.logged_in = False
-    st.session_state.username = ""
+    revoke_session_token(st.session_state.pop("session_token", None))
     st.info("You have been logged out.")
     st.switch_page("Login.py")
\ No newline at end of file
@@ -1,19 +1,19 @@
 # pages/5_AI_Assistant.py
 import streamlit as st
 from app.services.gemini_service import get_response, stream_response
-from app.data.users import get_user_by_username
+from app.services.user_service import resolve_session_token
 
 # ---------- AUTH GUARD ----------
-if "logged_in" not in st.session_state or not st.session_state.logged_in:
+# Identity and role come from the session token's cached principal, not the users table
+principal = resolve_session_token(st.session_state.get("session_token"))
+if principal is None:
     st.error("You must log in first to access the AI Assistant.")
     st.stop()
 
-# Get user role from DB
-user_record = get_user_by_username(st.session_state.username)
-user_role = user_record[3] if user_record else "user"  # role column
+user_role = principal.role
 
 st.set_page_config(page_title="Gemini AI Assistant", page_icon="🤖", layout="wide")
-st.title(f"Gemini AI Assistant — Welcome {st.session_state.username}")
+st.title(f"Gemini AI Assistant — Welcome {principal.username}")
 st.caption("Powered by Gemini API")
 
 # ---------- Domain prompts ----------
@@ -25,10 +25,10 @@ domain_prompts = {
 }
 
 intro_messages = {
-    "General": f"👋 Hi {st.session_state.username}, I’m your assistant for general tasks ({user_role}).",
-    "Cybersecurity": f"🔐 Hi {st.session_state.username}, I’m your assistant for cybersecurity incidents and analysis ({user_role}).",
-    "Datasets": f"📊 Hi {st.session_state.username}, I’m your assistant for dataset exploration and insights ({user_role}).",
-    "Tickets": f"🎫 Hi {st.session_state.username}, I’m your assistant for ticket management and troubleshooting ({user_role})."
+    "General": f"👋 Hi {principal.username}, I’m your assistant for general tasks ({user_role}).",
+    "Cybersecurity": f"🔐 Hi {principal.username}, I’m your assistant for cybersecurity incidents and analysis ({user_role}).",
+    "Datasets": f"📊 Hi {principal.username}, I’m your assistant for dataset exploration and insights ({user_role}).",
+    "Tickets": f"🎫 Hi {principal.username}, I’m your assistant for ticket management and troubleshooting ({user_role})."
 }
 
 # ---------- Sidebar controls ----------
@@ -54,7 +54,7 @@ if "messages" not in st.session_state:
 # If domain changed, reset with new intro
 if not st.session_state.messages or st.session_state.get("current_domain") != domain:
     system_prompt = domain_prompts.get(domain, "You are a helpful assistant.")
-    intro_message = intro_messages.get(domain, f"👋 Hi {st.session_state.username}, I’m your assistant.")
+    intro_message = intro_messages.get(domain, f"👋 Hi {principal.username}, I’m your assistant.")
     st.session_state.messages = [
         {"role": "user", "content": system_prompt},
         {"role": "assistant", "content": intro_message}
@@ -0,0 +1,60 @@
+"""
+Keyset pagination tests for app/data/pagination.py.
+
+Paging through a table one cursor at a time must return exactly the rows of
+a single ORDER BY, including rows whose order column is NULL (timestamps
+SQLite can't parse get a NULL epoch).
+
+Run with:
+    python -m pytest -q pagination_test.py
+"""
+import pytest
+from app.data.db import connect_database
+from app.data.incidents import get_incidents_page
+from app.data.pagination import fetch_keyset_page
+from app.data.schema import create_all_tables
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = connect_database(tmp_path / "pagination.db")
+    create_all_tables(conn)
+    conn.executemany(
+        "INSERT INTO cyber_incidents (timestamp, severity, category, status, description) VALUES (?, ?, ?, ?, ?)",
+        [
+            ("not a date" if i % 5 == 0 else f"2024-{i % 12 + 1:02d}-{i % 27 + 1:02d} 10:00:00",
+             "Low", "Phishing", "Open", f"incident {i}")
+            for i in range(1, 120)
+        ],
+    )
+    conn.commit()
+    yield conn
+    conn.close()
+
+def _all_pages(conn, page_size, descending):
+    ids, cursor = [], None
+    while True:
+        df, cursor = fetch_keyset_page(conn, "cyber_incidents", ["incident_id"], "timestamp_epoch",
+                                       "incident_id", page_size=page_size, cursor=cursor,
+                                       descending=descending)
+        ids.extend(df["incident_id"])
+        if cursor is None:
+            return ids
+
+@pytest.mark.parametrize("descending", [True, False], ids=["desc", "asc"])
+@pytest.mark.parametrize("page_size", [1, 7, 50, 500])
+def test_pages_reach_rows_with_null_order_values(conn, page_size, descending):
+    direction = "DESC" if descending else "ASC"
+    expected = [row[0] for row in conn.execute(
+        f"SELECT incident_id FROM cyber_incidents ORDER BY timestamp_epoch {direction}, incident_id {direction}"
+    )]
+    assert conn.execute("SELECT COUNT(*) FROM cyber_incidents WHERE timestamp_epoch IS NULL").fetchone()[0]
+    assert _all_pages(conn, page_size, descending) == expected
+
+def test_cursor_inside_null_rows(conn):
+    # Newest first, the unparseable timestamps come last: page until the cursor is among them.
+    df, cursor = get_incidents_page(conn, page_size=100)
+    assert cursor is not None and cursor[0] is None
+    rest, cursor = get_incidents_page(conn, page_size=100, cursor=cursor)
+    assert cursor is None
+    assert len(df) + len(rest) == 119
+    assert set(rest["timestamp"]) == {"not a date"}
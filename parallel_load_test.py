@@ -0,0 +1,115 @@
+"""
+Parallel CSV pipeline tests for load_csv_directory() in app/services/data_loader.py.
+
+Files are parsed in worker processes and written by one connection. Every
+domain CSV must land in its table with declared column types, other files
+must be skipped, and an incremental (upsert) run must skip unchanged files
+and read only what was appended to the others.
+
+Run with:
+    python -m pytest -q parallel_load_test.py
+"""
+import pandas as pd
+import pytest
+from app.data.changes import get_change_version
+from app.data.schema import IMPORT_KEYS
+from app.services import data_loader
+from app.services.data_loader import _table_for_file, load_csv_directory
+
+TABLES = list(IMPORT_KEYS)
+
+def _incidents(start, stop):
+    return pd.DataFrame({
+        "incident_id": range(100_000 + start, 100_000 + stop),
+        "timestamp": "2024-08-01 12:00:00",
+        "severity": "Low",
+        "category": "DDoS",
+        "status": "Open",
+        "description": "pipelined",
+    })
+
+def _datasets(start, stop):
+    return pd.DataFrame({
+        "dataset_id": range(100_000 + start, 100_000 + stop),
+        "name": [f"pipelined_{i}" for i in range(start, stop)],
+        "rows": 1000,
+        "columns": 12,
+        "uploaded_by": "analyst",
+        "upload_date": "2024-08-01",
+    })
+
+def _count(conn, table, where):
+    return conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}").fetchone()[0]
+
+@pytest.mark.parametrize("name, table", [
+    ("cyber_incidents.csv", "cyber_incidents"),
+    ("cyber_incidents_2024-06.csv", "cyber_incidents"),
+    ("it_tickets-export.csv", "it_tickets"),
+    ("datasets_metadata.part1.csv", "datasets_metadata"),
+    ("import_checkpoints.csv", None),
+    ("cyber.csv", None),
+])
+def test_files_map_to_domain_tables_only(tmp_path, name, table):
+    assert _table_for_file(tmp_path / name, TABLES) == table
+
+def test_directory_load_writes_every_domain_file(db, tmp_path):
+    _incidents(0, 250).to_csv(tmp_path / "cyber_incidents.csv", index=False)
+    _incidents(250, 400).to_csv(tmp_path / "cyber_incidents_2024-06.csv", index=False)
+    _datasets(0, 120).to_csv(tmp_path / "datasets_metadata.csv", index=False)
+    pd.DataFrame({"source": ["x"], "table_name": ["y"]}).to_csv(tmp_path / "import_checkpoints.csv", index=False)
+
+    stats = load_csv_directory(db, tmp_path, workers=2, chunk_size=100)
+
+    assert stats["total"]["rows"] == 520
+    assert not any(s["error"] for name, s in stats.items() if name != "total")
+    assert _count(db, "cyber_incidents", "description = 'pipelined'") == 400
+    assert _count(db, "datasets_metadata", "name LIKE 'pipelined_%'") == 120
+    assert _count(db, "import_checkpoints", "1") == 0
+    # Values are coerced to the declared column types in the parser processes.
+    assert _count(db, "datasets_metadata", "name LIKE 'pipelined_%' AND typeof(rows) = 'integer'") == 120
+
+def test_a_bad_file_does_not_stop_the_others(db, tmp_path):
+    _datasets(0, 50).to_csv(tmp_path / "datasets_metadata.csv", index=False)
+    pd.DataFrame({"incident_id": [1], "owner": ["nobody"]}).to_csv(tmp_path / "cyber_incidents.csv", index=False)
+
+    stats = load_csv_directory(db, tmp_path, workers=2, chunk_size=100)
+
+    assert stats[str(tmp_path / "cyber_incidents.csv")]["error"]
+    assert stats["total"]["rows"] == 50
+
+def test_incremental_run_skips_unchanged_files_and_reads_appended_rows(db, tmp_path):
+    incidents, datasets = tmp_path / "cyber_incidents.csv", tmp_path / "datasets_metadata.csv"
+    _incidents(0, 300).to_csv(incidents, index=False)
+    _datasets(0, 80).to_csv(datasets, index=False)
+    assert load_csv_directory(db, tmp_path, workers=2, chunk_size=100, upsert=True)["total"]["rows"] == 380
+
+    version = get_change_version(db)
+    assert load_csv_directory(db, tmp_path, workers=2, chunk_size=100, upsert=True)["total"]["rows"] == 0
+    assert get_change_version(db) == version
+
+    db.execute("UPDATE cyber_incidents SET status = 'Resolved' WHERE incident_id = 100000")
+    db.commit()
+    _incidents(300, 330).to_csv(incidents, mode="a", header=False, index=False)
+
+    version = get_change_version(db)
+    stats = load_csv_directory(db, tmp_path, workers=2, chunk_size=100, upsert=True)
+
+    assert stats["total"]["rows"] == 30
+    assert str(datasets) not in stats
+    # Only the appended rows were read: the edit to an earlier row is kept.
+    assert _count(db, "cyber_incidents", "incident_id = 100000 AND status = 'Resolved'") == 1
+    assert db.execute(
+        "SELECT table_name, op FROM change_log WHERE version > ? ORDER BY version", (version,)
+    ).fetchall() == [("cyber_incidents", "R")]
+
+def test_writer_failure_stops_blocked_parsers(db, tmp_path, monkeypatch):
+    _incidents(0, 50).to_csv(tmp_path / "cyber_incidents.csv", index=False)
+    _datasets(0, 5000).to_csv(tmp_path / "datasets_metadata.csv", index=False)
+
+    def fail(*args):
+        raise RuntimeError("watermark table is gone")
+
+    # The first finished file fails the run while the other parser waits on a full queue.
+    monkeypatch.setattr(data_loader, "_save_watermark", fail)
+    with pytest.raises(RuntimeError, match="watermark table is gone"):
+        load_csv_directory(db, tmp_path, workers=2, chunk_size=10, queue_size=1, upsert=True)
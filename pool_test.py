@@ -0,0 +1,110 @@
+"""
+Connection pool tests for app/data/db.py.
+
+Nested checkouts on one thread must share a connection, the pool must never
+open more than max_size connections, and a checkout that finds none free
+must give up with PoolTimeoutError after the pool's timeout.
+
+Run with:
+    python -m pytest -q pool_test.py
+"""
+import threading
+import time
+import pytest
+from app.data.db import ConnectionPool, PoolTimeoutError
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(tmp_path / "pool.db", max_size=2, timeout=0.2, profile="sqlite_defaults")
+    yield pool
+    pool.close_all()
+
+def test_nested_checkouts_share_one_connection(pool):
+    with pool.connection() as outer:
+        with pool.connection() as inner:
+            assert inner is outer
+        # Leaving the inner block doesn't hand the connection back.
+        assert pool.stats()["in_use"] == 1
+        assert pool.stats()["idle"] == 0
+    stats = pool.stats()
+    assert (stats["open"], stats["idle"], stats["checkouts"]) == (1, 1, 2)
+
+    with pool.connection() as again:
+        assert again is outer
+    assert pool.stats()["reuses"] == 1
+
+def test_release_rolls_back_an_open_transaction(pool):
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x)")
+        conn.commit()
+        conn.execute("INSERT INTO t VALUES (1)")
+    with pool.connection() as conn:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+def test_threads_get_their_own_connections(pool):
+    seen, done = [], threading.Event()
+
+    def worker():
+        with pool.connection() as conn:
+            seen.append(conn)
+            done.wait()
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    try:
+        while len(seen) < 2:
+            time.sleep(0.01)
+        assert seen[0] is not seen[1]
+        assert pool.stats()["in_use"] == 2
+    finally:
+        done.set()
+        for thread in threads:
+            thread.join()
+    assert pool.stats()["open"] == 2
+
+def test_checkout_times_out_when_the_pool_is_exhausted(pool):
+    release = threading.Event()
+
+    def holder():
+        with pool.connection():
+            release.wait()
+
+    threads = [threading.Thread(target=holder) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    try:
+        # Wait until both connections are checked out.
+        while pool.stats()["in_use"] < 2:
+            time.sleep(0.01)
+        started = time.perf_counter()
+        with pytest.raises(PoolTimeoutError):
+            with pool.connection():
+                pass
+        assert time.perf_counter() - started >= pool.timeout
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+    stats = pool.stats()
+    assert (stats["timeouts"], stats["waits"], stats["open"]) == (1, 1, 2)
+
+def test_waiting_checkout_gets_the_released_connection(pool):
+    pool.timeout = 5
+    first = threading.Event()
+
+    def holder():
+        with pool.connection():
+            first.set()
+            time.sleep(0.1)
+
+    thread = threading.Thread(target=holder)
+    pool.max_size = 1
+    thread.start()
+    first.wait()
+    with pool.connection() as conn:
+        assert conn.execute("SELECT 1").fetchone() == (1,)
+    thread.join()
+    stats = pool.stats()
+    assert (stats["open"], stats["waits"], stats["timeouts"]) == (1, 1, 0)
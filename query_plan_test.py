@@ -0,0 +1,116 @@
+"""
+Query-plan regression tests for app/data/analytic.py.
+
+Each analytic function is run against a seeded database and every statement
+it executes is passed through EXPLAIN QUERY PLAN. Once a table holds more than
+PLAN_ROW_THRESHOLD rows, a plain "SCAN <table>" (no index) or a temp B-tree
+for GROUP BY means an index is missing and the test fails. The seeded
+database comes from conftest.py.
+
+Run with:
+    python -m pytest -q query_plan_test.py
+"""
+import inspect
+import pytest
+from app.data import analytic
+from app.data.incidents import get_incidents_between, count_incidents_by_period
+from app.data.tickets import get_tickets_between, count_tickets_by_period
+from app.data.db import connect_database
+
+PLAN_ROW_THRESHOLD = 5000
+
+# ORDER BY clauses the pages use to list records, newest first.
+RECORD_LISTINGS = [
+    "SELECT incident_id, timestamp, severity, category, status, description "
+    "FROM cyber_incidents ORDER BY timestamp_epoch DESC, incident_id DESC LIMIT 50",
+    "SELECT dataset_id, name, rows, columns, uploaded_by, upload_date "
+    "FROM datasets_metadata ORDER BY upload_date DESC LIMIT 50",
+    "SELECT ticket_id, priority, description, status, assigned_to, created_at, resolution_time_hours "
+    "FROM it_tickets ORDER BY created_at_epoch DESC, rowid DESC LIMIT 50",
+]
+
+# Time-range APIs: must be range scans on the *_epoch indexes.
+TIME_RANGE_CALLS = [
+    (get_incidents_between, "idx_incidents_timestamp_epoch"),
+    (count_incidents_by_period, "idx_incidents_timestamp_epoch"),
+    (get_tickets_between, "idx_tickets_created_at_epoch"),
+    (count_tickets_by_period, "idx_tickets_created_at_epoch"),
+]
+
+@pytest.fixture(scope="module")
+def conn(seeded_db):
+    conn = connect_database(seeded_db, profile="sqlite_defaults")
+    assert conn.execute("SELECT COUNT(*) FROM cyber_incidents").fetchone()[0] > PLAN_ROW_THRESHOLD
+    yield conn
+    conn.close()
+
+def _analytic_functions():
+    return [
+        func for name, func in inspect.getmembers(analytic, inspect.isfunction)
+        if func.__module__ == analytic.__name__ and not name.startswith("_")
+    ]
+
+def _captured_statements(conn, func, *args):
+    """Run func(conn, *args) and return the (parameter-expanded) SQL it executed."""
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        # Bypass the shared result cache so the query really runs.
+        getattr(func, "__wrapped__", func)(conn, *args)
+    finally:
+        conn.set_trace_callback(None)
+    return [s for s in statements if s.lstrip().upper().startswith(("SELECT", "WITH"))]
+
+def _plan(conn, sql):
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+
+def _full_scans(plan):
+    problems = []
+    for detail in plan:
+        if detail.startswith("SCAN ") and "USING" not in detail:
+            problems.append(detail)
+        if "TEMP B-TREE FOR GROUP BY" in detail:
+            problems.append(detail)
+    return problems
+
+def _table_rows(conn, sql):
+    for table in ("cyber_incidents", "datasets_metadata", "it_tickets"):
+        if table in sql:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    return 0
+
+@pytest.mark.parametrize("func", _analytic_functions(), ids=lambda f: f.__name__)
+def test_analytic_query_uses_index(conn, func):
+    statements = _captured_statements(conn, func)
+    assert statements, f"{func.__name__} did not run any SELECT"
+    for sql in statements:
+        if _table_rows(conn, sql) <= PLAN_ROW_THRESHOLD:
+            continue
+        plan = _plan(conn, sql)
+        assert not _full_scans(plan), f"{func.__name__} falls back to a full scan: {plan}"
+
+@pytest.mark.parametrize("sql", RECORD_LISTINGS, ids=["incidents", "datasets", "tickets"])
+def test_record_listing_avoids_sort(conn, sql):
+    plan = _plan(conn, sql)
+    assert not _full_scans(plan), plan
+    assert not any("TEMP B-TREE FOR ORDER BY" in d for d in plan), plan
+
+@pytest.mark.parametrize("func, index", TIME_RANGE_CALLS, ids=lambda v: getattr(v, "__name__", v))
+def test_time_range_uses_epoch_index(conn, func, index):
+    statements = _captured_statements(conn, func, "2024-03-01", "2024-04-01")
+    assert statements
+    for sql in statements:
+        plan = _plan(conn, sql)
+        assert any(d.startswith("SEARCH") and index in d for d in plan), plan
+        # Scans of the generated bucket rows are fine; scans of the table are not.
+        table_scans = [d for d in _full_scans(plan) if "cyber_incidents" in d or "it_tickets" in d]
+        assert not table_scans, plan
+
+def test_epoch_columns_follow_text_timestamps(conn):
+    missing = conn.execute(
+        "SELECT COUNT(*) FROM cyber_incidents WHERE timestamp_epoch IS NOT strftime('%s', timestamp) + 0"
+    ).fetchone()[0]
+    assert missing == 0
+    march = get_incidents_between(conn, "2024-03-01", "2024-04-01")
+    assert len(march) > 0
+    assert march["timestamp"].str.startswith("2024-03").all()
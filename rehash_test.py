@@ -0,0 +1,81 @@
+"""
+bcrypt cost tests for calibrate_bcrypt.py and the rehash on login in
+app/services/user_service.py.
+
+Calibration must pick the highest cost that verifies within the target, and
+a successful login must move a hash made at any other cost (e.g. migrated
+from users.txt) to BCRYPT_ROUNDS, without ever locking the user out.
+
+Run with:
+    python -m pytest -q rehash_test.py
+"""
+import json
+import bcrypt
+import pytest
+import calibrate_bcrypt
+from app.services import user_service
+from app.services.auth_executor import AuthBusyError, hash_rounds
+from app.services.user_service import login_user
+
+def _add_user(username, password, rounds):
+    password_hash = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+    with user_service.get_connection() as conn:
+        conn.execute("INSERT INTO users (username, password_hash) VALUES (?, ?)", (username, password_hash))
+        conn.commit()
+    return password_hash
+
+def _stored_hash(username):
+    with user_service.get_connection() as conn:
+        return conn.execute("SELECT password_hash FROM users WHERE username = ?", (username,)).fetchone()[0]
+
+def test_login_rehashes_at_the_calibrated_cost(user_db):
+    _add_user("grace", "Secret123!", rounds=5)
+
+    assert login_user("grace", "Secret123!")[0]
+    rehashed = _stored_hash("grace")
+    assert hash_rounds(rehashed) == 4
+    # The new hash still lets the user in, and is kept on the next login.
+    assert login_user("grace", "Secret123!")[0]
+    assert _stored_hash("grace") == rehashed
+
+def test_failed_login_keeps_the_old_hash(user_db):
+    old = _add_user("heidi", "Secret123!", rounds=5)
+    assert not login_user("heidi", "wrong password")[0]
+    assert _stored_hash("heidi") == old
+
+def test_busy_pool_skips_the_rehash_but_not_the_login(user_db, monkeypatch):
+    old = _add_user("ivan", "Secret123!", rounds=5)
+    executor = user_service.get_auth_executor()
+
+    def busy(password, rounds=None):
+        raise AuthBusyError("busy")
+
+    monkeypatch.setattr(executor, "hash_password", busy)
+    assert login_user("ivan", "Secret123!")[0]
+    assert _stored_hash("ivan") == old
+
+def test_rehash_leaves_a_hash_changed_meanwhile(user_db):
+    old = _add_user("judy", "Secret123!", rounds=5)
+    newer = bcrypt.hashpw(b"Changed123!", bcrypt.gensalt(4)).decode("utf-8")
+    with user_service.get_connection() as conn:
+        conn.execute("UPDATE users SET password_hash = ? WHERE username = 'judy'", (newer,))
+        conn.commit()
+    assert user_service._rehash_password("judy", "Secret123!", old) is False
+    assert _stored_hash("judy") == newer
+
+@pytest.mark.parametrize("slowdown, expected", [(1.0, 8), (2.0, 7)], ids=["as-predicted", "slower-than-predicted"])
+def test_calibration_picks_the_highest_cost_within_target(monkeypatch, slowdown, expected):
+    # 10 ms at cost 4, doubling per round; the chosen cost may time slower than extrapolated.
+    def measure(rounds, samples=3):
+        return 10 * 2 ** (rounds - 4) * (1 if rounds == 4 else slowdown)
+
+    monkeypatch.setattr(calibrate_bcrypt, "measure_verify_ms", measure)
+    rounds, measured = calibrate_bcrypt.calibrate_bcrypt_rounds(target_ms=250, min_rounds=4, max_rounds=16)
+    assert rounds == expected
+    assert measured <= 250
+
+def test_calibration_result_is_saved_where_config_reads_it(tmp_path):
+    path = tmp_path / "settings" / "auth_settings.json"
+    calibrate_bcrypt.save_bcrypt_rounds(11, 250, 180.04, path=path)
+    settings = json.loads(path.read_text())
+    assert (settings["bcrypt_rounds"], settings["measured_ms"]) == (11, 180.0)
@@ -0,0 +1,72 @@
+"""
+Render timing tests for app/services/render_timer.py.
+
+A widget inside a timed_fragment must rerun only that fragment: its region's
+run count goes up while the page's stays the same. Every run of a region is
+recorded in the session's render timings, and get_render_timings reports
+them slowest last run first.
+
+AppTest has no way to ask for a fragment-only rerun, so the test hands its
+script runner the same RerunData a browser sends when a widget inside a
+fragment changes.
+
+Run with:
+    python -m pytest -q render_timer_test.py
+"""
+import functools
+import pytest
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.testing.v1 import AppTest, local_script_runner
+from app.services import render_timer
+from app.services.render_timer import get_render_timings, record_region_time, timed_region
+
+def _counter_page():
+    import streamlit as st
+    from app.services.render_timer import timed_fragment, timed_region
+
+    @timed_fragment("Counter")
+    def counter():
+        st.session_state.setdefault("clicks", 0)
+        if st.button("Add"):
+            st.session_state.clicks += 1
+        st.write(st.session_state.clicks)
+
+    with timed_region("Page"):
+        st.title("Counter page")
+        counter()
+
+def _runs(at):
+    return {name: entry["runs"] for name, entry in at.session_state["render_timings"].items()}
+
+def test_widget_in_a_fragment_reruns_only_that_fragment(monkeypatch):
+    at = AppTest.from_function(_counter_page, default_timeout=10)
+    at.run()
+    assert _runs(at) == {"Page": 1, "Counter": 1}
+    (fragment_id,) = at._fragment_storage._fragments
+
+    monkeypatch.setattr(local_script_runner, "RerunData", functools.partial(RerunData, fragment_id_queue=[fragment_id]))
+    at.button[0].click().run()
+    assert not at.exception
+    assert at.session_state["clicks"] == 1
+    assert _runs(at) == {"Page": 1, "Counter": 2}
+
+    # A full run times both regions again.
+    monkeypatch.undo()
+    at.run()
+    assert _runs(at) == {"Page": 2, "Counter": 3}
+    assert at.session_state["render_timings"]["Counter"]["total_ms"] > 0
+
+def test_timings_are_recorded_per_region(monkeypatch):
+    monkeypatch.setattr(render_timer.st, "session_state", {})
+    record_region_time("Chart", 30.0)
+    record_region_time("Chart", 10.0)
+    record_region_time("Table", 20.0)
+    with pytest.raises(ValueError):
+        with timed_region("Form"):
+            raise ValueError("a failing region is still timed")
+
+    timings = get_render_timings()
+    assert timings["region"].tolist()[:2] == ["Table", "Chart"]
+    chart = timings.set_index("region").loc["Chart"]
+    assert (chart["runs"], chart["last_ms"], chart["avg_ms"]) == (2, 10.0, 20.0)
+    assert timings.set_index("region").loc["Form", "runs"] == 1
@@ -0,0 +1,51 @@
+"""
+Rollup table tests for the *_rollup functions in app/data/analytic.py.
+
+Each *_rollup function reads a trigger-maintained rollup table
+(schema.ROLLUP_TABLES) and must return the same rows as the full-table query
+it replaces, also after inserts, updates and deletes.
+
+Run with:
+    python -m pytest -q rollups_test.py
+"""
+import pytest
+from app.data import analytic
+from app.data.db import connect_database
+
+@pytest.fixture(scope="module")
+def conn(seeded_db):
+    conn = connect_database(seeded_db, profile="sqlite_defaults")
+    yield conn
+    conn.close()
+
+ROLLUP_PAIRS = [
+    ("get_incidents_by_category_count", "get_incidents_by_category_rollup"),
+    ("get_incidents_by_severity", "get_incidents_by_severity_rollup"),
+    ("get_high_severity_by_status", "get_high_severity_by_status_rollup"),
+    ("get_tickets_by_status", "get_tickets_by_status_rollup"),
+    ("get_tickets_by_assignee", "get_tickets_by_assignee_rollup"),
+    ("get_avg_resolution_time", "get_avg_resolution_time_rollup"),
+    ("get_datasets_by_uploader", "get_datasets_by_uploader_rollup"),
+]
+
+def _same_rows(conn, full_name, rollup_name):
+    full = getattr(analytic, full_name).__wrapped__(conn)
+    rolled = getattr(analytic, rollup_name).__wrapped__(conn)
+    columns = list(full.columns)
+    full = full.sort_values(columns).reset_index(drop=True)
+    rolled = rolled[columns].sort_values(columns).reset_index(drop=True)
+    return full.round(6).equals(rolled.round(6))
+
+def test_rollups_follow_inserts_updates_and_deletes(conn):
+    try:
+        conn.execute("UPDATE cyber_incidents SET severity = 'High', status = 'Open' WHERE incident_id % 7 = 0")
+        conn.execute("DELETE FROM cyber_incidents WHERE incident_id % 11 = 0")
+        conn.execute("INSERT INTO cyber_incidents (timestamp, severity, category) VALUES (NULL, 'High', NULL)")
+        conn.execute("UPDATE it_tickets SET resolution_time_hours = NULL WHERE rowid % 5 = 0")
+        conn.execute("UPDATE it_tickets SET assigned_to = 'IT_Support_Z', status = 'Closed' WHERE rowid % 3 = 0")
+        conn.execute("DELETE FROM it_tickets WHERE rowid % 13 = 0")
+        conn.execute("UPDATE datasets_metadata SET uploaded_by = NULL WHERE dataset_id % 4 = 0")
+        for full_name, rollup_name in ROLLUP_PAIRS:
+            assert _same_rows(conn, full_name, rollup_name), rollup_name
+    finally:
+        conn.rollback()
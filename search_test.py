@@ -0,0 +1,61 @@
+"""
+Full-text search tests for app/data/search.py.
+
+Search results are compared with an exact query on the same seeded
+database (conftest.py), and the FTS5 tables are checked to follow inserts,
+updates and deletes through their triggers.
+
+Run with:
+    python -m pytest -q search_test.py
+"""
+import pytest
+from app.data.datasets import search_datasets
+from app.data.incidents import search_incidents
+from app.data.search import build_match_expression, build_search_query
+from app.data.tickets import search_tickets
+
+@pytest.mark.parametrize("term, expected", [
+    ("malware", '"malware"*'),
+    ("data  breach", '"data"* "breach"*'),
+    ('phish" OR 1', '"phish"* "OR"* "1"*'),
+    ("   ", ""),
+    (None, ""),
+])
+def test_match_expression_quotes_every_word(term, expected):
+    assert build_match_expression(term) == expected
+
+def test_terms_without_words_search_nothing(db):
+    assert build_search_query("cyber_incidents", ["incident_id"], "!!!") == (None, None)
+    assert search_incidents(db, "!!!").empty
+
+@pytest.mark.parametrize("search, table, column, term", [
+    (search_incidents, "cyber_incidents", "category", "Malware"),
+    (search_tickets, "it_tickets", "assigned_to", "IT_Support_C"),
+    (search_datasets, "datasets_metadata", "uploaded_by", "cyber_admin"),
+])
+def test_search_finds_every_match(db, search, table, column, term):
+    expected = db.execute(f"SELECT COUNT(*) FROM {table} WHERE {column} = ?", (term,)).fetchone()[0]
+    assert expected
+    found = search(db, term, limit=None)
+    assert len(found) == expected
+    assert (found[column] == term).all()
+
+def test_prefix_and_limit(db):
+    found = search_incidents(db, "phish", limit=25)
+    assert len(found) == 25
+    assert (found["category"] == "Phishing").all()
+    assert search_incidents(db, "phish", prefix=False).empty
+
+def test_search_follows_writes(db):
+    db.execute(
+        "INSERT INTO cyber_incidents (timestamp, severity, category, status, description) "
+        "VALUES ('2024-06-01 09:00:00', 'High', 'Other', 'Open', 'ransomware on the payroll server')"
+    )
+    assert search_incidents(db, "payroll ransom")["description"].tolist() == ["ransomware on the payroll server"]
+
+    db.execute("UPDATE cyber_incidents SET description = 'contained' WHERE description LIKE '%payroll%'")
+    assert search_incidents(db, "payroll").empty
+    assert len(search_incidents(db, "contained")) == 1
+
+    db.execute("DELETE FROM cyber_incidents WHERE description = 'contained'")
+    assert search_incidents(db, "contained").empty
@@ -0,0 +1,86 @@
+"""
+Session token tests for app/services/user_service.py.
+
+A token must only resolve while its signature, expiry and cached session
+all hold: edited, re-signed or unknown tokens, expired ones and tokens whose
+session was logged out or invalidated resolve to None. Logging out with a
+forged token must not end anyone's session.
+
+Run with:
+    python -m pytest -q session_token_test.py
+"""
+import time
+import pytest
+from app.services import user_service
+from app.services.user_service import (
+    invalidate_user_sessions, issue_session_token, login_session, register_user, resolve_session_token,
+    revoke_session_token, update_user_role
+)
+
+def test_issued_token_resolves_to_its_principal():
+    token = issue_session_token("alice", "analyst", ttl=60)
+    principal = resolve_session_token(token)
+    assert (principal.username, principal.role) == ("alice", "analyst")
+    assert time.time() < principal.expires <= time.time() + 60
+
+@pytest.mark.parametrize("token", [None, "", "garbage", "a.b", "a.notanumber.c", "a.1.b.c"])
+def test_malformed_tokens_are_rejected(token):
+    assert resolve_session_token(token) is None
+
+def test_forged_tokens_are_rejected(monkeypatch):
+    token = issue_session_token("alice", ttl=60)
+    session_id, expires, signature = token.split(".")
+
+    # Pushing the expiry out breaks the signature.
+    assert resolve_session_token(f"{session_id}.{int(expires) + 3600}.{signature}") is None
+    tampered = signature[:-1] + ("B" if signature.endswith("A") else "A")
+    assert resolve_session_token(f"{session_id}.{expires}.{tampered}") is None
+    # A well-signed token for a session this process never opened.
+    payload = f"not-a-session.{expires}"
+    assert resolve_session_token(f"{payload}.{user_service._sign(payload)}") is None
+    # A token signed with another secret (e.g. another deployment).
+    monkeypatch.setattr(user_service, "SESSION_SECRET", b"another secret")
+    assert resolve_session_token(token) is None
+
+def test_expired_token_is_rejected_and_forgotten():
+    token = issue_session_token("alice", ttl=-1)
+    assert resolve_session_token(token) is None
+    assert token.split(".", 1)[0] not in user_service._sessions
+
+def test_logout_revokes_only_that_session():
+    first = issue_session_token("alice", ttl=60)
+    second = issue_session_token("alice", ttl=60)
+    revoke_session_token(first)
+    assert resolve_session_token(first) is None
+    assert resolve_session_token(second).username == "alice"
+
+def test_forged_token_cannot_log_out_a_session():
+    token = issue_session_token("alice", ttl=60)
+    session_id = token.split(".", 1)[0]
+    for forged in (session_id, f"{session_id}.0.forged", f"{session_id}.{token.split('.')[1]}.forged"):
+        revoke_session_token(forged)
+    assert resolve_session_token(token).username == "alice"
+
+def test_invalidation_updates_or_ends_every_session_of_a_user():
+    tokens = [issue_session_token("carol", "user", ttl=60) for _ in range(2)]
+    other = issue_session_token("dave", "user", ttl=60)
+
+    assert invalidate_user_sessions("carol", role="admin") == 2
+    assert [resolve_session_token(t).role for t in tokens] == ["admin", "admin"]
+
+    assert invalidate_user_sessions("carol") == 2
+    assert [resolve_session_token(t) for t in tokens] == [None, None]
+    assert resolve_session_token(other).role == "user"
+
+def test_role_change_reaches_open_sessions(user_db):
+    assert register_user("erin", "Secret123!")[0]
+    success, _, token = login_session("erin", "Secret123!")
+    assert success and resolve_session_token(token).role == "user"
+
+    assert update_user_role("erin", "admin")[0]
+    assert resolve_session_token(token).role == "admin"
+    assert update_user_role("nobody", "admin")[0] is False
+
+def test_failed_login_opens_no_session(user_db):
+    assert register_user("frank", "Secret123!")[0]
+    assert login_session("frank", "wrong password") == (False, "Invalid password.", None)
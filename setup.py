@@ -1,7 +1,9 @@
-from app.data.db import connect_database, DB_PATH
+from app.data.db import get_connection, DB_PATH
 from app.data.schema import create_all_tables
 from app.services.user_service import migrate_users_from_file
+from app.data.changes import prune_change_log
 from app.services.data_loader import load_all_csv_data
+from config import CHANGE_LOG_KEEP_VERSIONS, DATA_DIR
 
 def setup_database_complete():
     """
@@ -16,40 +18,46 @@ def setup_database_complete():
     print("STARTING COMPLETE DATABASE SETUP")
     print("="*60)
 
+    # users.txt, the CSVs and the database all live in DATA (first run: create it)
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+
     # Step 1: Connect
     print("\n[1/5] Connecting to database...")
-    conn = connect_database()
-    print("        Connected")
-
-    # Step 2: Create tables
-    print("\n[2/5] Creating database tables...")
-    create_all_tables(conn)
-
-    # Step 3: Migrate users
-    print("\n[3/5] Migrating users from users.txt...")
-    user_count = migrate_users_from_file(conn)
-    print(f"        Migrated {user_count} users")
-
-    # Step 4: Load CSV data
-    print("\n[4/5] Loading CSV data...")
-    total_rows = load_all_csv_data(conn)
-    print(f"        Loaded {total_rows} rows")
-
-    # Step 5: Verify
-    print("\n[5/5] Verifying database setup...")
-    cursor = conn.cursor()
-
-    tables = ['users', 'cyber_incidents', 'datasets_metadata', 'it_tickets']
-    print("\n Database Summary:")
-    print(f"{'Table':<25} {'Row Count':<15}")
-    print("-" * 40)
-
-    for table in tables:
-        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-        count = cursor.fetchone()[0]
-        print(f"{table:<25} {count:<15}")
-
-    conn.close()
+    with get_connection(profile="bulk_import") as conn:
+        print("        Connected")
+
+        # Step 2: Create tables
+        print("\n[2/5] Creating database tables...")
+        create_all_tables(conn)
+
+        # Step 3: Migrate users
+        print("\n[3/5] Migrating users from users.txt...")
+        user_stats = migrate_users_from_file(conn)
+        print(f"        Migrated {user_stats['inserted']} users")
+        if user_stats["failed"]:
+            print(f"        ⚠️ {user_stats['failed']} users were not migrated; run setup again to retry")
+
+        # Step 4: Load CSV data (incremental: unchanged files are skipped, rows are upserted)
+        print("\n[4/5] Syncing CSV data...")
+        total_rows = load_all_csv_data(conn, incremental=True)
+        print(f"        Synced {total_rows} new or changed rows")
+        pruned = prune_change_log(conn, CHANGE_LOG_KEEP_VERSIONS)
+        if pruned:
+            print(f"        Pruned {pruned} old change log entries")
+
+        # Step 5: Verify
+        print("\n[5/5] Verifying database setup...")
+        cursor = conn.cursor()
+
+        tables = ['users', 'cyber_incidents', 'datasets_metadata', 'it_tickets']
+        print("\n Database Summary:")
+        print(f"{'Table':<25} {'Row Count':<15}")
+        print("-" * 40)
+
+        for table in tables:
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            count = cursor.fetchone()[0]
+            print(f"{table:<25} {count:<15}")
 
     print("\n" + "="*60)
     print(" DATABASE SETUP COMPLETE!")
@@ -0,0 +1,53 @@
+"""
+First-run tests for config.py and setup.py.
+
+Importing config must not print or create DATA (auth.py imports it for
+BCRYPT_ROUNDS). setup.py must create DATA itself and finish with empty
+tables when users.txt and the CSVs are missing, and the parallel CSV loader
+must load nothing from a missing folder.
+
+Both scripts use paths relative to the working directory, so they run in a
+subprocess inside an empty temporary folder.
+
+Run with:
+    python -m pytest -q setup_test.py
+"""
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+from app.data.db import connect_database
+from app.data.schema import create_all_tables
+from app.services.data_loader import load_csv_directory
+
+REPO = Path(__file__).resolve().parent
+
+def _run(cwd, *args):
+    env = dict(os.environ, PYTHONPATH=str(REPO))
+    return subprocess.run([sys.executable, *args], cwd=cwd, env=env, capture_output=True, text=True, timeout=300)
+
+def test_importing_config_has_no_side_effects(tmp_path):
+    result = _run(tmp_path, "-c", "import config")
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == ""
+    assert list(tmp_path.iterdir()) == []
+
+def test_setup_creates_data_on_first_run(tmp_path):
+    result = _run(tmp_path, str(REPO / "setup.py"))
+    assert result.returncode == 0, result.stderr
+    assert "No users to migrate." in result.stdout
+    assert "DATABASE SETUP COMPLETE!" in result.stdout
+
+    conn = sqlite3.connect(tmp_path / "DATA" / "intelligence_platform.db")
+    for table in ("users", "cyber_incidents", "datasets_metadata", "it_tickets"):
+        assert conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 0
+    conn.close()
+
+def test_parallel_load_from_a_missing_folder_loads_nothing(tmp_path):
+    conn = connect_database(tmp_path / "app.db", profile="sqlite_defaults")
+    create_all_tables(conn)
+    stats = load_csv_directory(conn, tmp_path / "DATA", upsert=True)
+    assert stats["total"]["rows"] == 0
+    assert not (tmp_path / "DATA").exists()
+    conn.close()
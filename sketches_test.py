@@ -0,0 +1,43 @@
+"""
+Resolution-time sketch tests for app/data/sketches.py.
+
+Percentiles read from the trigger-maintained sketch must stay within
+SKETCH_RELATIVE_ACCURACY of the exact values, overall and per assignee, after
+the tickets are updated and deleted.
+
+Run with:
+    python -m pytest -q sketches_test.py
+"""
+import numpy as np
+import pytest
+from app.data.db import connect_database
+from app.data.schema import SKETCH_RELATIVE_ACCURACY
+from app.data.sketches import get_resolution_percentiles, get_resolution_percentiles_by
+
+@pytest.fixture(scope="module")
+def conn(seeded_db):
+    conn = connect_database(seeded_db, profile="sqlite_defaults")
+    yield conn
+    conn.close()
+
+def _assert_close_to_exact(conn, where, result):
+    values = np.array([r[0] for r in conn.execute(
+        f"SELECT resolution_time_hours FROM it_tickets WHERE resolution_time_hours IS NOT NULL AND {where}"
+    )])
+    assert result["count"] == len(values)
+    for q in (0.5, 0.9, 0.99):
+        exact = np.quantile(values, q, method="lower")
+        assert abs(result[f"p{q * 100:g}"] - exact) <= SKETCH_RELATIVE_ACCURACY * exact + 1e-9
+
+def test_resolution_sketch_quantiles_within_accuracy(conn):
+    try:
+        conn.execute("UPDATE it_tickets SET resolution_time_hours = resolution_time_hours * 3 WHERE rowid % 4 = 0")
+        conn.execute("UPDATE it_tickets SET assigned_to = 'IT_Support_A' WHERE rowid % 9 = 0")
+        conn.execute("DELETE FROM it_tickets WHERE rowid % 10 = 0")
+        conn.execute("UPDATE it_tickets SET resolution_time_hours = NULL WHERE rowid % 17 = 0")
+        _assert_close_to_exact(conn, "1", get_resolution_percentiles.__wrapped__(conn))
+        by_assignee = get_resolution_percentiles_by.__wrapped__(conn, "assigned_to")
+        for record in by_assignee.to_dict("records"):
+            _assert_close_to_exact(conn, f"assigned_to = '{record['assigned_to']}'", record)
+    finally:
+        conn.rollback()
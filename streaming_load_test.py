@@ -0,0 +1,83 @@
+"""
+Streaming CSV import tests for stream_csv_to_table() in app/services/data_loader.py.
+
+A load that fails part-way must keep its committed chunks and a checkpoint,
+and the next run over the same unchanged file must continue after that
+checkpoint, so every row ends up loaded exactly once.
+
+Run with:
+    python -m pytest -q streaming_load_test.py
+"""
+import os
+import pandas as pd
+import pytest
+from app.services.data_loader import stream_csv_to_table
+
+ROWS = 500
+
+def _write_tickets(path, rows=ROWS):
+    pd.DataFrame({
+        "ticket_id": [f"CSV-{i}" for i in range(rows)],
+        "priority": "High",
+        "description": "streamed",
+        "status": "Open",
+        "assigned_to": "IT_Support_A",
+        "created_at": "2024-07-01 09:00:00",
+    }).to_csv(path, index=False)
+
+def _streamed(conn):
+    return conn.execute(
+        "SELECT COUNT(*), COUNT(DISTINCT ticket_id) FROM it_tickets WHERE ticket_id LIKE 'CSV-%'"
+    ).fetchone()
+
+def _checkpoint(conn):
+    return conn.execute("SELECT rows_committed FROM import_checkpoints WHERE table_name = 'it_tickets'").fetchone()
+
+@pytest.fixture
+def failing_load(db, tmp_path):
+    """A CSV whose third 100-row chunk collides with a ticket already in the table."""
+    csv_path = tmp_path / "it_tickets.csv"
+    _write_tickets(csv_path)
+    db.execute("INSERT INTO it_tickets (ticket_id, status) VALUES ('CSV-250', 'Closed')")
+    db.commit()
+    assert stream_csv_to_table(db, csv_path, "it_tickets", chunk_size=100, progress=None) == 200
+    assert _checkpoint(db) == (200,)
+    db.execute("DELETE FROM it_tickets WHERE ticket_id = 'CSV-250'")
+    db.commit()
+    return csv_path
+
+def test_failed_load_resumes_after_its_checkpoint(db, failing_load):
+    assert stream_csv_to_table(db, failing_load, "it_tickets", chunk_size=100, progress=None) == 300
+    assert _streamed(db) == (ROWS, ROWS)
+    # A finished load leaves no checkpoint behind.
+    assert _checkpoint(db) is None
+
+def test_changed_file_starts_over(db, failing_load):
+    stat = failing_load.stat()
+    os.utime(failing_load, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    db.execute("DELETE FROM it_tickets WHERE ticket_id LIKE 'CSV-%'")
+    db.commit()
+    assert stream_csv_to_table(db, failing_load, "it_tickets", chunk_size=100, progress=None) == ROWS
+    assert _streamed(db) == (ROWS, ROWS)
+
+def test_resume_can_be_turned_off(db, failing_load):
+    db.execute("DELETE FROM it_tickets WHERE ticket_id LIKE 'CSV-%'")
+    db.commit()
+    assert stream_csv_to_table(db, failing_load, "it_tickets", chunk_size=100, progress=None, resume=False) == ROWS
+    assert _streamed(db) == (ROWS, ROWS)
+
+def test_commits_every_chunks_per_commit_chunks(db, tmp_path):
+    csv_path = tmp_path / "it_tickets.csv"
+    _write_tickets(csv_path)
+    reported = []
+    loaded = stream_csv_to_table(db, csv_path, "it_tickets", chunk_size=50, chunks_per_commit=3,
+                                 progress=lambda table, rows, rate: reported.append(rows))
+    assert loaded == ROWS
+    assert reported == [150, 300, 450]
+    assert _streamed(db) == (ROWS, ROWS)
+
+def test_unknown_columns_load_nothing(db, tmp_path):
+    csv_path = tmp_path / "it_tickets.csv"
+    pd.DataFrame({"ticket_id": ["CSV-1"], "owner": ["nobody"]}).to_csv(csv_path, index=False)
+    assert stream_csv_to_table(db, csv_path, "it_tickets", progress=None) == 0
+    assert _streamed(db) == (0, 0)
@@ -0,0 +1,70 @@
+"""
+Trend series tests for app/data/trends.py.
+
+Every bucketed series must add up to its table's totals at any granularity.
+The ticket backlog trend reads opened and closed counts from the daily
+rollups, so it must match a count over it_tickets after any write, without
+ever scanning the table.
+
+Run with:
+    python -m pytest -q trends_test.py
+"""
+import pandas as pd
+import pytest
+from app.data.db import connect_database
+from app.data.trends import get_incident_trend, get_ticket_backlog_trend
+
+@pytest.fixture(scope="module")
+def conn(seeded_db):
+    conn = connect_database(seeded_db, profile="sqlite_defaults")
+    yield conn
+    conn.close()
+
+@pytest.mark.parametrize("granularity", ["day", "week", "month"])
+def test_trends_add_up_to_table_totals(conn, granularity):
+    incidents = get_incident_trend.__wrapped__(conn, granularity)
+    total = conn.execute("SELECT COUNT(*) FROM cyber_incidents WHERE timestamp_epoch IS NOT NULL").fetchone()[0]
+    assert incidents["count"].sum() == total
+
+    backlog = get_ticket_backlog_trend.__wrapped__(conn, granularity)
+    assert backlog["opened"].sum() == conn.execute("SELECT COUNT(*) FROM it_tickets").fetchone()[0]
+    assert backlog["backlog"].iloc[-1] == backlog["opened"].sum() - backlog["closed"].sum()
+
+def _closed_by_day(conn):
+    """Tickets closed per day, counted over it_tickets."""
+    return pd.read_sql_query(
+        """
+        SELECT date(created_at_epoch + CAST(resolution_time_hours * 3600 AS INTEGER), 'unixepoch') AS day,
+               COUNT(*) AS closed
+        FROM it_tickets
+        WHERE status IN ('Resolved', 'Closed') AND resolution_time_hours IS NOT NULL
+          AND created_at_epoch IS NOT NULL AND priority = 'High'
+        GROUP BY 1
+        """, conn
+    ).set_index("day")["closed"]
+
+def test_closed_counts_follow_writes_without_a_table_scan(conn):
+    statements = []
+    try:
+        conn.execute("UPDATE it_tickets SET status = 'Closed' WHERE rowid % 3 = 0")
+        conn.execute("UPDATE it_tickets SET resolution_time_hours = resolution_time_hours * 4 WHERE rowid % 5 = 0")
+        conn.execute("UPDATE it_tickets SET status = 'Open' WHERE rowid % 7 = 0")
+        conn.execute("DELETE FROM it_tickets WHERE rowid % 11 = 0")
+        conn.execute(
+            "INSERT INTO it_tickets (ticket_id, priority, status, created_at, resolution_time_hours) "
+            "VALUES ('T-new', 'High', 'Resolved', '2024-12-31 20:00:00', 30)"
+        )
+        conn.set_trace_callback(statements.append)
+        trend = get_ticket_backlog_trend.__wrapped__(conn, "day", priority="High")
+        conn.set_trace_callback(None)
+
+        closed = trend.set_index(trend["bucket_start"].dt.strftime("%Y-%m-%d"))["closed"]
+        assert closed[closed > 0].to_dict() == _closed_by_day(conn).to_dict()
+        assert closed["2025-01-01"] >= 1
+        assert statements
+        for sql in (s for s in statements if s.lstrip().upper().startswith("SELECT")):
+            plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+            assert not any("it_tickets" in detail for detail in plan), plan
+    finally:
+        conn.set_trace_callback(None)
+        conn.rollback()
@@ -0,0 +1,66 @@
+"""
+Compact dtype tests for app/data/typed_frames.py.
+
+Typing must never lose data: values outside a column's fixed set become
+extra categories (not NaN), integer columns with NULLs become nullable
+Int32/Int64 instead of float, the CSV's "YYYY-MM-DD HH:MM:SS.ffffff" and the
+forms' "YYYY-MM-DD" timestamps both parse, and pages appended by
+record_pager keep the dtypes of the first page.
+
+Run with:
+    python -m pytest -q typed_frames_test.py
+"""
+import pandas as pd
+import pytest
+from app.data.tickets import get_tickets_page
+from app.data.typed_frames import SEVERITY_LEVELS, apply_domain_types
+from app.services import record_pager
+from app.services.record_pager import get_loaded_records, load_next_page
+
+def test_values_outside_the_set_become_extra_categories():
+    df = pd.DataFrame({"severity": ["Low", "Severe", None, "Critical"], "category": ["Zero-day", None, None, "DDoS"]})
+    typed = apply_domain_types(df, "cyber_incidents")
+    assert list(typed["severity"].cat.categories) == SEVERITY_LEVELS + ["Severe"]
+    assert typed["severity"].astype(object).tolist()[:2] == ["Low", "Severe"]
+    assert typed["severity"].isna().tolist() == [False, False, True, False]
+    assert typed["category"].astype(object).tolist()[0] == "Zero-day"
+
+@pytest.mark.parametrize("values, dtype", [
+    ([1, 2, 300], "int16"),
+    ([1, None, 300], "Int32"),
+    ([1, None, 2**40], "Int64"),
+    ([None, None, None], "Int32"),
+])
+def test_integer_columns_keep_nulls_without_turning_float(values, dtype):
+    typed = apply_domain_types(pd.DataFrame({"rows": values}), "datasets_metadata")
+    assert str(typed["rows"].dtype) == dtype
+    assert typed["rows"].isna().tolist() == [v is None for v in values]
+
+def test_csv_and_form_timestamps_both_parse():
+    df = pd.DataFrame({"timestamp": ["2024-04-12 19:00:00.000000", "2024-04-13", None, "not a date"]})
+    typed = apply_domain_types(df, "cyber_incidents")
+    assert pd.api.types.is_datetime64_any_dtype(typed["timestamp"])
+    assert typed["timestamp"].tolist()[:2] == [pd.Timestamp("2024-04-12 19:00:00"), pd.Timestamp("2024-04-13")]
+    assert typed["timestamp"].isna().tolist() == [False, False, True, True]
+
+def test_appended_pages_keep_the_first_pages_dtypes(db, monkeypatch):
+    # The oldest ticket, on the last page, brings an assignee and a status no earlier page has.
+    db.execute(
+        "INSERT INTO it_tickets (ticket_id, priority, status, assigned_to, created_at, resolution_time_hours) "
+        "VALUES ('T-old', 'Low', 'Escalated', 'Contractor_Z', '2000-01-01 00:00:00.000000', NULL)"
+    )
+    db.commit()
+    monkeypatch.setattr(record_pager.st, "session_state", {})
+
+    first, has_more = get_loaded_records(db, "tickets", get_tickets_page, page_size=2000)
+    dtypes = first.dtypes.astype(str).to_dict()
+    while has_more:
+        load_next_page(db, "tickets", get_tickets_page, page_size=2000)
+        records, has_more = get_loaded_records(db, "tickets", get_tickets_page)
+
+    assert len(records) == db.execute("SELECT COUNT(*) FROM it_tickets").fetchone()[0]
+    assert records.dtypes.astype(str).to_dict() == dtypes
+    oldest = records.iloc[-1]
+    assert (oldest["status"], oldest["assigned_to"]) == ("Escalated", "Contractor_Z")
+    assert pd.isna(oldest["resolution_time_hours"])
+    assert records["status"].notna().all()
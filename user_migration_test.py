@@ -0,0 +1,82 @@
+"""
+Legacy users.txt migration tests for app/services/user_service.py.
+
+Every non-blank line must be counted once: inserted, skipped (already
+registered), invalid (malformed) or failed (in a batch the database
+rejected, which stops the migration so it can be re-run).
+
+Run with:
+    python -m pytest -q user_migration_test.py
+"""
+import bcrypt
+import pytest
+from app.data.db import connect_database
+from app.data.schema import create_users_table
+from app.services.user_service import migrate_users_from_directory, migrate_users_from_file
+
+PASSWORD_HASH = bcrypt.hashpw(b"Legacy123!", bcrypt.gensalt(4)).decode("utf-8")
+
+@pytest.fixture
+def users(tmp_path):
+    conn = connect_database(tmp_path / "users.db", profile="sqlite_defaults")
+    create_users_table(conn)
+    yield conn
+    conn.close()
+
+def _write(path, lines):
+    path.write_text("".join(f"{line}\n" for line in lines), encoding="utf-8")
+    return path
+
+def _count(conn):
+    return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+def _counts(stats):
+    return {key: stats[key] for key in ("read", "inserted", "skipped", "invalid", "failed")}
+
+def test_every_line_is_counted_once(users, tmp_path):
+    users.execute("INSERT INTO users (username, password_hash) VALUES ('existing', 'x')")
+    users.commit()
+    path = _write(tmp_path / "users.txt", [
+        f"alice,{PASSWORD_HASH}",
+        f"  bob , {PASSWORD_HASH} ,extra field",
+        "",
+        f"existing,{PASSWORD_HASH}",
+        "no hash here",
+        f",{PASSWORD_HASH}",
+        "carol,$2b$12$tooshort",
+        f"alice,{PASSWORD_HASH}",
+    ])
+
+    stats = migrate_users_from_file(users, path, batch_size=3, progress=None)
+
+    assert _counts(stats) == {"read": 7, "inserted": 2, "skipped": 2, "invalid": 3, "failed": 0}
+    assert users.execute("SELECT username FROM users WHERE username = 'bob'").fetchone() == ("bob",)
+    # Running it again only skips.
+    again = migrate_users_from_file(users, path, batch_size=3, progress=None)
+    assert (again["inserted"], again["skipped"]) == (0, 4)
+
+def test_missing_file_migrates_nothing(users, tmp_path):
+    stats = migrate_users_from_file(users, tmp_path / "missing.txt", progress=None)
+    assert _counts(stats) == {"read": 0, "inserted": 0, "skipped": 0, "invalid": 0, "failed": 0}
+
+def test_rejected_batch_stops_the_migration(users, tmp_path):
+    users.execute(
+        "CREATE TRIGGER reject_user BEFORE INSERT ON users WHEN NEW.username = 'u5' "
+        "BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+    )
+    _write(tmp_path / "a.txt", [f"u{i},{PASSWORD_HASH}" for i in range(10)])
+    _write(tmp_path / "b.txt", [f"v{i},{PASSWORD_HASH}" for i in range(10)])
+    progress = []
+
+    stats = migrate_users_from_directory(users, tmp_path, batch_size=4,
+                                         progress=lambda name, rows, rate: progress.append((name, rows)))
+
+    # u0-u3 are in; the batch holding u5 is rolled back and nothing after it is read.
+    assert _counts(stats) == {"read": 8, "inserted": 4, "skipped": 0, "invalid": 0, "failed": 4}
+    assert (stats["files"], _count(users)) == (1, 4)
+    assert progress == [("a.txt", 4)]
+
+    users.execute("DROP TRIGGER reject_user")
+    retry = migrate_users_from_directory(users, tmp_path, batch_size=4, progress=None)
+    assert _counts(retry) == {"read": 20, "inserted": 16, "skipped": 4, "invalid": 0, "failed": 0}
+    assert (retry["files"], _count(users)) == (2, 20)